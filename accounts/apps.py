@@ -9,3 +9,7 @@ class AccountsConfig(AppConfig):
     """Configuration de l'application accounts."""
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        """Connecte les signaux (invalidation des caches)."""
+        from . import signals  # noqa: F401
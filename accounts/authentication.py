@@ -0,0 +1,134 @@
+"""
+Authentification JWT avec révocation des tokens.
+
+`StatelessJWTAuthentication` remplace `JWTAuthentication` : l'utilisateur
+est reconstruit depuis le token (`JWTUser` : identifiant, is_active,
+token_version), ses autres champs ne sont chargés que si une vue y
+accède. Les claims `username`/`email` ne sont pas reprises : elles datent
+de l'émission du token et seraient périmées après une modification du
+profil.
+
+Révocation : le token porte la claim `token_version`, comparée à
+`CustomUser.token_version`. L'état (version, is_active) de chaque
+utilisateur est mis en cache `AUTH_TOKEN_STATE_CACHE_TIMEOUT` secondes
+(60 par défaut) et invalidé à chaque sauvegarde de l'utilisateur : un
+token révoqué (mot de passe changé, `revoke_tokens()`, compte désactivé)
+est refusé aussitôt par le process courant, par les autres workers au
+plus tard après ce délai si le cache `default` n'est pas partagé.
+Avec un délai nul, l'utilisateur complet est chargé à chaque requête
+(une requête, comme `JWTAuthentication`).
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import JWTUser
+
+TOKEN_VERSION_CLAIM = 'token_version'
+TOKEN_STATE_CACHE_KEY = 'accounts:token_state:{}'
+
+
+def _cache_timeout():
+    return getattr(settings, 'AUTH_TOKEN_STATE_CACHE_TIMEOUT', 60)
+
+
+def get_token_state(user_id):
+    """
+    Retourne (token_version, is_active) pour un utilisateur, ou None.
+
+    Lu depuis le cache s'il est activé, sinon depuis la base (une
+    requête).
+    """
+    key = TOKEN_STATE_CACHE_KEY.format(user_id)
+    timeout = _cache_timeout()
+    state = cache.get(key) if timeout else None
+    if state is None:
+        state = get_user_model().objects.filter(pk=user_id).values_list(
+            'token_version', 'is_active'
+        ).first()
+        if state is None:
+            return None
+        if timeout:
+            cache.set(key, tuple(state), timeout)
+    return tuple(state)
+
+
+def invalidate_token_state(user_id):
+    """Supprime l'état mis en cache (après modification de l'utilisateur)."""
+    cache.delete(TOKEN_STATE_CACHE_KEY.format(user_id))
+
+
+def check_state(token, state):
+    """
+    Vérifie que le token n'a pas été révoqué et que l'utilisateur est actif.
+
+    `state` : (token_version, is_active) de l'utilisateur, None s'il
+    n'existe pas.
+    """
+    if state is None:
+        raise AuthenticationFailed(_('User not found'), code='user_not_found')
+    version, is_active = state
+    if api_settings.CHECK_USER_IS_ACTIVE and not is_active:
+        raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+    if token.get(TOKEN_VERSION_CLAIM, 0) != version:
+        raise AuthenticationFailed(
+            'Ce token a été révoqué.',
+            code='token_revoked'
+        )
+    return state
+
+
+def check_token_version(token, user_id):
+    """
+    `check_state` avec l'état lu en base (ou en cache).
+
+    Retourne l'état (token_version, is_active) de l'utilisateur.
+    """
+    return check_state(token, get_token_state(user_id))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """Authentification JWT construisant l'utilisateur depuis le token."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            ) from e
+
+        if _cache_timeout():
+            version, is_active = check_token_version(validated_token, user_id)
+        else:
+            # Utilisateur complet : les vues n'ont rien d'autre à charger
+            user = JWTUser.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).first()
+            check_state(validated_token, user and (
+                user.token_version, user.is_active
+            ))
+            return user
+        return self.build_user({
+            api_settings.USER_ID_FIELD: user_id,
+            'is_active': is_active,
+            'token_version': version,
+        })
+
+    def build_user(self, claims):
+        """Instance `JWTUser` dont les champs absents sont différés."""
+        fields = [
+            field for field in JWTUser._meta.concrete_fields
+            if field.attname in claims
+        ]
+        return JWTUser.from_db(
+            DEFAULT_DB_ALIAS,
+            [field.attname for field in fields],
+            [field.to_python(claims[field.attname]) for field in fields],
+        )
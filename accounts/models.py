@@ -38,6 +38,8 @@ class CustomUser(AbstractUser):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Version des tokens JWT : l'incrémenter révoque les tokens émis avant
+    token_version = models.PositiveIntegerField(default=0)
 
     class Meta:
         verbose_name = "User"
@@ -47,6 +49,17 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_full_name()})"
 
+    def set_password(self, raw_password):
+        """Changer le mot de passe révoque les tokens déjà émis."""
+        super().set_password(raw_password)
+        if self.pk is not None:
+            self.token_version += 1
+
+    def revoke_tokens(self):
+        """Révoque tous les tokens JWT émis pour cet utilisateur."""
+        self.token_version += 1
+        self.save(update_fields=['token_version'])
+
     def clean(self):
         """
         Validation de l'âge >= 15 ans (conformité RGPD).
@@ -58,3 +71,21 @@ class CustomUser(AbstractUser):
             raise ValidationError(
                 {'age': "L'utilisateur doit avoir au moins 15 ans pour s'inscrire."}
             )
+
+
+class JWTUser(CustomUser):
+    """
+    Utilisateur reconstruit depuis les claims d'un token JWT, sans requête.
+
+    Seuls les champs présents dans le token sont chargés ; les autres sont
+    différés et chargés tous ensemble (une seule requête) au premier accès.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
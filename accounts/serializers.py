@@ -9,7 +9,13 @@ Contient :
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import TOKEN_VERSION_CLAIM, check_token_version
 
 User = get_user_model()
 
@@ -144,10 +150,27 @@ class UserUpdateSerializer(serializers.ModelSerializer):
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Sérialiseur de token personnalisé pour inclure des infos utilisateur.
+
+    Les claims `username`/`email` informent le client (l'API relit ces
+    champs en base) ; `token_version` permet de révoquer les tokens
+    (changement de mot de passe, `revoke_tokens()`).
     """
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
         token['username'] = user.username
         token['email'] = user.email
+        token[TOKEN_VERSION_CLAIM] = user.token_version
         return token
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Sérialiseur de rafraîchissement refusant les refresh tokens révoqués.
+    """
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None:
+            check_token_version(refresh, user_id)
+        return super().validate(attrs)
@@ -0,0 +1,24 @@
+"""
+Signaux de l'application accounts.
+
+- Invalidation de l'état des tokens (version, is_active) mis en cache par
+  `accounts/authentication.py` à chaque save/delete d'un utilisateur
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_token_state
+from .models import JWTUser
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=JWTUser)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=JWTUser)
+def invalidate_user_token_state(sender, instance, **kwargs):
+    """Invalide l'état des tokens de l'utilisateur modifié."""
+    invalidate_token_state(instance.pk)
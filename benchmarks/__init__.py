@@ -0,0 +1,6 @@
+"""
+Benchmarks SoftDesk (hors suite de tests pytest).
+
+Chaque script s'exécute depuis la racine du projet, par exemple :
+    python -m benchmarks.query_plans --issues 1000000
+"""
@@ -0,0 +1,266 @@
+"""
+Lectures sous WSGI (vues synchrones) vs ASGI (vues asynchrones).
+
+Usage :
+    python -m benchmarks.async_reads --concurrency 1,16,64 --requests 2000
+    # Un seul des deux déploiements
+    python -m benchmarks.async_reads --server asgi
+
+Envoie les mêmes lectures (liste des projets, liste et détail d'issues,
+liste des commentaires) à `softdesk.wsgi.application` puis à
+`softdesk.asgi.application` (sans réseau), chacun dans son propre process :
+- WSGI : `--concurrency` clients, au plus `--threads` requêtes traitées
+  à la fois (worker à threads, par ex. gunicorn --threads)
+- ASGI : `--concurrency` clients dans une seule boucle asyncio (worker
+  uvicorn), lectures servies par `tracker/async_views.py`
+
+Le rapport donne, par niveau de concurrence, le débit et les latences
+p50/p99 vues du client (attente d'un thread libre comprise).
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import seed, setup_django
+
+HOST = 'localhost'
+
+
+def build_paths(project, issue_ids):
+    base = f'/api/v1/projects/{project.pk}/issues/'
+    paths = ['/api/v1/projects/', base]
+    for pk in issue_ids:
+        paths.append(f'{base}{pk}/')
+        paths.append(f'{base}{pk}/comments/')
+    return paths
+
+
+def wsgi_get(application, path, token):
+    """GET via l'application WSGI ; retourne le code HTTP."""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': HOST,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': HOST,
+        'HTTP_ACCEPT': 'application/json',
+        'HTTP_AUTHORIZATION': f'Bearer {token}',
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    status = []
+
+    def start_response(value, headers, exc_info=None):
+        status.append(value)
+
+    result = application(environ, start_response)
+    try:
+        for _ in result:
+            pass
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return int(status[0].split()[0])
+
+
+async def asgi_get(application, path, token):
+    """GET via l'application ASGI ; retourne le code HTTP."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode('ascii'),
+        'query_string': b'',
+        'headers': [
+            (b'host', HOST.encode('ascii')),
+            (b'accept', b'application/json'),
+            (b'authorization', f'Bearer {token}'.encode('ascii')),
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': (HOST, 80),
+    }
+    status = []
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Client toujours connecté
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+def run_wsgi(paths, token, concurrency, requests, threads):
+    from django.db import connection
+
+    from softdesk.wsgi import application
+
+    workers = threading.Semaphore(threads)
+    results = []
+
+    def client(offset, count):
+        latencies, errors = [], 0
+        try:
+            for i in range(count):
+                path = paths[(offset + i) % len(paths)]
+                start = time.perf_counter()
+                with workers:
+                    code = wsgi_get(application, path, token)
+                latencies.append(time.perf_counter() - start)
+                if code >= 400:
+                    errors += 1
+        finally:
+            connection.close()
+        results.append((latencies, errors))
+
+    count = max(requests // concurrency, 1)
+    clients = [
+        threading.Thread(target=client, args=(i, count))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    return time.perf_counter() - start, results
+
+
+def run_asgi(paths, token, concurrency, requests):
+    from softdesk.asgi import application
+
+    async def client(offset, count):
+        latencies, errors = [], 0
+        for i in range(count):
+            path = paths[(offset + i) % len(paths)]
+            start = time.perf_counter()
+            code = await asgi_get(application, path, token)
+            latencies.append(time.perf_counter() - start)
+            if code >= 400:
+                errors += 1
+        return latencies, errors
+
+    async def main():
+        count = max(requests // concurrency, 1)
+        return await asyncio.gather(
+            *(client(i, count) for i in range(concurrency))
+        )
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+    return time.perf_counter() - start, results
+
+
+def report(server, concurrency, elapsed, results):
+    latencies = sorted(value for values, _ in results for value in values)
+    errors = sum(count for _, count in results)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f'{server:<5} c={concurrency:<4} '
+        f'{len(latencies) / elapsed:8.1f} req/s  '
+        f'p50 {statistics.median(latencies) * 1000:7.1f} ms  '
+        f'p99 {p99 * 1000:7.1f} ms  '
+        f'errors {errors}'
+    )
+
+
+def run_server(args):
+    """Mesure d'un déploiement (process enfant)."""
+    setup_django(args.database)
+
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from tracker.models import Issue, Project
+
+    project = Project.objects.order_by('pk').first()
+    issue_ids = list(
+        Issue.objects.filter(project=project).values_list('pk', flat=True)[:20]
+    )
+    paths = build_paths(project, issue_ids)
+    token = str(RefreshToken.for_user(project.author).access_token)
+    connection.close()
+
+    for concurrency in args.concurrency:
+        if args.server == 'wsgi':
+            elapsed, results = run_wsgi(
+                paths, token, concurrency, args.requests, args.threads
+            )
+        else:
+            elapsed, results = run_asgi(
+                paths, token, concurrency, args.requests
+            )
+        report(args.server, concurrency, elapsed, results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--server', choices=['wsgi', 'asgi'], default=None)
+    parser.add_argument(
+        '--concurrency',
+        type=lambda value: [int(item) for item in value.split(',')],
+        default=[1, 16, 64],
+    )
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--issues', type=int, default=2000)
+    parser.add_argument('--comments', type=int, default=5000)
+    parser.add_argument('--database', default=None)
+    args = parser.parse_args()
+
+    if args.server is not None:
+        run_server(args)
+        return
+
+    setup_django(args.database)
+    from django.db import connection
+
+    from tracker.models import Issue
+
+    if Issue.objects.count() < args.issues:
+        seed(users=10, projects=1, issues=args.issues, comments=args.comments)
+    connection.close()
+
+    # Un process par déploiement : la configuration des URLs dépend de
+    # TRACKER_ASYNC_READS
+    for server, async_reads in (('wsgi', 'False'), ('asgi', 'True')):
+        command = [
+            sys.executable, '-m', 'benchmarks.async_reads',
+            '--server', server,
+            '--concurrency', ','.join(map(str, args.concurrency)),
+            '--requests', str(args.requests),
+            '--threads', str(args.threads),
+        ]
+        if args.database:
+            command += ['--database', args.database]
+        env = dict(os.environ, TRACKER_ASYNC_READS=async_reads)
+        subprocess.run(command, env=env, check=True)
+
+
+if __name__ == '__main__':
+    main()
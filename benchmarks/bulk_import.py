@@ -0,0 +1,110 @@
+"""
+Débit de l'import NDJSON en masse (`python manage.py import_ndjson`).
+
+Usage :
+    python -m benchmarks.bulk_import [--issues 100000] [--comments 2]
+        [--batch 1000]
+
+Génère un fichier NDJSON de `--projects` projets et `--issues` issues
+(`--comments` commentaires chacune), l'importe par lots de `--batch`
+lignes, puis affiche le débit (lignes/s) et le nombre de requêtes SQL
+par lot. `--memory` mesure aussi le pic mémoire (tracemalloc, qui
+ralentit l'import : débit à ignorer dans ce mode).
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import seed, setup_django
+
+
+def write_file(handle, users, projects, issues, comments):
+    """Écrit le fichier d'import (utilisateurs désignés par username)."""
+    names = [user.username for user in users]
+    for i in range(projects):
+        handle.write(json.dumps({
+            'model': 'project',
+            'ref': f'P{i}',
+            'name': f'Imported project {i}',
+            'description': 'Benchmark import',
+            'type': 'back-end',
+            'author': names[0],
+            'contributors': names[1:],
+        }) + '\n')
+    for i in range(issues):
+        handle.write(json.dumps({
+            'model': 'issue',
+            'project': f'P{i % projects}',
+            'title': f'Imported issue {i}',
+            'description': 'Benchmark import',
+            'priority': 'HIGH',
+            'tag': 'BUG',
+            'author': names[i % len(names)],
+            'assignee': names[(i + 1) % len(names)],
+            'comments': [
+                {'description': f'Comment {j}', 'author': names[j % len(names)]}
+                for j in range(comments)
+            ],
+        }) + '\n')
+    handle.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--projects', type=int, default=10)
+    parser.add_argument('--issues', type=int, default=100000)
+    parser.add_argument('--comments', type=int, default=2)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--memory', action='store_true')
+    parser.add_argument('--database', default=None)
+    args = parser.parse_args()
+
+    setup_django(args.database)
+
+    from django.db import connection
+
+    from tracker.imports import Importer
+    from tracker.models import ImportRun
+
+    data = seed(users=10, projects=0, issues=0)
+    with tempfile.NamedTemporaryFile('w+', suffix='.ndjson') as handle:
+        write_file(
+            handle, data['users'], args.projects, args.issues, args.comments
+        )
+        handle.seek(0)
+
+        run = ImportRun.objects.create(source='benchmark')
+        importer = Importer(run, batch_size=args.batch)
+        queries = []
+
+        def count_queries(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        if args.memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            importer.import_lines(handle)
+        seconds = time.perf_counter() - start
+        if args.memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    lines = args.projects + args.issues
+    batches = -(-lines // args.batch)
+    print(
+        f'{run.projects} projects, {run.issues} issues, '
+        f'{run.comments} comments, {run.errors} rejected'
+    )
+    print(f'Throughput : {lines / seconds:8.1f} lines/s ({seconds:.2f} s)')
+    print(f'Queries    : {len(queries) / batches:.1f} per batch')
+    if args.memory:
+        print(f'Peak memory: {peak / 1024 / 1024:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
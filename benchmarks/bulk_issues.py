@@ -0,0 +1,82 @@
+"""
+Débit de création d'issues : requêtes unitaires vs endpoint bulk.
+
+Usage :
+    python -m benchmarks.bulk_issues [--issues 2000] [--batch 500]
+
+Crée `--issues` issues d'abord une par une (POST .../issues/), puis par
+lots de `--batch` (POST .../issues/bulk/), via le handler WSGI de Django,
+et affiche le débit (issues/s) et le nombre de requêtes SQL de chaque mode.
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.common import seed, setup_django
+
+
+def run(client, url, payloads, batch):
+    """Envoie les payloads (un par requête si batch vaut 0)."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    start = time.perf_counter()
+    with CaptureQueriesContext(connection) as ctx:
+        if not batch:
+            for payload in payloads:
+                response = client.post(url, payload)
+                assert response.status_code == 201, response.content
+        else:
+            for offset in range(0, len(payloads), batch):
+                response = client.post(
+                    f'{url}bulk/',
+                    json.dumps(payloads[offset:offset + batch]),
+                    content_type='application/json',
+                )
+                assert response.status_code == 201, response.content
+    return time.perf_counter() - start, len(ctx.captured_queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--issues', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=500)
+    parser.add_argument('--database', default=None)
+    args = parser.parse_args()
+
+    setup_django(args.database)
+
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    data = seed(users=10, projects=1, issues=0)
+    project, user = data['projects'][0], data['users'][0]
+    assignee = data['users'][1]
+    client = Client(
+        HTTP_AUTHORIZATION=(
+            f'Bearer {RefreshToken.for_user(user).access_token}'
+        )
+    )
+    url = f'/api/v1/projects/{project.pk}/issues/'
+    payloads = [
+        {
+            'title': f'Imported issue {i}',
+            'description': 'Benchmark import',
+            'priority': 'HIGH',
+            'tag': 'BUG',
+            'assignee_id': assignee.pk,
+        }
+        for i in range(args.issues)
+    ]
+
+    for label, batch in (('single', 0), (f'bulk x{args.batch}', args.batch)):
+        seconds, queries = run(client, url, payloads, batch)
+        print(
+            f'{label:>12} : {args.issues / seconds:8.1f} issues/s, '
+            f'{queries} queries ({seconds:.2f} s)'
+        )
+
+
+if __name__ == '__main__':
+    main()
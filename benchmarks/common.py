@@ -0,0 +1,134 @@
+"""
+Outils partagés par les benchmarks : configuration Django et jeux de données.
+
+Les benchmarks utilisent leur propre base SQLite (par défaut
+`bench.sqlite3`) afin de ne jamais toucher à la base de développement.
+"""
+
+import os
+import random
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DATABASE = BASE_DIR / 'bench.sqlite3'
+
+
+def setup_django(database=None, options=None):
+    """
+    Configure Django sur la base de benchmark puis applique les migrations.
+
+    `database` : chemin d'un fichier SQLite (défaut : bench.sqlite3).
+    Si `DATABASE_URL` est défini, c'est cette base qui est utilisée.
+    `options` : surcharge de `DATABASES['default']['OPTIONS']`.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'softdesk.settings')
+    from django.conf import settings
+
+    default = settings.DATABASES['default']
+    if 'sqlite' in default['ENGINE']:
+        default['NAME'] = str(database or DEFAULT_DATABASE)
+    default['OPTIONS'].update(options or {})
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+@contextmanager
+def timer():
+    """Mesure une durée en secondes : `with timer() as elapsed: ...`."""
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result['seconds'] = time.perf_counter() - start
+
+
+def seed(users=50, projects=20, issues=1000, comments=0, batch_size=10000):
+    """
+    Vide la base puis la remplit avec un jeu de données aléatoire.
+
+    Chaque projet a tous les utilisateurs comme contributeurs ; les issues
+    et les commentaires sont insérés par lots avec `bulk_create` (compteurs
+    des projets tenus à jour).
+    Retourne un dictionnaire {'users', 'projects'} avec les instances créées.
+    """
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import transaction
+
+    call_command('flush', interactive=False, verbosity=0)
+
+    from tracker.models import Comment, Contributor, Issue, Project
+    from tracker.stats import record_created
+
+    User = get_user_model()
+    rng = random.Random(42)
+
+    with transaction.atomic():
+        user_objs = User.objects.bulk_create([
+            User(
+                username=f'bench-user-{i}',
+                email=f'bench-user-{i}@example.com',
+                age=30,
+            )
+            for i in range(users)
+        ])
+        project_objs = Project.objects.bulk_create([
+            Project(
+                name=f'Bench project {i}',
+                description='Benchmark',
+                type='back-end',
+                author=user_objs[i % users],
+            )
+            for i in range(projects)
+        ])
+        Contributor.objects.bulk_create([
+            Contributor(
+                user=user,
+                project=project,
+                role='author' if project.author_id == user.pk else
+                'contributor',
+            )
+            for project in project_objs
+            for user in user_objs
+        ])
+
+    statuses = [choice for choice, _ in Issue.STATUS_CHOICES]
+    priorities = [choice for choice, _ in Issue.PRIORITY_CHOICES]
+    tags = [choice for choice, _ in Issue.TAG_CHOICES]
+    for start in range(0, issues, batch_size):
+        with transaction.atomic():
+            record_created(Issue.objects.bulk_create([
+                Issue(
+                    project=rng.choice(project_objs),
+                    title=f'Issue {i}',
+                    description='Benchmark issue',
+                    priority=rng.choice(priorities),
+                    tag=rng.choice(tags),
+                    status=rng.choice(statuses),
+                    assignee=rng.choice(user_objs),
+                    author=rng.choice(user_objs),
+                )
+                for i in range(start, min(start + batch_size, issues))
+            ], batch_size=batch_size))
+
+    if comments:
+        issue_ids = list(Issue.objects.values_list('id', flat=True))
+        for start in range(0, comments, batch_size):
+            with transaction.atomic():
+                Comment.objects.bulk_create([
+                    Comment(
+                        issue_id=rng.choice(issue_ids),
+                        description=f'Comment {i}',
+                        author=rng.choice(user_objs),
+                    )
+                    for i in range(start, min(start + batch_size, comments))
+                ], batch_size=batch_size)
+
+    return {'users': user_objs, 'projects': project_objs}
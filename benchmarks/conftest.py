@@ -0,0 +1,362 @@
+"""
+Suite de benchmarks des endpoints : requêtes SQL, temps et mémoire.
+
+Usage :
+    pytest benchmarks/
+    # Réécrit la baseline (après une optimisation ou un nouvel endpoint)
+    pytest benchmarks/ --benchmark-update
+    # Machine plus lente que celle de la baseline
+    pytest benchmarks/ --benchmark-time-tolerance 4
+
+Deux jeux de données (`DATASETS` : utilisateurs x projets x issues x
+commentaires) sont créés une fois pour la session avec les fabriques de
+`tests/conftest.py`. Chaque scénario de `test_endpoints.py` envoie sa
+requête `--benchmark-rounds` fois, caches vidés, dans une transaction
+annulée ensuite (même état à chaque tour), et relève :
+- le nombre de requêtes SQL
+- le meilleur temps (ms)
+- le pic de mémoire allouée (KiB, tracemalloc, tour séparé)
+
+Comparaison à `benchmarks/baseline.json` : échec si le nombre de
+requêtes dépasse la baseline, ou si le temps / la mémoire dépassent la
+baseline au-delà de la tolérance. Le nombre de requêtes d'un scénario
+doit aussi être le même sur les deux jeux de données (requêtes N+1).
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tests.conftest import make_comment, make_issue, make_project, make_user
+
+BASELINE = Path(__file__).with_name('baseline.json')
+
+# Issues par projet, commentaires par issue
+DATASETS = {
+    'small': {'users': 4, 'projects': 2, 'issues': 5, 'comments': 2},
+    'large': {'users': 12, 'projects': 4, 'issues': 40, 'comments': 5},
+}
+PASSWORD = 'benchpass123'
+STATUSES = ['To Do', 'In Progress', 'Finished']
+PRIORITIES = ['LOW', 'MEDIUM', 'HIGH']
+TAGS = ['BUG', 'FEATURE', 'TASK']
+
+# Marges absolues ajoutées à la tolérance (petites valeurs bruitées)
+TIME_SLACK_MS = 5.0
+MEMORY_SLACK_KIB = 64.0
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption(
+        '--benchmark-update',
+        action='store_true',
+        help='Réécrit benchmarks/baseline.json avec les mesures.',
+    )
+    group.addoption(
+        '--benchmark-rounds',
+        type=int,
+        default=5,
+        help='Requêtes par scénario (meilleur temps retenu).',
+    )
+    group.addoption(
+        '--benchmark-time-tolerance',
+        type=float,
+        default=2.0,
+        help='Temps maximal, en multiple de la baseline.',
+    )
+    group.addoption(
+        '--benchmark-memory-tolerance',
+        type=float,
+        default=1.5,
+        help='Pic de mémoire maximal, en multiple de la baseline.',
+    )
+
+
+def seed_dataset(name, users, projects, issues, comments):
+    """
+    Jeu de données : tous les utilisateurs contribuent à tous les
+    projets ; le premier (`author`) est auteur du premier projet, de sa
+    première issue et du premier commentaire de celle-ci.
+    """
+    members = [
+        make_user(username=f'{name}-user-{i}', password=(
+            PASSWORD if i == 0 else None
+        ))
+        for i in range(users)
+    ]
+    data = SimpleNamespace(
+        name=name,
+        users=members,
+        author=members[0],
+        admin=make_user(username=f'{name}-admin', is_staff=True),
+        outsider=make_user(username=f'{name}-outsider'),
+        projects=[],
+        issues=[],
+        comments=[],
+    )
+    for p in range(projects):
+        project = make_project(
+            members[p % users],
+            contributors=members,
+            name=f'{name} project {p}',
+        )
+        data.projects.append(project)
+        for i in range(issues):
+            issue = make_issue(
+                project,
+                members[i % users],
+                title=f'Issue {i} of {project.name}',
+                status=STATUSES[i % 3],
+                priority=PRIORITIES[i % 3],
+                tag=TAGS[i % 3],
+                assignee=members[(i + 1) % users],
+            )
+            data.issues.append(issue)
+            for c in range(comments):
+                data.comments.append(make_comment(
+                    issue,
+                    members[(i + c) % users],
+                    description=f'Comment {c} on issue {i}',
+                ))
+    data.project = data.projects[0]
+    data.issue = data.issues[0]
+    data.comment = data.comments[0]
+    data.tokens = {
+        role: RefreshToken.for_user(user)
+        for role, user in (
+            ('author', data.author),
+            ('admin', data.admin),
+            ('outsider', data.outsider),
+        )
+    }
+    return data
+
+
+@pytest.fixture(scope='session')
+def datasets(django_db_setup, django_db_blocker):
+    """Jeux de données créés une fois (hors des transactions des tests)."""
+    with django_db_blocker.unblock():
+        data = {
+            name: seed_dataset(name, **sizes)
+            for name, sizes in DATASETS.items()
+        }
+    yield data
+    with django_db_blocker.unblock():
+        for dataset in data.values():
+            for user in [*dataset.users, dataset.admin, dataset.outsider]:
+                user.delete()
+
+
+@contextmanager
+def rolled_back():
+    """Transaction annulée à la sortie : chaque tour part du même état."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+class Measure:
+    """Mesures d'un scénario sur un jeu de données."""
+
+    def __init__(self, queries, time_ms, peak_kib):
+        self.queries = queries
+        self.time_ms = time_ms
+        self.peak_kib = peak_kib
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'time_ms': round(self.time_ms, 2),
+            'peak_kib': round(self.peak_kib, 1),
+        }
+
+
+class EndpointBenchmark:
+    """Exécute les scénarios, garde les mesures et les compare."""
+
+    def __init__(self, config):
+        self.update = config.getoption('--benchmark-update')
+        self.rounds = max(config.getoption('--benchmark-rounds'), 1)
+        self.time_tolerance = config.getoption('--benchmark-time-tolerance')
+        self.memory_tolerance = config.getoption(
+            '--benchmark-memory-tolerance'
+        )
+        self.baseline = {}
+        if BASELINE.exists():
+            self.baseline = json.loads(BASELINE.read_text(encoding='utf-8'))
+        # Jeu de données -> scénario -> Measure
+        self.results = {}
+
+    def send(self, scenario, data):
+        """Requête du scénario ; retourne la réponse, contenu lu."""
+        token = data.tokens.get(scenario.user)
+        path = scenario.get_path(data)
+        if scenario.stream:
+            # Flux SSE (vue asynchrone) : connexion et premier message
+            async def first_message():
+                headers = {}
+                if token is not None:
+                    headers['Authorization'] = f'Bearer {token.access_token}'
+                response = await AsyncClient().get(path, headers=headers)
+                if response.status_code == 200:
+                    stream = response.streaming_content
+                    await stream.__anext__()
+                    await stream.aclose()
+                return response
+            return async_to_sync(first_message)()
+
+        client = APIClient()
+        if token is not None:
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token.access_token}'
+            )
+        kwargs = {}
+        payload = scenario.get_payload(data)
+        if isinstance(payload, bytes):
+            kwargs = {'data': payload, 'content_type': scenario.content_type}
+        elif payload is not None:
+            kwargs = {'data': payload, 'format': 'json'}
+        response = getattr(client, scenario.method.lower())(path, **kwargs)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def check_status(self, scenario, response):
+        if response.status_code != scenario.status:
+            content = b'' if response.streaming else response.content[:500]
+            pytest.fail(
+                f'{scenario.name} : HTTP {response.status_code} '
+                f'(attendu {scenario.status}) {content!r}'
+            )
+
+    def run(self, scenario, data):
+        rounds = scenario.rounds or self.rounds
+        times, queries = [], None
+        for _ in range(rounds):
+            with rolled_back():
+                clear_caches()
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = self.send(scenario, data)
+                    times.append(time.perf_counter() - start)
+                self.check_status(scenario, response)
+            if queries is None:
+                queries = len(captured.captured_queries)
+
+        with rolled_back():
+            clear_caches()
+            tracemalloc.start()
+            try:
+                self.send(scenario, data)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        measure = Measure(queries, min(times) * 1000, peak / 1024)
+        self.results.setdefault(data.name, {})[scenario.name] = measure
+        return measure
+
+    def compare(self, dataset, scenario, measure):
+        """Échec si la mesure régresse par rapport à la baseline."""
+        if self.update:
+            return
+        expected = self.baseline.get(dataset, {}).get(scenario.name)
+        if expected is None:
+            pytest.fail(
+                f'{dataset} / {scenario.name} absent de la baseline : '
+                f'relancer avec --benchmark-update.'
+            )
+        problems = []
+        if measure.queries > expected['queries']:
+            problems.append(
+                f"requêtes SQL : {measure.queries} "
+                f"(baseline {expected['queries']})"
+            )
+        limit = expected['time_ms'] * self.time_tolerance + TIME_SLACK_MS
+        if measure.time_ms > limit:
+            problems.append(
+                f"temps : {measure.time_ms:.1f} ms "
+                f"(baseline {expected['time_ms']:.1f} ms, limite {limit:.1f})"
+            )
+        limit = (
+            expected['peak_kib'] * self.memory_tolerance + MEMORY_SLACK_KIB
+        )
+        if measure.peak_kib > limit:
+            problems.append(
+                f"mémoire : {measure.peak_kib:.0f} KiB "
+                f"(baseline {expected['peak_kib']:.0f} KiB, "
+                f"limite {limit:.0f})"
+            )
+        if problems:
+            pytest.fail(
+                f'{dataset} / {scenario.name} : ' + ' ; '.join(problems)
+            )
+
+    def write_baseline(self):
+        baseline = {
+            dataset: dict(sorted(
+                (name, measure.as_dict()) for name, measure in results.items()
+            ))
+            for dataset, results in self.results.items()
+        }
+        # Scénarios non exécutés (sélection -k) : valeurs conservées
+        for dataset, results in self.baseline.items():
+            for name, values in results.items():
+                baseline.setdefault(dataset, {}).setdefault(name, values)
+        BASELINE.write_text(
+            json.dumps(baseline, indent=2, sort_keys=True) + '\n',
+            encoding='utf-8',
+        )
+
+
+def pytest_configure(config):
+    config._endpoint_benchmark = EndpointBenchmark(config)
+
+
+@pytest.fixture(scope='session')
+def endpoint_benchmark(request):
+    return request.config._endpoint_benchmark
+
+
+def pytest_sessionfinish(session, exitstatus):
+    bench = session.config._endpoint_benchmark
+    # Baseline réécrite seulement si tous les scénarios ont réussi
+    if bench.update and bench.results and exitstatus == 0:
+        bench.write_baseline()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    bench = config._endpoint_benchmark
+    if not bench.results:
+        return
+    terminalreporter.section('endpoint benchmarks')
+    terminalreporter.write_line(
+        f"{'endpoint':<42} {'dataset':<7} {'queries':>7} "
+        f"{'time ms':>9} {'peak KiB':>9}"
+    )
+    for dataset, results in bench.results.items():
+        for name, measure in results.items():
+            terminalreporter.write_line(
+                f'{name:<42} {dataset:<7} {measure.queries:>7} '
+                f'{measure.time_ms:>9.2f} {measure.peak_kib:>9.1f}'
+            )
+    if bench.update and exitstatus == 0:
+        terminalreporter.write_line(f'Baseline written to {BASELINE}')
@@ -0,0 +1,176 @@
+"""
+Plans d'exécution des requêtes du tracker, avec et sans index composites.
+
+Usage :
+    python -m benchmarks.query_plans [--issues 1000000] [--comments 200000]
+                                     [--database bench.sqlite3] [--reseed]
+
+Le script remplit une base dédiée (une seule fois, sauf `--reseed`), puis
+pour chaque requête émise par l'API (construite par les ViewSets :
+select_related, annotations, filtres et pagination) affiche le plan
+`EXPLAIN` et la durée médiane, d'abord sans les index déclarés dans
+`Meta.indexes` (supprimés temporairement), puis avec.
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.common import seed, setup_django
+
+REPEAT = 5
+
+
+def list_page(viewset_class, user, params=None, **kwargs):
+    """
+    Requête de la page lue par l'action `list` de `viewset_class` :
+    queryset, filtres et tri de la vue, découpage de sa pagination.
+    """
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from tracker.pagination import KeysetPagination
+
+    request = Request(APIRequestFactory().get('/', params or {}))
+    request.user = user
+    view = viewset_class(
+        request=request,
+        args=(),
+        kwargs=kwargs,
+        action='list',
+        format_kwarg=None,
+    )
+    queryset = view.filter_queryset(view.get_queryset())
+    paginator = view.paginator
+    if isinstance(paginator, KeysetPagination):
+        if not paginator.use_page_number(request):
+            _, page = next(paginator.get_segments(queryset, request, view))
+            return page[:paginator.page_size_value + 1]
+        paginator = paginator.page_number
+    return queryset[:paginator.get_page_size(request)]
+
+
+def build_queries(project, issue, user):
+    """Requêtes émises par les endpoints (construites par les vues)."""
+    from tracker.models import Contributor
+    from tracker.views import CommentViewSet, IssueViewSet, ProjectViewSet
+
+    issues = {'project_pk': str(project.pk)}
+    return {
+        'issue list': list_page(IssueViewSet, user, **issues),
+        'issue list ?page=': list_page(
+            IssueViewSet, user, {'page': '1'}, **issues
+        ),
+        'issue list ?status=': list_page(
+            IssueViewSet, user, {'status': 'In Progress'}, **issues
+        ),
+        'issue list ?priority=': list_page(
+            IssueViewSet, user, {'priority': 'HIGH'}, **issues
+        ),
+        'issue list ?assignee=': list_page(
+            IssueViewSet, user, {'assignee': str(user.pk)}, **issues
+        ),
+        'comment list': list_page(
+            CommentViewSet,
+            user,
+            project_pk=str(project.pk),
+            issue_pk=str(issue.pk),
+        ),
+        'memberships (user)': Contributor.objects.filter(
+            user=user
+        ).order_by().values_list('project_id', 'role'),
+        'members (project)': Contributor.objects.filter(
+            project=project
+        ).order_by().values_list('user_id', 'role'),
+        'project list': list_page(ProjectViewSet, user),
+    }
+
+
+def measure(queryset):
+    """Durée médiane (ms) de l'évaluation du queryset."""
+    durations = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        list(queryset.all())
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def analyze():
+    """Rafraîchit les statistiques du planificateur."""
+    from django.db import connection
+
+    if connection.vendor in ('sqlite', 'postgresql'):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+def report(title, queries):
+    analyze()
+    print(f'\n=== {title} ===')
+    for name, queryset in queries.items():
+        print(f'\n-- {name} ({measure(queryset):.2f} ms)')
+        print(queryset.explain())
+
+
+def tracker_indexes():
+    """(modèle, index) pour chaque index déclaré dans Meta.indexes."""
+    from django.apps import apps
+
+    return [
+        (model, index)
+        for model in apps.get_app_config('tracker').get_models()
+        for index in model._meta.indexes
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--issues', type=int, default=1_000_000)
+    parser.add_argument('--comments', type=int, default=200_000)
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--database', default=None)
+    parser.add_argument('--reseed', action='store_true')
+    args = parser.parse_args()
+
+    setup_django(args.database)
+
+    from django.db import connection
+
+    from tracker.models import Comment, Contributor, Issue
+
+    if args.reseed or Issue.objects.count() < args.issues:
+        print(f'Seeding {args.issues} issues, {args.comments} comments...')
+        start = time.perf_counter()
+        seed(
+            users=args.users,
+            projects=args.projects,
+            issues=args.issues,
+            comments=args.comments,
+        )
+        print(f'Seeded in {time.perf_counter() - start:.1f} s')
+
+    # Issue/utilisateur les plus chargés : le pire cas des listes
+    issue = Comment.objects.values_list('issue', flat=True).first()
+    issue = Issue.objects.select_related('project').get(
+        pk=issue or Issue.objects.values_list('pk', flat=True).first()
+    )
+    user = Contributor.objects.filter(project=issue.project).first().user
+    queries = build_queries(issue.project, issue, user)
+
+    indexes = tracker_indexes()
+    with connection.schema_editor() as editor:
+        for model, index in indexes:
+            editor.remove_index(model, index)
+    try:
+        report('Without composite indexes', queries)
+    finally:
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+    report('With composite indexes', queries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Test de charge du flux SSE : abonnés simultanés tenus par un worker ASGI.
+
+Usage :
+    python -m benchmarks.sse_subscribers --subscribers 2000 --events 20
+
+Ouvre `--subscribers` connexions sur `/api/v1/events/` via l'application
+`softdesk.asgi` (sans réseau, dans une seule boucle asyncio, comme un
+worker uvicorn), puis crée `--events` issues depuis un autre thread. Le
+rapport donne le nombre d'abonnés tenus, la latence de diffusion
+(commit -> message reçu par chaque abonné, p50/p99/max) et la mémoire
+occupée par abonné.
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+import tracemalloc
+
+from benchmarks.common import seed, setup_django
+
+
+class Subscriber:
+    """Connexion ASGI simulée sur le flux d'événements."""
+
+    def __init__(self, application, token, project_id):
+        self.application = application
+        self.scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': '/api/v1/events/',
+            'raw_path': b'/api/v1/events/',
+            'query_string': f'project={project_id}'.encode('ascii'),
+            'headers': [
+                (b'host', b'testserver'),
+                (b'authorization', f'Bearer {token}'.encode('ascii')),
+            ],
+            'client': ('127.0.0.1', 0),
+            'server': ('testserver', 80),
+        }
+        self.connected = asyncio.Event()
+        self.status = None
+        self.received = []
+        self.request_sent = False
+
+    async def receive(self):
+        if not self.request_sent:
+            self.request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Le client reste connecté jusqu'à l'annulation de la tâche
+        await asyncio.Event().wait()
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+        elif message['type'] == 'http.response.body':
+            body = message.get('body', b'')
+            if body.startswith(b'retry:'):
+                self.connected.set()
+            elif b'event: issue' in body:
+                self.received.append(time.perf_counter())
+
+    async def run(self):
+        try:
+            await self.application(self.scope, self.receive, self.send)
+        finally:
+            self.connected.set()
+
+
+def publish_issues(project, author, count, interval, published):
+    """Crée les issues (une transaction chacune) depuis un autre thread."""
+    from django.db import connection
+
+    from tracker.models import Issue
+
+    try:
+        for i in range(count):
+            time.sleep(interval)
+            Issue.objects.create(
+                project=project,
+                title=f'Live issue {i}',
+                description='SSE load test',
+                author=author,
+            )
+            published.append(time.perf_counter())
+    finally:
+        connection.close()
+
+
+async def run(args, application, token, project, author):
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    subscribers = [
+        Subscriber(application, token, project.pk)
+        for _ in range(args.subscribers)
+    ]
+    tasks = [
+        asyncio.create_task(subscriber.run()) for subscriber in subscribers
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(*(s.connected.wait() for s in subscribers))
+    connect_seconds = time.perf_counter() - start
+    held = sum(1 for s in subscribers if s.status == 200)
+    memory = tracemalloc.get_traced_memory()[0] - baseline
+
+    published = []
+    publisher = threading.Thread(
+        target=publish_issues,
+        args=(project, author, args.events, args.interval, published),
+    )
+    publisher.start()
+    while publisher.is_alive():
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(args.drain)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    tracemalloc.stop()
+
+    latencies = []
+    delivered = 0
+    for subscriber in subscribers:
+        delivered += len(subscriber.received)
+        latencies.extend(
+            received - sent
+            for sent, received in zip(published, subscriber.received)
+        )
+    return {
+        'held': held,
+        'connect_seconds': connect_seconds,
+        'memory': memory,
+        'published': len(published),
+        'delivered': delivered,
+        'latencies': sorted(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--subscribers', type=int, default=1000)
+    parser.add_argument('--events', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=0.05)
+    parser.add_argument('--drain', type=float, default=1.0)
+    parser.add_argument('--database', default=None)
+    args = parser.parse_args()
+
+    setup_django(args.database)
+
+    from django.conf import settings
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from softdesk.asgi import application
+    from tracker.models import Project
+
+    settings.TRACKER_EVENTS_MAX_QUEUE = max(args.events, 10)
+    if not Project.objects.exists():
+        seed(users=10, projects=1, issues=100)
+    project = Project.objects.order_by('pk').first()
+    author = project.author
+    token = str(RefreshToken.for_user(author).access_token)
+    connection.close()
+
+    result = asyncio.run(run(args, application, token, project, author))
+
+    latencies = result['latencies']
+    expected = result['held'] * result['published']
+    print(f"Subscribers  : {result['held']} / {args.subscribers} held")
+    print(f"Connect      : {result['connect_seconds']:.2f} s")
+    print(
+        f"Memory       : {result['memory'] / max(result['held'], 1) / 1024:.1f}"
+        f" KiB per subscriber"
+    )
+    print(f"Events       : {result['published']} published")
+    print(f"Delivered    : {result['delivered']} / {expected} messages")
+    if not latencies:
+        print('No message delivered.')
+        return
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f'Fan-out p50  : {statistics.median(latencies) * 1000:.1f} ms')
+    print(f'Fan-out p99  : {p99 * 1000:.1f} ms')
+    print(f'Fan-out max  : {latencies[-1] * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
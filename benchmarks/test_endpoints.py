@@ -0,0 +1,370 @@
+"""
+Benchmarks des endpoints : un scénario par route et méthode principale.
+
+Voir `benchmarks/conftest.py` (jeux de données, mesures, baseline).
+Un nouvel endpoint doit recevoir son scénario : `test_every_route_is_
+benchmarked` échoue sinon.
+"""
+
+import json
+
+import pytest
+from django.urls import get_resolver, resolve
+
+from benchmarks.conftest import DATASETS, PASSWORD
+from tracker.changes import encode_token
+
+
+class Scenario:
+    """
+    Requête mesurée. `path` et `payload` : valeurs ou fonctions du jeu de
+    données ; `user` : 'author', 'admin', 'outsider' ou None (anonyme).
+
+    `constant` : même nombre de requêtes SQL sur tous les jeux de données.
+    """
+
+    def __init__(self, name, method, path, payload=None, user='author',
+                 status=200, content_type=None, rounds=None, stream=False,
+                 constant=True):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.payload = payload
+        self.user = user
+        self.status = status
+        self.content_type = content_type
+        self.rounds = rounds
+        self.stream = stream
+        self.constant = constant
+
+    def get_path(self, data):
+        return self.path(data) if callable(self.path) else self.path
+
+    def get_payload(self, data):
+        return self.payload(data) if callable(self.payload) else self.payload
+
+
+def project_url(data):
+    return f'/api/v1/projects/{data.project.pk}/'
+
+
+def issue_url(data):
+    return f'{project_url(data)}issues/{data.issue.pk}/'
+
+
+def comment_url(data):
+    return f'{issue_url(data)}comments/{data.comment.pk}/'
+
+
+def own_issue_ids(data):
+    """Issues du premier projet dont `author` est l'auteur."""
+    return [
+        issue.pk for issue in data.issues
+        if issue.project_id == data.project.pk
+        and issue.author_id == data.author.pk
+    ]
+
+
+def import_lines(data):
+    """Fichier NDJSON : un projet et cinq issues."""
+    author = data.author.username
+    lines = [{
+        'model': 'project',
+        'ref': 'bench',
+        'name': 'Imported',
+        'description': 'Benchmark',
+        'type': 'back-end',
+        'author': author,
+        'contributors': [data.users[1].username],
+    }]
+    lines += [
+        {
+            'model': 'issue',
+            'project': 'bench',
+            'title': f'Imported {i}',
+            'description': 'Benchmark',
+            'author': author,
+            'assignee': data.users[1].username,
+            'comments': [{'description': 'Imported', 'author': author}],
+        }
+        for i in range(5)
+    ]
+    return ''.join(json.dumps(line) + '\n' for line in lines).encode()
+
+
+SCENARIOS = [
+    # accounts/urls.py et jetons JWT
+    Scenario(
+        'POST register',
+        'POST',
+        '/api/v1/auth/register/',
+        lambda data: {
+            'username': f'{data.name}-new',
+            'email': f'{data.name}-new@example.com',
+            'age': 25,
+            'password': 'securepass123',
+            'password_confirm': 'securepass123',
+            'can_be_contacted': True,
+            'can_data_be_shared': False,
+        },
+        user=None,
+        status=201,
+        rounds=2,
+    ),
+    Scenario(
+        'GET register-profile', 'GET', '/api/v1/auth/register/profile/'
+    ),
+    Scenario(
+        'GET register-detail',
+        'GET',
+        lambda data: f'/api/v1/auth/register/{data.author.pk}/',
+    ),
+    Scenario('GET user-list', 'GET', '/api/v1/auth/users/'),
+    Scenario('GET user-profile', 'GET', '/api/v1/auth/users/profile/'),
+    Scenario(
+        'GET user-detail',
+        'GET',
+        lambda data: f'/api/v1/auth/users/{data.users[1].pk}/',
+    ),
+    Scenario(
+        'PATCH user-detail',
+        'PATCH',
+        lambda data: f'/api/v1/auth/users/{data.author.pk}/',
+        {'first_name': 'Bench'},
+    ),
+    Scenario(
+        'POST token',
+        'POST',
+        '/api/v1/auth/token/',
+        lambda data: {'username': data.author.username, 'password': PASSWORD},
+        user=None,
+        rounds=2,
+    ),
+    Scenario(
+        'POST token-refresh',
+        'POST',
+        '/api/v1/auth/token/refresh/',
+        lambda data: {'refresh': str(data.tokens['author'])},
+        user=None,
+    ),
+
+    # tracker/urls.py : projets
+    Scenario('GET api-root', 'GET', '/api/v1/'),
+    Scenario('GET project-list', 'GET', '/api/v1/projects/'),
+    Scenario(
+        'POST project-list',
+        'POST',
+        '/api/v1/projects/',
+        {'name': 'Bench', 'description': 'Benchmark', 'type': 'iOS'},
+        status=201,
+    ),
+    Scenario('GET project-detail', 'GET', project_url),
+    Scenario(
+        'PATCH project-detail',
+        'PATCH',
+        project_url,
+        {'description': 'Benchmark'},
+    ),
+    # Suppression en cascade : proportionnelle au contenu du projet
+    Scenario(
+        'DELETE project-detail',
+        'DELETE',
+        project_url,
+        status=204,
+        constant=False,
+    ),
+    Scenario(
+        'POST project-contributor',
+        'POST',
+        lambda data: f'{project_url(data)}contributor/',
+        lambda data: {'user_id': data.outsider.pk},
+        status=201,
+    ),
+    Scenario(
+        'DELETE project-contributor',
+        'DELETE',
+        lambda data: (
+            f'{project_url(data)}contributor/?user_id={data.users[1].pk}'
+        ),
+        status=204,
+    ),
+    Scenario(
+        'GET project-search',
+        'GET',
+        lambda data: f'{project_url(data)}search/?q=issue',
+    ),
+    Scenario(
+        'GET project-export',
+        'GET',
+        lambda data: f'{project_url(data)}export/?format=ndjson',
+    ),
+
+    # Issues
+    Scenario(
+        'GET issue-list', 'GET', lambda data: f'{project_url(data)}issues/'
+    ),
+    Scenario(
+        'GET issue-list ?status',
+        'GET',
+        lambda data: f'{project_url(data)}issues/?status=To+Do',
+    ),
+    Scenario(
+        'POST issue-list',
+        'POST',
+        lambda data: f'{project_url(data)}issues/',
+        lambda data: {
+            'title': 'Bench',
+            'description': 'Benchmark',
+            'assignee_id': data.users[1].pk,
+        },
+        status=201,
+    ),
+    Scenario(
+        'POST issue-bulk',
+        'POST',
+        lambda data: f'{project_url(data)}issues/bulk/',
+        lambda data: [
+            {
+                'title': f'Bulk {i}',
+                'description': 'Benchmark',
+                'assignee_id': data.users[1].pk,
+            }
+            for i in range(20)
+        ],
+        status=201,
+    ),
+    Scenario(
+        'PATCH issue-bulk',
+        'PATCH',
+        lambda data: f'{project_url(data)}issues/bulk/',
+        lambda data: [
+            {'id': pk, 'status': 'Finished'} for pk in own_issue_ids(data)
+        ],
+    ),
+    Scenario(
+        'DELETE issue-bulk',
+        'DELETE',
+        lambda data: f'{project_url(data)}issues/bulk/',
+        lambda data: {'ids': own_issue_ids(data)},
+        constant=False,
+    ),
+    Scenario('GET issue-detail', 'GET', issue_url),
+    Scenario(
+        'PATCH issue-detail', 'PATCH', issue_url, {'status': 'Finished'}
+    ),
+    Scenario('DELETE issue-detail', 'DELETE', issue_url, status=204),
+
+    # Commentaires
+    Scenario(
+        'GET comment-list', 'GET', lambda data: f'{issue_url(data)}comments/'
+    ),
+    Scenario(
+        'POST comment-list',
+        'POST',
+        lambda data: f'{issue_url(data)}comments/',
+        {'description': 'Benchmark'},
+        status=201,
+    ),
+    Scenario('GET comment-detail', 'GET', comment_url),
+    Scenario(
+        'PATCH comment-detail',
+        'PATCH',
+        comment_url,
+        {'description': 'Benchmark'},
+    ),
+    Scenario('DELETE comment-detail', 'DELETE', comment_url, status=204),
+
+    # Synchronisation, événements, import, cache
+    Scenario('GET sync', 'GET', '/api/v1/sync/'),
+    Scenario(
+        'GET sync ?since',
+        'GET',
+        f'/api/v1/sync/?since={encode_token(0)}&limit=500',
+    ),
+    Scenario(
+        'GET event-stream',
+        'GET',
+        lambda data: f'/api/v1/events/?project={data.project.pk}',
+        stream=True,
+    ),
+    Scenario('POST event-ticket', 'POST', '/api/v1/events/ticket/'),
+    Scenario('GET imports', 'GET', '/api/v1/imports/', user='admin'),
+    Scenario(
+        'POST imports',
+        'POST',
+        '/api/v1/imports/',
+        import_lines,
+        user='admin',
+        status=201,
+        content_type='application/x-ndjson',
+    ),
+    Scenario(
+        'GET response-cache-stats', 'GET', '/api/v1/cache/stats/',
+        user='admin',
+    ),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'dataset,scenario',
+    [(dataset, scenario) for dataset in DATASETS for scenario in SCENARIOS],
+    ids=lambda value: getattr(value, 'name', value),
+)
+def test_endpoint(dataset, scenario, datasets, endpoint_benchmark):
+    """Mesure le scénario et le compare à la baseline."""
+    measure = endpoint_benchmark.run(scenario, datasets[dataset])
+    endpoint_benchmark.compare(dataset, scenario, measure)
+
+    # Même nombre de requêtes que sur les jeux de données déjà mesurés
+    if scenario.constant:
+        for other, results in endpoint_benchmark.results.items():
+            previous = results.get(scenario.name)
+            if other != dataset and previous is not None:
+                assert measure.queries == previous.queries, (
+                    f'{scenario.name} : {measure.queries} requêtes sur '
+                    f'{dataset}, {previous.queries} sur {other} (N+1 ?)'
+                )
+
+
+# Routes inaccessibles : une route déclarée avant elles répond au même
+# chemin (action `IssueViewSet.comments`, masquée par `comment-list-create`)
+SHADOWED_ROUTES = {
+    'api/v1/projects/(?P<project_pk>[0-9a-f-]+)/issues/(?P<pk>[/.]+)/'
+    'comments/',
+}
+
+
+def api_routes():
+    """Routes des API, hors admin, suffixes de format et routes
+    masquées."""
+    def walk(patterns, prefix=''):
+        for pattern in patterns:
+            route = prefix + str(pattern.pattern)
+            if hasattr(pattern, 'url_patterns'):
+                yield from walk(pattern.url_patterns, route)
+            else:
+                yield route
+
+    routes = set()
+    for route in walk(get_resolver().url_patterns):
+        if not route.startswith('admin/') and 'format' not in route:
+            routes.add(normalize_route(route))
+    return routes - SHADOWED_ROUTES
+
+
+def normalize_route(route):
+    """Route sans ancres de regex (`ResolverMatch.route` retire les `^`
+    des routes incluses)."""
+    return route.replace('^', '').replace('$', '')
+
+
+def test_every_route_is_benchmarked(datasets):
+    """Chaque route de tracker/urls.py et accounts/urls.py a un scénario."""
+    data = datasets['small']
+    covered = {
+        normalize_route(resolve(path.split('?')[0]).route)
+        for path in (scenario.get_path(data) for scenario in SCENARIOS)
+    }
+    missing = api_routes() - covered
+    assert not missing, f'Routes sans scénario : {sorted(missing)}'
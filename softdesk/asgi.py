@@ -1,5 +1,8 @@
 """
 Configuration ASGI pour le projet softdesk.
+
+Sous ASGI, les lectures du tracker sont servies par des vues asynchrones
+(`TRACKER_ASYNC_READS`, voir `tracker/async_views.py`).
 """
 
 import os
@@ -7,5 +10,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'softdesk.settings')
+os.environ.setdefault('TRACKER_ASYNC_READS', 'True')
 
 application = get_asgi_application()
@@ -0,0 +1,3 @@
+"""
+Backends de base de données personnalisés du projet softdesk.
+"""
@@ -0,0 +1,36 @@
+"""
+Backend SQLite ajusté pour l'usage local.
+
+Identique au backend Django, mais applique à chaque connexion des PRAGMA
+adaptés à plusieurs workers : journal WAL (lectures concurrentes pendant
+une écriture), synchronous=NORMAL, cache et fichiers temporaires en
+mémoire. Les valeurs se surchargent via `OPTIONS['pragmas']`.
+
+L'attente d'un verrou d'écriture n'est pas un PRAGMA : c'est
+`OPTIONS['timeout']` (`SQLITE_TIMEOUT`), passé à `sqlite3.connect`.
+"""
+
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+    'mmap_size': 134217728,
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Backend SQLite avec PRAGMA de performance."""
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = {**DEFAULT_PRAGMAS, **kwargs.pop('pragmas', {})}
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
@@ -0,0 +1,189 @@
+"""
+Instrumentation des requêtes HTTP (désactivée par défaut).
+
+Avec `REQUEST_INSTRUMENTATION`, `RequestInstrumentationMiddleware`
+relève pour chaque requête :
+- le nombre de requêtes SQL et leur durée totale
+- le temps passé dans les sérialiseurs DRF (`serializer.data`, hors
+  sérialiseurs imbriqués déjà comptés)
+- le temps de la vue, rendu compris, et le temps total
+- les requêtes SQL identiques (même SQL, mêmes paramètres) exécutées
+  plusieurs fois
+
+Les mesures sont renvoyées dans l'en-tête `Server-Timing` (affiché par
+les outils de développement des navigateurs) et journalisées en une
+ligne JSON par requête (logger `softdesk.instrumentation` : INFO, ou
+WARNING si des requêtes sont dupliquées).
+
+Désactivé, le middleware se retire de la chaîne au démarrage
+(`MiddlewareNotUsed`) : aucun coût par requête. Activé, il est
+synchrone (sous ASGI, Django l'exécute dans un thread).
+"""
+
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger('softdesk.instrumentation')
+
+# SQL des requêtes dupliquées tronqué dans les logs
+MAX_SQL_LENGTH = 500
+
+_recorder = ContextVar('request_instrumentation', default=None)
+
+
+class Recorder:
+    """Mesures d'une requête HTTP."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.view_start = None
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        # (alias, SQL, paramètres) -> exécutions
+        self.queries = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        """Wrapper d'exécution SQL (`connection.execute_wrapper`)."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            alias = context['connection'].alias
+            self.queries[(alias, sql, repr(params))] += 1
+
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+
+    def duplicates(self):
+        """[{"sql", "count"}] des requêtes exécutées plusieurs fois."""
+        return [
+            {'sql': sql[:MAX_SQL_LENGTH], 'count': count}
+            for (_, sql, _), count in self.queries.most_common()
+            if count > 1
+        ]
+
+
+def timed_data(data):
+    """`BaseSerializer.data` chronométré (sérialiseur le plus externe)."""
+
+    def wrapper(self):
+        recorder = _recorder.get()
+        if recorder is None or recorder.serializing:
+            return data(self)
+        recorder.serializing = True
+        start = time.perf_counter()
+        try:
+            return data(self)
+        finally:
+            recorder.serializer_time += time.perf_counter() - start
+            recorder.serializing = False
+
+    wrapper.instrumented = True
+    return wrapper
+
+
+def instrument_serializers():
+    """Enveloppe `BaseSerializer.data` (une seule fois)."""
+    data = BaseSerializer.data.fget
+    if not getattr(data, 'instrumented', False):
+        BaseSerializer.data = property(timed_data(data))
+
+
+@contextmanager
+def execute_wrapper(wrapper):
+    """`connection.execute_wrapper` sur toutes les connexions du thread."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Mesures par requête : en-tête `Server-Timing` et log structuré.
+
+    À placer en tête de `MIDDLEWARE` : le temps total couvre alors les
+    autres middlewares.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        instrument_serializers()
+
+    def __call__(self, request):
+        recorder = Recorder()
+        request._instrumentation = recorder
+        token = _recorder.set(recorder)
+        try:
+            with execute_wrapper(recorder):
+                response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+
+        end = time.perf_counter()
+        view_time = end - (recorder.view_start or end)
+        total_time = end - recorder.start
+        duplicates = recorder.duplicates()
+        response['Server-Timing'] = self.server_timing(
+            recorder, view_time, total_time, duplicates
+        )
+        self.log(request, response, recorder, view_time, total_time,
+                 duplicates)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._instrumentation.view_start = time.perf_counter()
+
+    @staticmethod
+    def server_timing(recorder, view_time, total_time, duplicates):
+        metrics = [
+            f'db;dur={milliseconds(recorder.db_time)};'
+            f'desc="{recorder.query_count} queries"',
+            f'serializer;dur={milliseconds(recorder.serializer_time)}',
+            f'view;dur={milliseconds(view_time)}',
+            f'total;dur={milliseconds(total_time)}',
+        ]
+        if duplicates:
+            extra = sum(item['count'] - 1 for item in duplicates)
+            metrics.append(f'dup;desc="{extra} duplicate queries"')
+        return ', '.join(metrics)
+
+    @staticmethod
+    def log(request, response, recorder, view_time, total_time,
+            duplicates):
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match is not None else None,
+            'status': response.status_code,
+            'queries': recorder.query_count,
+            'db_ms': milliseconds(recorder.db_time),
+            'serializer_ms': milliseconds(recorder.serializer_time),
+            'view_ms': milliseconds(view_time),
+            'total_ms': milliseconds(total_time),
+            'duplicate_queries': duplicates,
+        }
+        logger.log(
+            logging.WARNING if duplicates else logging.INFO,
+            json.dumps(record),
+            extra={'instrumentation': record},
+        )
@@ -0,0 +1,352 @@
+"""
+Métriques de l'API au format texte Prometheus (`GET /metrics`).
+
+Avec `METRICS_ENABLED`, `MetricsMiddleware` (en tête de `MIDDLEWARE`,
+inactif sinon) relève chaque requête sous le nom de son handler
+(`ProjectViewSet.list`, `IssueViewSet.retrieve`,
+`ProjectViewSet.contributor`, `SyncView.get`...) :
+- softdesk_http_requests_total{handler, method, status}
+- softdesk_http_request_duration_seconds{handler} (histogramme)
+- softdesk_db_queries{handler} (histogramme des requêtes SQL par requête)
+- softdesk_auth_failures_total{handler, reason} (réponses 401)
+
+Lus à la collecte : compteurs du cache des réponses
+(`softdesk_response_cache_*`, voir `tracker/response_cache.py`).
+
+Plusieurs process (gunicorn) : avec `METRICS_DIR`, chaque process écrit
+ses valeurs dans `<METRICS_DIR>/metrics-<pid>.json`, par un thread et
+au plus une fois par `METRICS_FLUSH_INTERVAL` secondes (hors du chemin
+des requêtes, remplacement atomique). `/metrics` additionne les
+fichiers de tous les process ; ceux des process arrêtés sont gardés
+pour que les compteurs ne reculent pas : vider le répertoire au
+démarrage du service. Sans `METRICS_DIR`, valeurs du process seul.
+
+`METRICS_TOKEN` : si défini, `/metrics` exige
+`Authorization: Bearer <token>`.
+"""
+
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from tracker import response_cache
+
+from .instrumentation import execute_wrapper
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 50, 100)
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+# Nom -> (type, aide, seuils des histogrammes)
+METRICS = {
+    'softdesk_http_requests_total': (
+        'counter', 'HTTP requests handled.', None
+    ),
+    'softdesk_http_request_duration_seconds': (
+        'histogram', 'HTTP request duration in seconds.', DURATION_BUCKETS
+    ),
+    'softdesk_db_queries': (
+        'histogram', 'SQL queries per HTTP request.', QUERY_BUCKETS
+    ),
+    'softdesk_auth_failures_total': (
+        'counter', 'Authentication failures (401 responses).', None
+    ),
+}
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Registry:
+    """
+    Valeurs du process courant : (nom, labels) -> valeur d'un compteur,
+    ou [compte par seuil..., +Inf, somme] d'un histogramme.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.directory = None
+        self.interval = 1.0
+        self.flush_at_exit = False
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.values = {}
+        self.timer = None
+
+    def configure(self, directory, interval):
+        self.directory = Path(directory) if directory else None
+        self.interval = interval
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if not self.flush_at_exit:
+                atexit.register(self.flush)
+                self.flush_at_exit = True
+
+    def check_fork(self):
+        # Process enfant (fork) : les valeurs du parent ne sont pas les
+        # siennes
+        if self.pid != os.getpid():
+            self.reset()
+
+    def inc(self, name, labels, amount=1):
+        with self.lock:
+            self.check_fork()
+            key = (name, labels)
+            self.values[key] = self.values.get(key, 0) + amount
+            self.schedule_flush()
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        with self.lock:
+            self.check_fork()
+            counts = self.values.get((name, labels))
+            if counts is None:
+                counts = self.values[(name, labels)] = (
+                    [0] * (len(buckets) + 1) + [0]
+                )
+            counts[bisect_left(buckets, value)] += 1
+            counts[-1] += value
+            self.schedule_flush()
+
+    def snapshot(self):
+        with self.lock:
+            self.check_fork()
+            return [
+                [name, [list(label) for label in labels],
+                 list(value) if isinstance(value, list) else value]
+                for (name, labels), value in self.values.items()
+            ]
+
+    def filename(self):
+        return f'metrics-{os.getpid()}.json'
+
+    def schedule_flush(self):
+        """Écriture différée du fichier du process (appelé sous `lock`)."""
+        if self.directory is None or self.timer is not None:
+            return
+        self.timer = threading.Timer(self.interval, self.flush)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def flush(self):
+        if self.directory is None:
+            return
+        with self.flush_lock:
+            with self.lock:
+                self.timer = None
+            data = json.dumps(self.snapshot())
+            path = self.directory / self.filename()
+            temporary = path.with_name(f'.{path.name}.tmp')
+            try:
+                temporary.write_text(data, encoding='utf-8')
+                os.replace(temporary, path)
+            except OSError:
+                # Répertoire supprimé (arrêt du service) : réécrit au
+                # prochain passage
+                pass
+
+
+registry = Registry()
+
+
+def merge(sources):
+    """Additionne les valeurs de plusieurs process."""
+    values = {}
+    for source in sources:
+        for name, labels, value in source:
+            key = (name, tuple(tuple(label) for label in labels))
+            current = values.get(key)
+            if current is None:
+                values[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, list):
+                values[key] = [a + b for a, b in zip(current, value)]
+            else:
+                values[key] = current + value
+    return values
+
+
+def collect():
+    """Valeurs de tous les process (fichiers de `METRICS_DIR`)."""
+    sources = [registry.snapshot()]
+    if registry.directory is not None:
+        own = registry.filename()
+        for path in registry.directory.glob('metrics-*.json'):
+            if path.name == own:
+                continue
+            try:
+                sources.append(json.loads(path.read_text(encoding='utf-8')))
+            except (OSError, ValueError):
+                # Fichier supprimé entre-temps
+                continue
+    return merge(sources)
+
+
+def format_value(value):
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        return repr(value)
+    return str(value)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', r'\\').replace(
+            '"', r'\"'
+        ).replace('\n', r'\n'))
+        for key, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+def sample(name, labels, value):
+    return f'{name}{format_labels(labels)} {format_value(value)}'
+
+
+def render(values):
+    """Texte d'exposition Prometheus."""
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for (metric, labels), value in sorted(values.items()):
+            if metric != name:
+                continue
+            if kind != 'histogram':
+                lines.append(sample(name, labels, value))
+                continue
+            cumulative = 0
+            for bound, count in zip([*buckets, '+Inf'], value):
+                cumulative += count
+                lines.append(sample(
+                    f'{name}_bucket',
+                    (*labels, ('le', format_value(bound))),
+                    cumulative,
+                ))
+            lines.append(sample(f'{name}_sum', labels, value[-1]))
+            lines.append(sample(f'{name}_count', labels, cumulative))
+
+    # Partagé entre les process si le cache des réponses l'est (Redis)
+    stats = response_cache.get_stats()
+    ratio = stats['hit_ratio']
+    for name, kind, help_text, value in [
+        ('softdesk_response_cache_hits_total', 'counter',
+         'Response cache hits.', stats['hits']),
+        ('softdesk_response_cache_misses_total', 'counter',
+         'Response cache misses.', stats['misses']),
+        ('softdesk_response_cache_hit_ratio', 'gauge',
+         'Response cache hit ratio.',
+         float('nan') if ratio is None else float(ratio)),
+    ]:
+        lines += [
+            f'# HELP {name} {help_text}',
+            f'# TYPE {name} {kind}',
+            sample(name, (), value),
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def handler_name(request):
+    """
+    `ViewSet.action` (ou `Vue.méthode`) de la requête ; les vues
+    asynchrones sont comptées sous le ViewSet qu'elles servent.
+    """
+    match = request.resolver_match
+    if match is None:
+        return 'unmatched'
+    func = match.func
+    view = getattr(func, 'cls', None) or getattr(func, 'view_class', None)
+    if view is None:
+        return getattr(func, '__name__', 'unknown')
+    method = request.method.lower()
+    actions = getattr(func, 'actions', None) or getattr(view, 'actions', None)
+    view = getattr(view, 'viewset_class', None) or view
+    return f'{view.__name__}.{(actions or {}).get(method, method)}'
+
+
+def failure_reason(response):
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict) and data.get('code'):
+        return str(data['code'])
+    return 'unauthorized'
+
+
+class QueryCounter:
+    """Wrapper d'exécution SQL : compte les requêtes."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def record_request(request, response, duration, queries):
+    handler = handler_name(request)
+    method = request.method if request.method in METHODS else 'other'
+    registry.inc('softdesk_http_requests_total', (
+        ('handler', handler),
+        ('method', method),
+        ('status', str(response.status_code)),
+    ))
+    registry.observe(
+        'softdesk_http_request_duration_seconds',
+        (('handler', handler),),
+        duration,
+    )
+    registry.observe('softdesk_db_queries', (('handler', handler),), queries)
+    if response.status_code == 401:
+        registry.inc('softdesk_auth_failures_total', (
+            ('handler', handler),
+            ('reason', failure_reason(response)),
+        ))
+
+
+class MetricsMiddleware:
+    """Relève chaque requête dans `registry` (si `METRICS_ENABLED`)."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        registry.configure(
+            getattr(settings, 'METRICS_DIR', ''),
+            getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0),
+        )
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with execute_wrapper(counter):
+            response = self.get_response(request)
+        record_request(
+            request, response, time.perf_counter() - start, counter.count
+        )
+        return response
+
+
+@require_GET
+def metrics_view(request):
+    """GET /metrics : métriques de tous les process."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and not constant_time_compare(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
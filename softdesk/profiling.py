@@ -0,0 +1,297 @@
+"""
+Profileur par échantillonnage des endpoints (désactivé par défaut).
+
+Avec `PROFILER_ENABLED`, `ProfilerMiddleware` profile une requête vers
+une vue de `tracker.views` ou `accounts.views` (les vues asynchrones de
+`tracker.async_views` comptent pour le ViewSet qu'elles servent) :
+- tirée au sort, avec la probabilité `PROFILER_SAMPLE_RATE` (0 à 1)
+- ou marquée par l'en-tête `X-Profile: <PROFILER_TOKEN>` (ignoré si
+  `PROFILER_TOKEN` est vide) ; la réponse indique alors le fichier
+  écrit (`X-Profile-File`)
+
+Pendant une requête profilée, un thread relève la pile du thread de la
+requête toutes les `PROFILER_INTERVAL` secondes (`sys._current_frames`,
+à partir du middleware). Les piles sont écrites à la fin de la requête
+dans `PROFILER_DIR/<handler>/`, au format `PROFILER_FORMAT` :
+- `collapsed` : une ligne `frame;frame;frame nombre` par pile
+  (flamegraph.pl, speedscope, inferno...)
+- `speedscope` : profil JSON `sampled` (https://www.speedscope.app)
+
+Le thread d'échantillonnage attend le GIL : en dessous de
+`sys.getswitchinterval()` (5 ms par défaut), l'intervalle effectif est
+celui-ci. Hors requête profilée, le coût est un tirage au sort et la
+lecture d'un en-tête. `python manage.py profile_hotspots` agrège les fichiers par
+endpoint.
+
+Sous ASGI, le thread profilé attend les vues asynchrones sans les
+exécuter : les piles ne couvrent que le code synchrone.
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.crypto import constant_time_compare
+
+from .metrics import handler_name
+
+PROFILED_MODULES = ('tracker.views', 'accounts.views')
+HEADER = 'X-Profile'
+FORMATS = {'collapsed': '.collapsed', 'speedscope': '.speedscope.json'}
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+
+class Sampler(threading.Thread):
+    """
+    Relève la pile d'un thread à intervalle fixe.
+
+    `samples` : pile (codes, de l'appelant à l'appelé, sous `root`) ->
+    nombre d'échantillons.
+    """
+
+    def __init__(self, thread_id, root, interval):
+        super().__init__(name='softdesk-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.samples = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = []
+            while frame is not None and frame is not self.root:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if self.stopped.is_set():
+                # Requête terminée : pile de `stop()`
+                return
+            self.samples[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def short_path(filename):
+    """Chemin relatif au projet ou à site-packages."""
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        return filename[len(base):]
+    _, found, rest = filename.rpartition('site-packages' + os.sep)
+    return rest if found else filename
+
+
+def frame_name(code):
+    return f'{short_path(code.co_filename)}:{code.co_name}'
+
+
+def view_module(view_func):
+    """Module de la vue (celui du ViewSet pour une vue asynchrone)."""
+    view = (
+        getattr(view_func, 'cls', None)
+        or getattr(view_func, 'view_class', None)
+    )
+    view = getattr(view, 'viewset_class', None) or view or view_func
+    return view.__module__
+
+
+def collapsed(samples):
+    """Lignes `frame;frame;frame nombre`."""
+    return ''.join(
+        ';'.join(frame_name(code) for code in stack) + f' {count}\n'
+        for stack, count in samples.items()
+        if stack
+    )
+
+
+def speedscope(samples, name, interval):
+    """Profil speedscope `sampled` (poids en millisecondes)."""
+    frames, indexes = [], {}
+    stacks, weights = [], []
+    for stack, count in samples.items():
+        if not stack:
+            continue
+        path = []
+        for code in stack:
+            label = frame_name(code)
+            if label not in indexes:
+                indexes[label] = len(frames)
+                frames.append({
+                    'name': code.co_name,
+                    'file': short_path(code.co_filename),
+                    'line': code.co_firstlineno,
+                })
+            path.append(indexes[label])
+        stacks.append(path)
+        weights.append(round(count * interval * 1000, 3))
+    return json.dumps({
+        '$schema': SPEEDSCOPE_SCHEMA,
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': round(sum(weights), 3),
+            'samples': stacks,
+            'weights': weights,
+        }],
+        'name': name,
+        'exporter': 'softdesk.profiling',
+    })
+
+
+def write_profile(directory, handler, samples, interval, output_format):
+    """Écrit le profil ; retourne son chemin (None sans échantillon)."""
+    if not any(stack for stack in samples):
+        return None
+    folder = Path(directory) / handler
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / '{}-{}-{}{}'.format(
+        time.strftime('%Y%m%dT%H%M%S'),
+        os.getpid(),
+        uuid.uuid4().hex[:8],
+        FORMATS[output_format],
+    )
+    if output_format == 'speedscope':
+        content = speedscope(samples, handler, interval)
+    else:
+        content = collapsed(samples)
+    path.write_text(content, encoding='utf-8')
+    return path
+
+
+def read_profile(path, interval):
+    """
+    Piles d'un fichier de profil : {(frame, ...): millisecondes}.
+
+    `interval` (secondes) convertit les nombres d'échantillons des
+    fichiers `collapsed`.
+    """
+    path = Path(path)
+    stacks = Counter()
+    if path.name.endswith(FORMATS['speedscope']):
+        data = json.loads(path.read_text(encoding='utf-8'))
+        names = [
+            f"{frame['file']}:{frame['name']}"
+            for frame in data['shared']['frames']
+        ]
+        for profile in data['profiles']:
+            for sample, weight in zip(profile['samples'], profile['weights']):
+                stacks[tuple(names[index] for index in sample)] += weight
+        return stacks
+    for line in path.read_text(encoding='utf-8').splitlines():
+        stack, _, count = line.rpartition(' ')
+        if stack and count.isdigit():
+            stacks[tuple(stack.split(';'))] += int(count) * interval * 1000
+    return stacks
+
+
+def load_profiles(directory, interval, endpoint=None):
+    """
+    Profils de `directory` agrégés par endpoint :
+    {handler: (nombre de fichiers, {pile: millisecondes})}.
+    """
+    endpoints = {}
+    for folder in sorted(Path(directory).iterdir()):
+        if not folder.is_dir() or endpoint not in (None, folder.name):
+            continue
+        files, stacks = 0, Counter()
+        for path in folder.iterdir():
+            if path.name.endswith(tuple(FORMATS.values())):
+                stacks.update(read_profile(path, interval))
+                files += 1
+        if files:
+            endpoints[folder.name] = (files, stacks)
+    return endpoints
+
+
+def hot_spots(stacks):
+    """
+    Temps propre (frame en haut de pile) et inclusif (frame présent dans
+    la pile) de chaque frame : [(frame, propre, inclusif)], par temps
+    propre décroissant.
+    """
+    own, inclusive = Counter(), Counter()
+    for stack, weight in stacks.items():
+        own[stack[-1]] += weight
+        for frame in set(stack):
+            inclusive[frame] += weight
+    return sorted(
+        ((frame, own[frame], inclusive[frame]) for frame in inclusive),
+        key=lambda item: (-item[1], -item[2], item[0]),
+    )
+
+
+class ProfilerMiddleware:
+    """Profile une fraction des requêtes (si `PROFILER_ENABLED`)."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0.0)
+        self.token = getattr(settings, 'PROFILER_TOKEN', '')
+        self.interval = getattr(settings, 'PROFILER_INTERVAL', 0.005)
+        self.directory = getattr(settings, 'PROFILER_DIR', 'profiles')
+        self.format = getattr(settings, 'PROFILER_FORMAT', 'collapsed')
+        if self.format not in FORMATS:
+            raise ValueError(
+                f'PROFILER_FORMAT inconnu : {self.format} '
+                f'({", ".join(FORMATS)}).'
+            )
+
+    def requested(self, request):
+        """Profil demandé par l'en-tête (avec le bon jeton) ?"""
+        value = request.headers.get(HEADER)
+        return bool(
+            value and self.token and constant_time_compare(value, self.token)
+        )
+
+    def __call__(self, request):
+        requested = self.requested(request)
+        if not requested and not (
+            self.sample_rate and random.random() < self.sample_rate
+        ):
+            return self.get_response(request)
+
+        # Piles relevées sous ce frame ; échantillonnage démarré par
+        # process_view si la vue est profilée
+        request._profiler = Sampler(
+            threading.get_ident(), sys._getframe(), self.interval
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler = request._profiler
+            if sampler.is_alive():
+                sampler.stop()
+
+        if sampler.ident is not None:
+            path = write_profile(
+                self.directory,
+                handler_name(request),
+                sampler.samples,
+                self.interval,
+                self.format,
+            )
+            if requested and path is not None:
+                response['X-Profile-File'] = str(path)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        sampler = getattr(request, '_profiler', None)
+        if sampler is not None and view_module(view_func) in PROFILED_MODULES:
+            sampler.start()
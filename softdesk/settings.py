@@ -12,6 +12,8 @@ from pathlib import Path
 from datetime import timedelta
 from decouple import config, Csv
 
+from .database import database_config
+
 # Construit les chemins internes au projet
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +46,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Inactifs sauf avec METRICS_ENABLED / REQUEST_INSTRUMENTATION /
+    # PROFILER_ENABLED
+    'softdesk.metrics.MetricsMiddleware',
+    'softdesk.instrumentation.RequestInstrumentationMiddleware',
+    'softdesk.profiling.ProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,11 +81,10 @@ TEMPLATES = [
 WSGI_APPLICATION = 'softdesk.wsgi.application'
 
 # Base de données
+# - Local : SQLite (WAL + PRAGMA ajustés)
+# - Production : DATABASE_URL (PostgreSQL, connexions persistantes/pool)
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(BASE_DIR),
 }
 
 # Validation des mots de passe
@@ -129,7 +135,7 @@ AUTH_USER_MODEL = 'accounts.CustomUser'
 # - Pagination globale : 10 items par page (StandardPagination)
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -141,6 +147,7 @@ REST_FRAMEWORK = {
 # Configuration JWT (Simple JWT)
 # - Access token : 60 minutes
 # - Refresh token : 1 jour
+# - Claims username/email/token_version (authentification sans requête)
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -148,8 +155,25 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
+    'TOKEN_OBTAIN_SERIALIZER': (
+        'accounts.serializers.CustomTokenObtainPairSerializer'
+    ),
+    'TOKEN_REFRESH_SERIALIZER': (
+        'accounts.serializers.CustomTokenRefreshSerializer'
+    ),
 }
 
+# Cache de l'état des tokens (version, is_active) en secondes, invalidé à
+# chaque sauvegarde de l'utilisateur. Avec un cache `default` local par
+# process, une révocation faite dans un autre worker s'applique au plus
+# tard après ce délai (cache partagé en production pour une révocation
+# immédiate). 0 = utilisateur lu en base à chaque requête.
+AUTH_TOKEN_STATE_CACHE_TIMEOUT = config(
+    'AUTH_TOKEN_STATE_CACHE_TIMEOUT',
+    default=60,
+    cast=int,
+)
+
 # HTTPS (sécurité en production)
 SECURE_SSL_REDIRECT = config('SECURE_SSL_REDIRECT', default=False, cast=bool)
 SESSION_COOKIE_SECURE = config(
@@ -158,3 +182,131 @@ SESSION_COOKIE_SECURE = config(
     cast=bool,
 )
 CSRF_COOKIE_SECURE = config('CSRF_COOKIE_SECURE', default=False, cast=bool)
+
+# Cache process des appartenances (Contributor) en secondes
+# 0 = désactivé (un seul chargement par requête)
+TRACKER_MEMBERSHIP_CACHE_TIMEOUT = config(
+    'TRACKER_MEMBERSHIP_CACHE_TIMEOUT',
+    default=0,
+    cast=int,
+)
+
+# Cache des réponses des listes projets/issues (tracker/response_cache.py)
+# - TRACKER_RESPONSE_CACHE_TIMEOUT en secondes, 0 = désactivé (défaut)
+# - Une valeur non nulle exige un cache partagé entre les workers (les
+#   versions des projets y sont incrémentées), par ex. :
+#   TRACKER_RESPONSE_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   TRACKER_RESPONSE_CACHE_LOCATION=redis://127.0.0.1:6379/1
+#   Sinon (LocMemCache : un cache par process), le démarrage échoue
+#   (ImproperlyConfigured) : les autres workers serviraient des pages
+#   périmées après une écriture
+TRACKER_RESPONSE_CACHE_ALIAS = 'tracker'
+TRACKER_RESPONSE_CACHE_TIMEOUT = config(
+    'TRACKER_RESPONSE_CACHE_TIMEOUT',
+    default=0,
+    cast=int,
+)
+TRACKER_RESPONSE_CACHE_BACKEND = config(
+    'TRACKER_RESPONSE_CACHE_BACKEND',
+    default='django.core.cache.backends.locmem.LocMemCache',
+)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    TRACKER_RESPONSE_CACHE_ALIAS: {
+        'BACKEND': TRACKER_RESPONSE_CACHE_BACKEND,
+        'LOCATION': config(
+            'TRACKER_RESPONSE_CACHE_LOCATION',
+            default='tracker-responses',
+        ),
+    },
+}
+
+# Diffusion en direct (tracker/events.py, tracker/streams.py)
+# - TRACKER_EVENT_BROKER : classe du broker (en mémoire par défaut, un
+#   seul process ; un broker externe relaie entre les workers)
+# - TRACKER_EVENTS_MAX_QUEUE : événements en attente par abonné
+# - TRACKER_EVENTS_MAX_STREAM_SECONDS : durée maximale d'un flux SSE
+TRACKER_EVENT_BROKER = config(
+    'TRACKER_EVENT_BROKER',
+    default='tracker.events.InProcessBroker',
+)
+TRACKER_EVENTS_MAX_QUEUE = config(
+    'TRACKER_EVENTS_MAX_QUEUE',
+    default=1000,
+    cast=int,
+)
+TRACKER_EVENTS_MAX_STREAM_SECONDS = config(
+    'TRACKER_EVENTS_MAX_STREAM_SECONDS',
+    default=300,
+    cast=int,
+)
+
+# Journal des modifications (tracker/changes.py) : changements conservés
+# TRACKER_CHANGE_RETENTION_DAYS jours (0 = illimité), purgés par
+# `python manage.py prune_changes` (tâche planifiée)
+TRACKER_CHANGE_RETENTION_DAYS = config(
+    'TRACKER_CHANGE_RETENTION_DAYS',
+    default=30,
+    cast=int,
+)
+
+# Lectures (listes et détails) servies par les vues asynchrones
+# (tracker/async_views.py). Activé par softdesk/asgi.py ; à laisser
+# désactivé sous WSGI (softdesk/wsgi.py).
+TRACKER_ASYNC_READS = config('TRACKER_ASYNC_READS', default=False, cast=bool)
+
+# Instrumentation des requêtes (softdesk/instrumentation.py) : requêtes
+# SQL (nombre, durée, doublons), temps des sérialiseurs et de la vue, en
+# en-tête Server-Timing et en logs JSON (logger softdesk.instrumentation)
+REQUEST_INSTRUMENTATION = config(
+    'REQUEST_INSTRUMENTATION',
+    default=False,
+    cast=bool,
+)
+# Métriques Prometheus (softdesk/metrics.py, GET /metrics)
+# - METRICS_DIR : fichiers partagés entre les process (gunicorn), à vider
+#   au démarrage ; vide = valeurs du process seul
+# - METRICS_FLUSH_INTERVAL : écriture du fichier d'un process (secondes)
+# - METRICS_TOKEN : si défini, /metrics exige "Authorization: Bearer <token>"
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config(
+    'METRICS_FLUSH_INTERVAL',
+    default=1.0,
+    cast=float,
+)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Profileur par échantillonnage (softdesk/profiling.py) ; agrégation :
+# python manage.py profile_hotspots
+# - PROFILER_SAMPLE_RATE : fraction des requêtes profilées (0 à 1)
+# - PROFILER_TOKEN : profil d'une requête avec l'en-tête
+#   "X-Profile: <token>" (désactivé si vide)
+# - PROFILER_INTERVAL : intervalle d'échantillonnage (secondes)
+# - PROFILER_FORMAT : collapsed ou speedscope
+PROFILER_ENABLED = config('PROFILER_ENABLED', default=False, cast=bool)
+PROFILER_SAMPLE_RATE = config(
+    'PROFILER_SAMPLE_RATE',
+    default=0.0,
+    cast=float,
+)
+PROFILER_TOKEN = config('PROFILER_TOKEN', default='')
+PROFILER_INTERVAL = config('PROFILER_INTERVAL', default=0.005, cast=float)
+PROFILER_DIR = config('PROFILER_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILER_FORMAT = config('PROFILER_FORMAT', default='collapsed')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'softdesk.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
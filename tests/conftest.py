@@ -1,14 +1,70 @@
 """
 Fixtures et configuration des tests.
+
+Les fabriques (`make_user`, `make_project`, `make_issue`,
+`make_comment`) créent des objets valides par l'ORM (signaux compris :
+index de recherche, journal, compteurs) ; elles servent aussi à la
+suite de benchmarks (`benchmarks/conftest.py`).
 """
 
+from itertools import count
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from tracker.models import Comment, Contributor, Issue, Project
+
 User = get_user_model()
 
+_sequence = count(1)
+
+
+def make_user(password=None, **fields):
+    """Utilisateur valide (nom unique) ; sans mot de passe par défaut
+    (pas de hachage)."""
+    number = next(_sequence)
+    fields.setdefault('username', f'user-{number}')
+    fields.setdefault('email', f"{fields['username']}@example.com")
+    fields.setdefault('age', 25)
+    return User.objects.create_user(password=password, **fields)
+
+
+def make_project(author, contributors=(), **fields):
+    """Projet de `author` (contributeur `author`) et ses contributeurs."""
+    fields.setdefault('name', f'Project {next(_sequence)}')
+    fields.setdefault('description', 'Test')
+    fields.setdefault('type', 'back-end')
+    project = Project.objects.create(author=author, **fields)
+    Contributor.objects.create(project=project, user=author, role='author')
+    for user in contributors:
+        if user != author:
+            Contributor.objects.create(project=project, user=user)
+    return project
+
+
+def make_issue(project, author, **fields):
+    fields.setdefault('title', f'Issue {next(_sequence)}')
+    fields.setdefault('description', 'Test')
+    return Issue.objects.create(project=project, author=author, **fields)
+
+
+def make_comment(issue, author, **fields):
+    fields.setdefault('description', f'Comment {next(_sequence)}')
+    return Comment.objects.create(issue=issue, author=author, **fields)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Vide les caches entre les tests (appartenances, tokens, réponses)."""
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+
 
 @pytest.fixture
 def api_client():
@@ -133,6 +133,111 @@ class TestJWTAuthentication:
         response = api_client.get('/api/v1/auth/users/profile/')
         assert response.status_code == status.HTTP_200_OK
         assert response.data['username'] == authenticated_user.username
+        assert response.data['age'] == authenticated_user.age
+
+
+@pytest.mark.django_db
+class TestStatelessJWTAuthentication:
+    """Teste l'authentification sans requête utilisateur et la révocation."""
+
+    def obtain_tokens(self, api_client, user):
+        """Retourne (access, refresh) pour l'utilisateur."""
+        response = api_client.post('/api/v1/auth/token/', {
+            'username': user.username,
+            'password': 'securepass123',
+        })
+        return response.data['access'], response.data['refresh']
+
+    def test_no_user_query_once_state_is_cached(
+        self,
+        api_client,
+        authenticated_user,
+        django_assert_num_queries
+    ):
+        """Avec l'état en cache, aucune requête sur la table utilisateur."""
+        access, _ = self.obtain_tokens(api_client, authenticated_user)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        api_client.get('/api/v1/projects/')
+
+        with django_assert_num_queries(1) as ctx:
+            response = api_client.get('/api/v1/projects/')
+        assert response.status_code == status.HTTP_200_OK
+        assert 'accounts_customuser' not in ctx.captured_queries[0]['sql']
+
+    def test_user_loaded_once_without_state_cache(
+        self,
+        settings,
+        api_client,
+        authenticated_user,
+        django_assert_num_queries
+    ):
+        """Sans cache, l'utilisateur complet est chargé à chaque requête."""
+        settings.AUTH_TOKEN_STATE_CACHE_TIMEOUT = 0
+        access, _ = self.obtain_tokens(api_client, authenticated_user)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        api_client.get('/api/v1/projects/')
+
+        with django_assert_num_queries(2) as ctx:
+            response = api_client.get('/api/v1/projects/')
+        assert response.status_code == status.HTTP_200_OK
+        sql = ctx.captured_queries[0]['sql']
+        assert 'token_version' in sql
+        assert 'username' in sql
+
+    def test_revoked_token_is_rejected(
+        self,
+        api_client,
+        authenticated_user
+    ):
+        """revoke_tokens() invalide les tokens d'accès et de refresh."""
+        access, refresh = self.obtain_tokens(api_client, authenticated_user)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        assert api_client.get(
+            '/api/v1/auth/users/profile/'
+        ).status_code == status.HTTP_200_OK
+
+        authenticated_user.revoke_tokens()
+
+        response = api_client.get('/api/v1/auth/users/profile/')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        api_client.credentials()
+        response = api_client.post('/api/v1/auth/token/refresh/', {
+            'refresh': refresh,
+        })
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_password_change_revokes_tokens(
+        self,
+        api_client,
+        authenticated_user
+    ):
+        """Changer le mot de passe révoque les tokens existants."""
+        access, _ = self.obtain_tokens(api_client, authenticated_user)
+        authenticated_user.set_password('anothersecurepass')
+        authenticated_user.save()
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = api_client.get('/api/v1/auth/users/profile/')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_inactive_user_is_rejected(
+        self,
+        api_client,
+        authenticated_user
+    ):
+        """Un utilisateur désactivé ne peut plus s'authentifier."""
+        access, refresh = self.obtain_tokens(api_client, authenticated_user)
+        authenticated_user.is_active = False
+        authenticated_user.save()
+
+        response = api_client.post('/api/v1/auth/token/refresh/', {
+            'refresh': refresh,
+        })
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = api_client.get('/api/v1/auth/users/profile/')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
 @pytest.mark.django_db
@@ -146,6 +251,33 @@ class TestUserProfile:
         assert response.data['username'] == authenticated_user.username
         assert response.data['age'] == authenticated_user.age
 
+    def test_profile_reflects_update_with_same_token(
+        self,
+        api_client,
+        authenticated_user,
+        user_data
+    ):
+        """Le profil est lu en base, pas dans les claims du token."""
+        response = api_client.post('/api/v1/auth/token/', {
+            'username': user_data['username'],
+            'password': user_data['password'],
+        })
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {response.data['access']}"
+        )
+        response = api_client.patch(
+            f'/api/v1/auth/users/{authenticated_user.id}/',
+            {'email': 'renamed@example.com'}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        User.objects.filter(pk=authenticated_user.pk).update(
+            username='renamed'
+        )
+
+        response = api_client.get('/api/v1/auth/users/profile/')
+        assert response.data['username'] == 'renamed'
+        assert response.data['email'] == 'renamed@example.com'
+
     def test_update_own_profile(
         self,
         authenticated_client,
@@ -9,3 +9,16 @@ class TrackerConfig(AppConfig):
     """Configuration de l'application tracker."""
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
+
+    def ready(self):
+        """
+        Connecte les signaux (invalidation des caches) et vérifie la
+        configuration du cache des réponses et de la base.
+        """
+        from django.db import connection
+
+        from softdesk.database import check_bulk_insert
+
+        from . import response_cache, signals  # noqa: F401
+        response_cache.check_configuration()
+        check_bulk_insert(connection)
@@ -0,0 +1,274 @@
+"""
+Vues asynchrones des lectures du tracker (servies sous ASGI).
+
+Avec `TRACKER_ASYNC_READS` (activé par `softdesk/asgi.py`), ces vues
+Django asynchrones répondent aux GET suivants en utilisant l'ORM
+asynchrone pour les appartenances et les requêtes :
+- liste et détail des projets
+- liste et détail des issues d'un projet
+- liste des commentaires d'une issue
+
+Elles pilotent une instance du ViewSet correspondant (querysets,
+filtres, sérialiseurs, pagination, ETag, cache des réponses) : les
+réponses sont identiques. Tous les autres cas sont délégués au ViewSet,
+exécuté dans un thread : autres méthodes, erreurs (401, 403, 404,
+paramètres invalides) et API navigable.
+
+Avec Django 4.2, l'ORM asynchrone exécute encore chaque requête dans un
+thread (`sync_to_async`) : la boucle n'est pas bloquée pendant l'attente,
+mais chaque requête SQL coûte un passage de thread.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from accounts.authentication import StatelessJWTAuthentication
+
+from . import response_cache
+from .membership import get_membership, normalize_id
+from .mixins import build_validators, page_not_modified, set_validators
+from .serializers import IssueDetailSerializer
+from .views import CommentViewSet, IssueViewSet, ProjectViewSet
+
+LIST_ACTIONS = {'get': 'list', 'post': 'create'}
+DETAIL_ACTIONS = {
+    'get': 'retrieve',
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+}
+
+
+def accepts_json(request):
+    """La réponse attendue est-elle du JSON (et non l'API navigable) ?"""
+    requested = request.GET.get('format')
+    if requested is not None:
+        return requested == 'json'
+    return 'text/html' not in request.headers.get('Accept', '')
+
+
+class AsyncReadView(View):
+    """
+    Base des vues asynchrones : authentification, appartenances, rendu.
+
+    Une sous-classe définit le ViewSet (`viewset_class`), ses actions
+    pour cette route (`actions`, servies par le ViewSet en repli) et
+    `read(viewset)`, qui retourne la réponse ou None pour déléguer.
+    """
+    viewset_class = None
+    actions = None
+    action = None
+    detail = False
+    # ViewSet de repli, créé par `as_view()`
+    fallback = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        initkwargs.setdefault('fallback', cls.viewset_class.as_view(
+            cls.actions,
+            basename=cls.viewset_class.basename,
+            detail=cls.detail,
+            suffix='Instance' if cls.detail else 'List',
+        ))
+        view = super().as_view(**initkwargs)
+        # Authentification par token, comme les vues DRF
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method == 'GET' and accepts_json(request):
+            try:
+                response = await self.get(request, *args, **kwargs)
+            except (APIException, ObjectDoesNotExist):
+                response = None
+            if response is not None:
+                return response
+        return await sync_to_async(self.fallback)(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        user = await self.authenticate(request)
+        if user is None:
+            return None
+        self.request = Request(request)
+        self.request.user = user
+
+        viewset = self.viewset_class(
+            action=self.action,
+            request=self.request,
+            args=args,
+            kwargs=kwargs,
+            format_kwarg=None,
+        )
+        aget_parent = getattr(viewset, 'aget_parent', None)
+        if aget_parent is not None:
+            # Routes imbriquées : le rôle est lu avec le parent
+            if await aget_parent() is None:
+                return None
+        else:
+            await get_membership(self.request).aload()
+        viewset.check_permissions(self.request)
+        return await self.read(viewset)
+
+    async def read(self, viewset):
+        raise NotImplementedError
+
+    async def authenticate(self, request):
+        """Utilisateur du token JWT, None si absent ou invalide."""
+        authentication = StatelessJWTAuthentication()
+        try:
+            result = await sync_to_async(authentication.authenticate)(request)
+        except APIException:
+            return None
+        return result[0] if result is not None else None
+
+    def get_serializer_context(self, viewset):
+        return {'request': self.request, 'format': None, 'view': viewset}
+
+    def render(self, data):
+        response = HttpResponse(
+            JSONRenderer().render(data),
+            content_type='application/json',
+        )
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def not_modified(self, etag, last_modified):
+        return get_conditional_response(
+            self.request._request,
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    async def list(self, viewset, queryset):
+        """`ConditionalGetMixin` + `CachedListMixin` + `list()`."""
+        name = type(viewset).__name__
+        key = None
+        get_project_ids = getattr(viewset, 'get_cached_project_ids', None)
+        if get_project_ids is not None and response_cache.cache_timeout():
+            project_ids = get_project_ids()
+            if project_ids is not None:
+                key = await sync_to_async(response_cache.build_list_key)(
+                    self.request, name, project_ids
+                )
+                data = await sync_to_async(response_cache.get_response)(key)
+                if data is not None:
+                    response = self.render(data)
+                    response['X-Cache'] = 'HIT'
+                    return page_not_modified(self.request._request, response)
+
+        paginator = viewset.paginator
+        page = await paginator.apaginate_queryset(
+            viewset.filter_queryset(queryset), self.request, viewset
+        )
+        serializer = viewset.get_serializer_class()(
+            page, many=True, context=self.get_serializer_context(viewset)
+        )
+        data = paginator.get_paginated_response(serializer.data).data
+        response = self.render(data)
+        if key is not None:
+            await sync_to_async(response_cache.set_response)(key, data)
+            response['X-Cache'] = 'MISS'
+        return page_not_modified(self.request._request, response)
+
+    async def retrieve(self, viewset):
+        """`ConditionalGetMixin` + `retrieve()` ; None si introuvable."""
+        pk = normalize_id(self.kwargs.get('pk'))
+        if pk is None:
+            return None
+        values = await viewset.get_base_queryset().filter(
+            pk=pk
+        ).order_by().aaggregate(
+            **viewset.get_conditional_aggregates()
+        )
+        etag, last_modified = build_validators(
+            type(viewset).__name__, self.request, values, required=True
+        )
+        if etag is None:
+            return None
+        not_modified = self.not_modified(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        instance = await viewset.get_queryset().aget(pk=pk)
+        viewset.check_object_permissions(self.request, instance)
+        context = self.get_serializer_context(viewset)
+        await self.prepare_instance(instance, context)
+        serializer = viewset.get_serializer_class()(instance, context=context)
+        return set_validators(
+            self.render(serializer.data), etag, last_modified
+        )
+
+    async def prepare_instance(self, instance, context):
+        """Charge ce que le sérialiseur lirait en base."""
+
+
+class ProjectListView(AsyncReadView):
+    """GET /api/v1/projects/"""
+    viewset_class = ProjectViewSet
+    actions = LIST_ACTIONS
+    action = 'list'
+
+    async def read(self, viewset):
+        return await self.list(viewset, viewset.get_queryset())
+
+
+class ProjectDetailView(AsyncReadView):
+    """GET /api/v1/projects/{id}/"""
+    viewset_class = ProjectViewSet
+    actions = DETAIL_ACTIONS
+    action = 'retrieve'
+    detail = True
+
+    async def read(self, viewset):
+        return await self.retrieve(viewset)
+
+
+class IssueListView(AsyncReadView):
+    """GET /api/v1/projects/{project_id}/issues/"""
+    viewset_class = IssueViewSet
+    actions = LIST_ACTIONS
+    action = 'list'
+
+    async def read(self, viewset):
+        return await self.list(viewset, viewset.get_queryset())
+
+
+class IssueDetailView(AsyncReadView):
+    """GET /api/v1/projects/{project_id}/issues/{id}/"""
+    viewset_class = IssueViewSet
+    actions = DETAIL_ACTIONS
+    action = 'retrieve'
+    detail = True
+
+    async def read(self, viewset):
+        return await self.retrieve(viewset)
+
+    def get_serializer_context(self, viewset):
+        context = super().get_serializer_context(viewset)
+        context['embed_comments'] = True
+        return context
+
+    async def prepare_instance(self, instance, context):
+        """Derniers commentaires inclus dans le détail."""
+        serializer = IssueDetailSerializer(context=context)
+        limit = serializer.get_comments_limit()
+        instance.recent_comments = [
+            comment async for comment in
+            serializer.recent_comments_queryset(instance)[:limit + 1]
+        ]
+
+
+class CommentListView(AsyncReadView):
+    """GET /api/v1/projects/{project_id}/issues/{issue_id}/comments/"""
+    viewset_class = CommentViewSet
+    actions = LIST_ACTIONS
+    action = 'list'
+
+    async def read(self, viewset):
+        return await self.list(viewset, viewset.get_queryset())
@@ -0,0 +1,302 @@
+"""
+Journal des modifications pour la synchronisation incrémentale.
+
+Chaque save/delete de `Project`, `Issue`, `Comment` et `Contributor`
+ajoute une ligne `Change` (voir `tracker/signals.py`) ; les chemins
+bulk enregistrent leurs lots eux-mêmes (`record_many`, `record_all`)
+ou regroupent les signaux en un seul INSERT (`batch()`).
+
+Suppressions en cascade : la suppression du parent suffit (un projet
+supprimé implique ses issues, une issue ses commentaires), sauf pour
+les contributeurs, toujours enregistrés avec `user_id` pour que
+l'utilisateur retiré (ou dont le projet est supprimé) l'apprenne.
+
+`get_changes(user, since, limit)` construit une réponse de
+`/api/v1/sync/` : changements des projets de l'utilisateur depuis le
+point `since`, compactés (dernier état de chaque objet) et sérialisés.
+
+Chaque changement est aussi publié en direct (`tracker/events.py`) avec
+son point de reprise comme identifiant.
+
+Rétention : `prune()` (commande `prune_changes`) supprime les
+changements de plus de `TRACKER_CHANGE_RETENTION_DAYS` jours. Un point
+de reprise antérieur au plus ancien changement conservé lève
+`ResyncRequired` (410) : le client recharge tout puis repart du point
+courant.
+"""
+
+import base64
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from . import events
+from .models import Change, Comment, Contributor, Issue, Project
+from .serializers import (
+    CommentSerializer,
+    ContributorSerializer,
+    IssueDetailSerializer,
+    ProjectSyncSerializer,
+)
+
+_buffer = threading.local()
+
+
+class ResyncRequired(APIException):
+    """Point de reprise purgé du journal : resynchronisation complète."""
+    status_code = status.HTTP_410_GONE
+    default_detail = (
+        'Point de reprise expiré : recharger les projets, puis reprendre '
+        'depuis le point courant (/api/v1/sync/ sans since).'
+    )
+    default_code = 'resync_required'
+
+
+def retention_days():
+    """Durée de conservation du journal (jours), 0 = illimitée."""
+    return getattr(settings, 'TRACKER_CHANGE_RETENTION_DAYS', 30)
+
+
+def encode_token(change_id):
+    """Point de reprise opaque."""
+    raw = f'c{change_id}'.encode('ascii')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_token(token):
+    """Identifiant de changement d'un point de reprise, ValidationError sinon."""
+    try:
+        padding = '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(token + padding).decode('ascii')
+        if not raw.startswith('c'):
+            raise ValueError
+        change_id = int(raw[1:])
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValidationError({'since': 'Point de reprise invalide.'})
+    if change_id < 0:
+        raise ValidationError({'since': 'Point de reprise invalide.'})
+    return change_id
+
+
+def build_change(model, obj, action, project_id):
+    return Change(
+        model=model,
+        object_id=obj.pk,
+        action=action,
+        project_id=project_id,
+        user_id=obj.user_id if model == 'contributor' else None,
+    )
+
+
+def change_event(change):
+    """Événement diffusé pour un changement enregistré."""
+    return {
+        'id': encode_token(change.pk),
+        'type': change.model,
+        'action': change.action,
+        'object_id': change.object_id,
+        'project_id': change.project_id,
+        'user_id': change.user_id,
+    }
+
+
+def publish(changes):
+    events.publish([
+        change_event(change) for change in changes if change.pk is not None
+    ])
+
+
+def record(model, obj, action, project_id):
+    """Enregistre un changement (ou le garde pour le lot en cours)."""
+    if project_id is None:
+        return
+    change = build_change(model, obj, action, project_id)
+    pending = getattr(_buffer, 'changes', None)
+    if pending is not None:
+        pending.append(change)
+    else:
+        change.save(force_insert=True)
+        publish([change])
+
+
+def record_many(model, objects, action, project_id):
+    """Enregistre un lot de changements en un seul INSERT."""
+    publish(Change.objects.bulk_create([
+        build_change(model, obj, action, project_id) for obj in objects
+    ]))
+
+
+def record_all(rows):
+    """
+    Enregistre des changements de plusieurs modèles et projets en un
+    seul INSERT (`rows` : tuples `(model, obj, action, project_id)`).
+    """
+    publish(Change.objects.bulk_create([build_change(*row) for row in rows]))
+
+
+@contextmanager
+def batch():
+    """Regroupe les changements enregistrés par signaux (un INSERT)."""
+    if getattr(_buffer, 'changes', None) is not None:
+        yield
+        return
+    _buffer.changes = []
+    try:
+        yield
+        changes = _buffer.changes
+    finally:
+        _buffer.changes = None
+    publish(Change.objects.bulk_create(changes))
+
+
+def _sources():
+    """Queryset et sérialiseur de l'état courant, par type d'objet."""
+    return {
+        'project': (
+            Project.objects.select_related('author'),
+            ProjectSyncSerializer,
+        ),
+        'issue': (
+            Issue.objects.select_related('author'),
+            IssueDetailSerializer,
+        ),
+        'comment': (
+            Comment.objects.select_related('author'),
+            CommentSerializer,
+        ),
+        'contributor': (
+            Contributor.objects.select_related('user'),
+            ContributorSerializer,
+        ),
+    }
+
+
+def is_expired(since, oldest):
+    """
+    Des changements postérieurs à `since` ont-ils été purgés ?
+
+    `oldest` : identifiant du plus ancien changement conservé (None si
+    le journal est vide). Un identifiant manquant (transaction annulée)
+    peut donner une resynchronisation inutile, jamais un changement
+    perdu.
+    """
+    return oldest is not None and since < oldest - 1
+
+
+def oldest_change_id():
+    return Change.objects.order_by('id').values_list('id', flat=True).first()
+
+
+def prune(days=None, batch_size=10000):
+    """
+    Supprime les changements de plus de `days` jours
+    (`retention_days()` par défaut), par lots de `batch_size` lignes
+    (une transaction chacun). Le dernier changement est conservé : il
+    borne les points de reprise encore valides.
+
+    Retourne le nombre de changements supprimés.
+    """
+    days = retention_days() if days is None else days
+    if days <= 0:
+        return 0
+    ids = Change.objects.order_by('-id').values_list('id', flat=True)
+    last = ids.first()
+    cutoff = ids.filter(
+        created_time__lt=timezone.now() - timedelta(days=days)
+    ).first()
+    if cutoff is None:
+        return 0
+    cutoff = min(cutoff, last - 1)
+    deleted = 0
+    while True:
+        batch = list(
+            Change.objects.filter(id__lte=cutoff).order_by('id').values_list(
+                'id', flat=True
+            )[:batch_size]
+        )
+        if not batch:
+            return deleted
+        count, _ = Change.objects.filter(id__lte=batch[-1]).delete()
+        deleted += count
+
+
+def get_changes(user, project_ids, since, limit, context=None):
+    """
+    Changements visibles par `user` après le changement `since`.
+
+    Retourne {"changes", "removed_projects", "resync_projects", "next",
+    "has_more"}. Un objet modifié plusieurs fois n'apparaît qu'une fois
+    (dernier état) ; un objet disparu depuis apparaît comme supprimé.
+    ResyncRequired si `since` précède le journal conservé.
+    """
+    if is_expired(since, oldest_change_id()):
+        raise ResyncRequired()
+    rows = list(
+        Change.objects.filter(
+            Q(project_id__in=project_ids) | Q(user_id=user.pk),
+            id__gt=since,
+        ).order_by('id')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_id = rows[-1].pk if rows else since
+
+    latest = {}
+    for change in rows:
+        latest.pop((change.model, change.object_id), None)
+        latest[(change.model, change.object_id)] = change
+
+    # Ajout / retrait de l'utilisateur courant
+    removed, resync = set(), set()
+    members = set(project_ids)
+    for change in latest.values():
+        if change.model == 'contributor' and change.user_id == user.pk:
+            if change.action == 'deleted' and change.project_id not in members:
+                removed.add(change.project_id)
+            elif change.action == 'created':
+                resync.add(change.project_id)
+
+    # Un état par objet encore existant : une requête par type d'objet
+    data = {}
+    for model, (queryset, serializer_class) in _sources().items():
+        ids = [
+            object_id for (name, object_id), change in latest.items()
+            if name == model and change.action != 'deleted'
+        ]
+        if ids:
+            objects = queryset.filter(pk__in=ids)
+            for item in serializer_class(
+                objects, many=True, context=context or {}
+            ).data:
+                data[(model, item['id'])] = item
+
+    changes = []
+    for (model, object_id), change in latest.items():
+        item = data.get((model, object_id))
+        changes.append({
+            'type': model,
+            'id': object_id,
+            'project_id': change.project_id,
+            'action': 'deleted' if item is None else change.action,
+            'data': item,
+        })
+
+    return {
+        'changes': changes,
+        'removed_projects': sorted(removed),
+        'resync_projects': sorted(resync - removed),
+        'next': encode_token(next_id),
+        'has_more': has_more,
+    }
+
+
+def current_token():
+    """Point de reprise du dernier changement (synchronisation initiale)."""
+    last = Change.objects.order_by('-id').values_list('id', flat=True).first()
+    return encode_token(last or 0)
@@ -0,0 +1,176 @@
+"""
+Diffusion en direct des changements d'issues et de commentaires.
+
+Les changements journalisés (`tracker/changes.py`) sont publiés après le
+commit de la transaction sur le broker configuré
+(`TRACKER_EVENT_BROKER`, chemin d'import d'une classe) :
+- `InProcessBroker` (défaut) : abonnés du process courant, index par
+  projet, files bornées (un abonné trop lent reçoit `overflow` et se
+  resynchronise via `/api/v1/sync/`)
+- un broker externe (Redis pub/sub, NATS...) implémente la même
+  interface : `publish(events)`, `subscribe(user_id, project_ids)`,
+  `unsubscribe(subscription)`, en relayant vers les abonnés locaux
+
+Les événements `contributor` ne sont pas transmis aux clients : ils
+tiennent à jour la liste des projets de chaque abonnement (ajout ou
+retrait de l'utilisateur).
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Types de changements diffusés aux clients
+CLIENT_MODELS = ('issue', 'comment')
+PUBLISHED_MODELS = CLIENT_MODELS + ('contributor',)
+
+
+class Subscription:
+    """
+    Abonnement d'un client : file bornée lue depuis sa boucle asyncio.
+
+    À créer depuis la boucle du flux (`InProcessBroker.subscribe`).
+    """
+
+    def __init__(self, broker, user_id, project_ids, follow_membership,
+                 max_queue):
+        self.broker = broker
+        self.user_id = user_id
+        self.project_ids = set(project_ids)
+        # Suivre les projets rejoints (abonnement non restreint)
+        self.follow_membership = follow_membership
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Appelé dans la boucle de l'abonné."""
+        if event['type'] == 'contributor':
+            self.apply_membership(event)
+            return
+        if event['project_id'] not in self.project_ids:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def apply_membership(self, event):
+        project_id = event['project_id']
+        if event['action'] == 'deleted':
+            if project_id not in self.project_ids:
+                return
+            self.broker.remove_project(self, project_id)
+            if not self.queue.full():
+                self.queue.put_nowait({**event, 'type': 'project_removed'})
+        elif event['action'] == 'created' and self.follow_membership:
+            self.broker.add_project(self, project_id)
+
+    async def get(self, timeout):
+        """Prochain événement, ou None après `timeout` secondes."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroker:
+    """Broker en mémoire : un process, abonnés indexés par projet."""
+
+    def __init__(self, max_queue=None):
+        self.max_queue = max_queue or getattr(
+            settings, 'TRACKER_EVENTS_MAX_QUEUE', 1000
+        )
+        self._lock = threading.Lock()
+        self._by_project = defaultdict(set)
+        self._by_user = defaultdict(set)
+
+    def subscribe(self, user_id, project_ids, follow_membership=True):
+        subscription = Subscription(
+            self, user_id, project_ids, follow_membership, self.max_queue
+        )
+        with self._lock:
+            self._by_user[user_id].add(subscription)
+            for project_id in subscription.project_ids:
+                self._by_project[project_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._discard(self._by_user, subscription.user_id, subscription)
+            for project_id in subscription.project_ids:
+                self._discard(self._by_project, project_id, subscription)
+
+    def add_project(self, subscription, project_id):
+        with self._lock:
+            subscription.project_ids.add(project_id)
+            self._by_project[project_id].add(subscription)
+
+    def remove_project(self, subscription, project_id):
+        with self._lock:
+            subscription.project_ids.discard(project_id)
+            self._discard(self._by_project, project_id, subscription)
+
+    @staticmethod
+    def _discard(index, key, subscription):
+        subscribers = index.get(key)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del index[key]
+
+    def publish(self, events):
+        """Transmet les événements aux abonnés concernés (thread-safe)."""
+        for event in events:
+            with self._lock:
+                if event['type'] == 'contributor':
+                    targets = list(self._by_user.get(event['user_id'], ()))
+                else:
+                    targets = list(
+                        self._by_project.get(event['project_id'], ())
+                    )
+            for subscription in targets:
+                try:
+                    subscription.loop.call_soon_threadsafe(
+                        subscription.deliver, event
+                    )
+                except RuntimeError:
+                    # Boucle fermée : abonnement abandonné
+                    self.unsubscribe(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': sum(len(s) for s in self._by_user.values()),
+                'projects': len(self._by_project),
+            }
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Broker du process (instancié au premier appel)."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(
+                    settings,
+                    'TRACKER_EVENT_BROKER',
+                    'tracker.events.InProcessBroker',
+                )
+                _broker = import_string(path)()
+    return _broker
+
+
+def publish(events):
+    """Publie des événements après le commit de la transaction courante."""
+    events = [event for event in events if event['type'] in PUBLISHED_MODELS]
+    if events:
+        transaction.on_commit(lambda: get_broker().publish(events))
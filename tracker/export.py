@@ -0,0 +1,167 @@
+"""
+Export en flux des issues d'un projet avec leurs commentaires.
+
+`GET /api/v1/projects/{id}/export/?format=ndjson|csv` (voir
+`ProjectViewSet.export`) :
+- ndjson : une ligne JSON par issue, commentaires inclus
+- csv : une ligne par issue, suivie d'une ligne par commentaire
+  (colonne `type`)
+
+Les issues sont lues par `iterator(chunk_size=...)`, leurs commentaires
+préchargés lot par lot : la mémoire dépend de la taille d'un lot, pas de
+celle du projet. Chaque lot est sérialisé puis envoyé en un seul bloc.
+"""
+
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Comment, Issue
+from .serializers import IssueExportSerializer
+
+CSV_FIELDS = [
+    'type',
+    'id',
+    'issue_id',
+    'title',
+    'description',
+    'priority',
+    'tag',
+    'status',
+    'author_id',
+    'author',
+    'assignee_id',
+    'created_time',
+    'updated_time',
+]
+
+
+class NDJSONRenderer(JSONRenderer):
+    """`?format=ndjson` (les erreurs restent rendues en JSON)."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVRenderer(JSONRenderer):
+    """`?format=csv` (les erreurs restent rendues en JSON)."""
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+def issue_chunks(project_id, chunk_size):
+    """Lots d'issues du projet (par id), commentaires préchargés."""
+    issues = Issue.objects.filter(project_id=project_id).select_related(
+        'author'
+    ).prefetch_related(
+        Prefetch(
+            'comments',
+            queryset=Comment.objects.select_related('author').order_by(
+                'created_time', 'pk'
+            ),
+        )
+    ).order_by('pk').iterator(chunk_size=chunk_size)
+    # Un seul sérialiseur pour tout l'export : il ne garde aucune
+    # référence vers les lots déjà envoyés
+    serializer = IssueExportSerializer()
+    while True:
+        chunk = list(islice(issues, chunk_size))
+        if not chunk:
+            return
+        data = []
+        for issue in chunk:
+            data.append(serializer.to_representation(issue))
+            # Les commentaires préchargés référencent leur issue : sans ce
+            # cycle, le lot est libéré dès le suivant (et non au passage
+            # du ramasse-miettes)
+            issue._prefetched_objects_cache.clear()
+        yield data
+
+
+def ndjson_chunks(chunks):
+    for chunk in chunks:
+        yield ''.join(
+            json.dumps(issue, cls=JSONEncoder, ensure_ascii=False) + '\n'
+            for issue in chunk
+        )
+
+
+class _Lines:
+    """Tampon de `csv.writer` : retourne la ligne au lieu de l'écrire."""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(chunks):
+    writer = csv.writer(_Lines())
+    yield writer.writerow(CSV_FIELDS)
+    for chunk in chunks:
+        rows = []
+        for issue in chunk:
+            rows.append(writer.writerow(csv_row('issue', issue, issue)))
+            rows.extend(
+                writer.writerow(csv_row('comment', comment, issue))
+                for comment in issue['comments']
+            )
+        yield ''.join(rows)
+
+
+def csv_row(kind, data, issue):
+    author = data['author'] or {}
+    return [
+        kind,
+        data['id'],
+        issue['id'],
+        issue['title'] if kind == 'issue' else '',
+        data['description'],
+        data.get('priority', ''),
+        data.get('tag', ''),
+        data.get('status', ''),
+        author.get('id', ''),
+        author.get('username', ''),
+        data.get('assignee_id') or '',
+        data['created_time'],
+        data['updated_time'],
+    ]
+
+
+async def _aiterate(iterator):
+    """
+    Itérateur asynchrone sur un générateur synchrone, lot par lot.
+
+    Sous ASGI, Django 4.2 lirait un itérateur synchrone en entier avant
+    de l'envoyer : chaque lot est lu dans le thread de la requête (celui
+    de la connexion à la base), puis envoyé.
+    """
+    done = object()
+    while True:
+        chunk = await sync_to_async(next)(iterator, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+def export_response(request, project, export_format, chunk_size):
+    """`StreamingHttpResponse` de l'export du projet."""
+    chunks = issue_chunks(project.pk, chunk_size)
+    if export_format == 'csv':
+        content = csv_chunks(chunks)
+        content_type = 'text/csv; charset=utf-8'
+    else:
+        content = ndjson_chunks(chunks)
+        content_type = 'application/x-ndjson; charset=utf-8'
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        content = _aiterate(content)
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="project-{project.pk}.{export_format}"'
+    )
+    return response
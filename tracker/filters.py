@@ -0,0 +1,238 @@
+"""
+Filtres et tri des listes de l'application tracker.
+
+- IssueFilterBackend : filtres status / priority / tag / assignee,
+  intervalles de dates et tri sur liste blanche pour les issues
+
+Chaque requête acceptée est servie par un index de `Issue` :
+(project, <colonne filtrée>, <colonne de tri>, id). Les combinaisons
+qu'aucun index ne couvre sont refusées (400) plutôt que de forcer un
+parcours complet suivi d'un tri.
+"""
+
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Issue
+from .pagination import Keyset, KeysetPagination, StandardPagination
+
+
+def parse_datetime_param(value):
+    """Date (`2024-01-31`) ou date-heure ISO 8601, None si invalide."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            return None
+        parsed = datetime.combine(date, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class IssueFilterBackend(BaseFilterBackend):
+    """
+    Filtres de la liste des issues.
+
+    - `?status=`, `?priority=`, `?tag=` : une valeur des *_CHOICES
+    - `?assignee=<user_id>` ou `?assignee=none` (non assignées)
+    - `?created_after=` / `?created_before=` et
+      `?updated_after=` / `?updated_before=` : date ou date-heure ISO
+    - `?ordering=` : `-created_time` (défaut), `created_time`,
+      `updated_time`, `-updated_time`, `priority`, `-priority`
+
+    Index disponibles, d'où les combinaisons acceptées :
+    - tri par `created_time` : un seul filtre d'égalité au plus
+    - tri par `updated_time` : aucun filtre d'égalité
+    - tri par `priority` (priorité puis plus récentes) : seul le filtre
+      `priority` est permis ; en pagination par numéro de page (`?page=`),
+      il est obligatoire (sans lui, le tri par rang de priorité n'est
+      couvert par aucun index)
+    - les intervalles portent sur la colonne de tri
+    """
+    choice_fields = {
+        'status': [value for value, label in Issue.STATUS_CHOICES],
+        'priority': [value for value, label in Issue.PRIORITY_CHOICES],
+        'tag': [value for value, label in Issue.TAG_CHOICES],
+    }
+    range_params = {
+        'created_after': ('created_time', 'gte'),
+        'created_before': ('created_time', 'lt'),
+        'updated_after': ('updated_time', 'gte'),
+        'updated_before': ('updated_time', 'lt'),
+    }
+    ordering_param = 'ordering'
+    ordering_fields = ['created_time', 'updated_time', 'priority']
+    default_ordering = '-created_time'
+    unassigned_values = ('none', 'null')
+    index_message = (
+        "Combinaison de filtres et de tri non prise en charge "
+        "(aucun index ne la couvre)."
+    )
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, 'action', None) != 'list':
+            return queryset
+        filters, ordering = self.parse(request)
+        queryset = queryset.filter(**filters)
+        return queryset.order_by(*self.get_order_by(ordering))
+
+    def get_keyset(self, request):
+        """Keyset de la pagination par curseur pour le tri demandé."""
+        filters, ordering = self.parse(request)
+        descending = ordering.startswith('-')
+        field = ordering.lstrip('-')
+        if field != 'priority':
+            return Keyset(field, descending)
+
+        # Un segment par priorité, chacune lue sur l'index
+        # (project, priority, -created_time, -id), plus récentes d'abord
+        priorities = self.choice_fields['priority']
+        if descending:
+            priorities = priorities[::-1]
+        return Keyset(
+            'created_time',
+            True,
+            [{'priority': priority} for priority in priorities],
+        )
+
+    def parse(self, request):
+        """Retourne (filtres ORM, tri) ou lève une ValidationError."""
+        params = request.query_params
+        filters, errors, equality = {}, {}, set()
+
+        for name, choices in self.choice_fields.items():
+            value = params.get(name)
+            if value is None:
+                continue
+            if value not in choices:
+                errors[name] = (
+                    f"Valeur invalide. Choix possibles : {', '.join(choices)}."
+                )
+            else:
+                filters[name] = value
+                equality.add(name)
+
+        assignee = params.get('assignee')
+        if assignee is not None:
+            equality.add('assignee')
+            if assignee.lower() in self.unassigned_values:
+                filters['assignee__isnull'] = True
+            elif assignee.isdigit():
+                filters['assignee_id'] = int(assignee)
+            else:
+                errors['assignee'] = (
+                    "Identifiant d'utilisateur ou 'none' attendu."
+                )
+
+        ranges = set()
+        for name, (field, lookup) in self.range_params.items():
+            value = params.get(name)
+            if value is None:
+                continue
+            parsed = parse_datetime_param(value)
+            if parsed is None:
+                errors[name] = "Date ou date-heure ISO 8601 attendue."
+            else:
+                filters[f'{field}__{lookup}'] = parsed
+                ranges.add(field)
+
+        ordering = params.get(self.ordering_param, self.default_ordering)
+        if ordering.lstrip('-') not in self.ordering_fields:
+            errors[self.ordering_param] = (
+                'Tri invalide. Choix possibles : '
+                f"{', '.join(self.ordering_fields)} (préfixe '-' possible)."
+            )
+        if errors:
+            raise ValidationError(errors)
+
+        self.check_index(
+            equality, ranges, ordering.lstrip('-'), self.page_number(params)
+        )
+        return filters, ordering
+
+    @staticmethod
+    def page_number(params):
+        """La pagination est-elle par numéro de page (`?page=N`) ?"""
+        return (
+            KeysetPagination.cursor_query_param not in params
+            and StandardPagination.page_query_param in params
+        )
+
+    def check_index(self, equality, ranges, field, page_number=False):
+        """Refuse les combinaisons qu'aucun index ne couvre."""
+        if field == 'priority':
+            # Par curseur : un segment par priorité ; par numéro de page,
+            # une seule priorité (le tri se réduit alors à la date)
+            if page_number:
+                allowed = equality == {'priority'}
+            else:
+                allowed = equality <= {'priority'}
+            range_field = 'created_time'
+        elif field == 'updated_time':
+            allowed = not equality
+            range_field = 'updated_time'
+        else:
+            allowed = len(equality) <= 1
+            range_field = 'created_time'
+        if not allowed or ranges - {range_field}:
+            raise ValidationError({self.ordering_param: self.index_message})
+
+    def get_order_by(self, ordering):
+        """
+        Tri équivalent pour la pagination par numéro de page.
+
+        Le tri par priorité n'y est accepté qu'avec `?priority=` : une
+        seule priorité, triée par date (index de la priorité).
+        """
+        descending = ordering.startswith('-')
+        field = ordering.lstrip('-')
+        if field == 'priority':
+            return ['-created_time', '-pk']
+        prefix = '-' if descending else ''
+        return [f'{prefix}{field}', f'{prefix}pk']
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [
+            {
+                'name': name,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': 'string', 'enum': choices},
+            }
+            for name, choices in self.choice_fields.items()
+        ]
+        parameters.append({
+            'name': 'assignee',
+            'required': False,
+            'in': 'query',
+            'description': "User id, or 'none' for unassigned issues.",
+            'schema': {'type': 'string'},
+        })
+        parameters.extend(
+            {
+                'name': name,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': 'string', 'format': 'date-time'},
+            }
+            for name in self.range_params
+        )
+        parameters.append({
+            'name': self.ordering_param,
+            'required': False,
+            'in': 'query',
+            'schema': {
+                'type': 'string',
+                'enum': [
+                    f'{prefix}{field}'
+                    for field in self.ordering_fields
+                    for prefix in ('', '-')
+                ],
+            },
+        })
+        return parameters
@@ -0,0 +1,405 @@
+"""
+Import en masse de projets, issues et commentaires depuis un fichier NDJSON.
+
+Une ligne par objet, dans l'ordre du fichier :
+
+    {"model": "project", "ref": "P-12", "name": "...", "description": "...",
+     "type": "back-end", "author": "alice", "contributors": ["bob"]}
+    {"model": "issue", "project": "P-12", "title": "...",
+     "description": "...", "priority": "HIGH", "tag": "BUG",
+     "status": "To Do", "author": "alice", "assignee": "bob",
+     "comments": [{"description": "...", "author": "bob"}]}
+
+- Utilisateurs désignés par leur `username` : ils doivent exister et
+  avoir au moins 15 ans
+- Projet d'une issue : `project` (référence `ref` d'un projet du
+  fichier) ou `project_id` (projet existant)
+- Chaque ligne est validée avec les règles des sérialiseurs de l'API
+  (`ProjectDetailSerializer`, `IssueImportSerializer`,
+  `CommentSerializer`) ; l'assigné doit être contributeur du projet.
+  Une ligne invalide (ou l'un de ses commentaires) est écartée et
+  signalée, les autres sont importées
+
+Les lignes sont lues en flux et traitées par lots de `batch_size` :
+utilisateurs et membres des projets existants préchargés (une requête
+chacun), puis écriture par bulk_create dans une transaction par lot.
+bulk_create n'envoyant pas de signaux, l'index de recherche, le journal
+des modifications, les compteurs des projets et les caches sont mis à
+jour ici.
+
+Point de reprise : `ImportRun.line` (dernière ligne écrite) et les
+références des projets créés (`ImportRef`, une ligne par projet) sont
+enregistrés dans la transaction du lot. Chaque lot ne relit que les
+références qu'il cite. Relancer l'import du même fichier avec cet
+`ImportRun` reprend après cette ligne.
+
+bulk_create doit renseigner les clés primaires (issues et commentaires
+rattachés aux objets du lot) : PostgreSQL ou SQLite >= 3.35 (voir
+`softdesk/database.py`).
+"""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework import serializers
+
+from . import changes, response_cache, stats
+from .membership import invalidate_cached_membership, normalize_id
+from .models import (
+    Comment,
+    Contributor,
+    ImportRef,
+    ImportRun,
+    Issue,
+    Project,
+)
+from .search import index_comments, index_issues
+from .serializers import (
+    CommentSerializer,
+    IssueImportSerializer,
+    ProjectDetailSerializer,
+)
+
+User = get_user_model()
+
+MODELS = ('project', 'issue')
+MIN_AGE = 15
+# Lignes écartées détaillées dans le rapport (les suivantes sont comptées)
+MAX_REPORTED_ERRORS = 100
+
+
+class Batch:
+    """Objets validés d'un lot, écrits ensemble."""
+
+    def __init__(self):
+        # Référence -> projet créé, et ses membres
+        self.projects = {}
+        self.members = {}
+        self.contributors = []
+        self.issues = []
+        self.comments = []
+
+
+class Importer:
+    """
+    Import d'un fichier NDJSON dans un `ImportRun`.
+
+    Les sérialiseurs sont créés une fois et appliqués à chaque ligne
+    (`run_validation`) : mêmes règles que l'API, sans reconstruire leurs
+    champs ligne par ligne.
+    """
+
+    def __init__(self, run, batch_size=1000, progress=None):
+        self.run = run
+        self.batch_size = batch_size
+        # Appelé avec l'ImportRun après chaque lot écrit
+        self.progress = progress
+        self.rejected = []
+        self.project_serializer = ProjectDetailSerializer()
+        self.issue_context = {'members': set()}
+        self.issue_serializer = IssueImportSerializer(
+            context=self.issue_context
+        )
+        self.comment_serializer = CommentSerializer()
+        # Références des projets déjà importés citées par le lot courant
+        self.refs = {}
+
+    def import_lines(self, lines):
+        """Importe les lignes (str ou bytes) après le point de reprise."""
+        self.run.status = 'running'
+        try:
+            for batch in self.read_batches(lines):
+                self.import_batch(batch)
+                if self.progress is not None:
+                    self.progress(self.run)
+        except Exception:
+            self.run.status = 'failed'
+            ImportRun.objects.filter(pk=self.run.pk).update(status='failed')
+            raise
+        self.run.status = 'finished'
+        self.run.save(update_fields=['status', 'updated_time'])
+        return self.run
+
+    def read_batches(self, lines):
+        """Lots de (numéro, ligne), lus en flux."""
+        batch = []
+        for number, line in enumerate(lines, start=1):
+            if number <= self.run.line:
+                continue
+            batch.append((number, line))
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def import_batch(self, lines):
+        records = []
+        for number, line in lines:
+            try:
+                if isinstance(line, bytes):
+                    line = line.decode('utf-8')
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if not isinstance(record, dict) or (
+                    record.get('model') not in MODELS
+                ):
+                    raise ValueError
+            except ValueError:
+                self.reject(number, {
+                    'model': (
+                        'Objet JSON attendu, avec "model" : '
+                        '"project" ou "issue".'
+                    )
+                })
+                continue
+            records.append((number, record))
+
+        users = self.load_users(records)
+        self.refs = self.load_refs(records)
+        members = self.load_members(records)
+        batch = Batch()
+        for number, record in records:
+            try:
+                if record['model'] == 'project':
+                    self.add_project(record, users, batch)
+                else:
+                    self.add_issue(record, users, members, batch)
+            except serializers.ValidationError as exc:
+                self.reject(number, exc.detail)
+        self.write(batch, lines[-1][0])
+
+    def reject(self, number, errors):
+        self.run.errors += 1
+        if len(self.rejected) < MAX_REPORTED_ERRORS:
+            self.rejected.append({'line': number, 'errors': errors})
+
+    def load_users(self, records):
+        """username -> (id, âge) des utilisateurs cités par le lot."""
+        names = []
+        for _, record in records:
+            names += [record.get('author'), record.get('assignee')]
+            if isinstance(record.get('contributors'), list):
+                names += record['contributors']
+            if isinstance(record.get('comments'), list):
+                names += [
+                    comment.get('author') for comment in record['comments']
+                    if isinstance(comment, dict)
+                ]
+        names = {name for name in names if isinstance(name, str)}
+        if not names:
+            return {}
+        return {
+            username: (pk, age)
+            for username, pk, age in User.objects.filter(
+                username__in=names
+            ).values_list('username', 'pk', 'age')
+        }
+
+    def load_refs(self, records):
+        """Référence -> id des projets importés par les lots précédents,
+        pour les références citées par le lot."""
+        refs = set()
+        for _, record in records:
+            field = 'ref' if record['model'] == 'project' else 'project'
+            ref = record.get(field)
+            if isinstance(ref, (str, int)) and ref != '':
+                refs.add(str(ref))
+        if not refs:
+            return {}
+        return dict(ImportRef.objects.filter(
+            run=self.run, ref__in=refs
+        ).values_list('ref', 'project_id'))
+
+    def load_members(self, records):
+        """Membres des projets existants cités par les issues du lot."""
+        project_ids = set()
+        for _, record in records:
+            if record['model'] != 'issue':
+                continue
+            if 'project_id' in record:
+                project_ids.add(normalize_id(record['project_id']))
+            else:
+                project_ids.add(self.refs.get(str(record.get('project'))))
+        project_ids.discard(None)
+        members = {}
+        if project_ids:
+            for project_id, user_id in Contributor.objects.filter(
+                project_id__in=project_ids
+            ).order_by().values_list('project_id', 'user_id'):
+                members.setdefault(project_id, set()).add(user_id)
+        return members
+
+    @staticmethod
+    def get_user(users, username, field, required=True):
+        """Identifiant de l'utilisateur, ValidationError sinon."""
+        if username is None or username == '':
+            if required:
+                raise serializers.ValidationError(
+                    {field: 'Ce champ est obligatoire.'}
+                )
+            return None
+        user = users.get(username) if isinstance(username, str) else None
+        if user is None:
+            raise serializers.ValidationError(
+                {field: f'Utilisateur inconnu : {username}.'}
+            )
+        user_id, age = user
+        if age is None or age < MIN_AGE:
+            raise serializers.ValidationError({
+                field: (
+                    f"{username} : l'utilisateur doit avoir au moins "
+                    f"{MIN_AGE} ans."
+                )
+            })
+        return user_id
+
+    def add_project(self, record, users, batch):
+        data = self.project_serializer.run_validation(record)
+        ref = record.get('ref')
+        if not isinstance(ref, (str, int)) or ref == '':
+            raise serializers.ValidationError(
+                {'ref': 'Ce champ est obligatoire.'}
+            )
+        ref = str(ref)
+        if ref in batch.projects or ref in self.refs:
+            raise serializers.ValidationError(
+                {'ref': f'Référence déjà importée : {ref}.'}
+            )
+        author_id = self.get_user(users, record.get('author'), 'author')
+        names = record.get('contributors', [])
+        if not isinstance(names, list):
+            raise serializers.ValidationError(
+                {'contributors': "Une liste d'utilisateurs est attendue."}
+            )
+        contributor_ids = [
+            self.get_user(users, name, 'contributors') for name in names
+        ]
+
+        project = Project(author_id=author_id, **data)
+        batch.projects[ref] = project
+        batch.members[ref] = {author_id, *contributor_ids}
+        batch.contributors.append(
+            Contributor(project=project, user_id=author_id, role='author')
+        )
+        batch.contributors.extend(
+            Contributor(project=project, user_id=user_id)
+            for user_id in dict.fromkeys(contributor_ids)
+            if user_id != author_id
+        )
+
+    def get_project(self, record, members, batch):
+        """(projet du lot ou id d'un projet existant, membres)."""
+        if 'project_id' in record:
+            project_id = normalize_id(record['project_id'])
+            if project_id not in members:
+                raise serializers.ValidationError(
+                    {'project_id': 'Projet introuvable.'}
+                )
+            return project_id, members[project_id]
+        ref = str(record.get('project'))
+        if ref in batch.projects:
+            return batch.projects[ref], batch.members[ref]
+        project_id = self.refs.get(ref)
+        if project_id not in members:
+            raise serializers.ValidationError(
+                {'project': f'Projet inconnu : {ref}.'}
+            )
+        return project_id, members[project_id]
+
+    def add_issue(self, record, users, members, batch):
+        project, project_members = self.get_project(record, members, batch)
+        author_id = self.get_user(users, record.get('author'), 'author')
+        data = dict(record)
+        data['assignee_id'] = self.get_user(
+            users, record.get('assignee'), 'assignee', required=False
+        )
+        self.issue_context['members'] = project_members
+        issue = Issue(
+            author_id=author_id,
+            **self.issue_serializer.run_validation(data)
+        )
+        if isinstance(project, Project):
+            issue.project = project
+        else:
+            issue.project_id = project
+
+        comments = record.get('comments', [])
+        if not isinstance(comments, list):
+            raise serializers.ValidationError(
+                {'comments': 'Une liste de commentaires est attendue.'}
+            )
+        issue_comments = []
+        for index, item in enumerate(comments):
+            try:
+                comment = Comment(
+                    issue=issue,
+                    **self.comment_serializer.run_validation(item)
+                )
+                comment.author_id = self.get_user(
+                    users, item.get('author'), 'author'
+                )
+            except serializers.ValidationError as exc:
+                raise serializers.ValidationError(
+                    {'comments': {index: exc.detail}}
+                )
+            issue_comments.append(comment)
+
+        batch.issues.append(issue)
+        batch.comments.extend(issue_comments)
+
+    def write(self, batch, last_line):
+        """Écrit le lot et le point de reprise en une transaction."""
+        projects = list(batch.projects.values())
+        with transaction.atomic():
+            Project.objects.bulk_create(projects)
+            ImportRef.objects.bulk_create([
+                ImportRef(run=self.run, ref=ref, project=project)
+                for ref, project in batch.projects.items()
+            ])
+            Contributor.objects.bulk_create(batch.contributors)
+            Issue.objects.bulk_create(batch.issues)
+            Comment.objects.bulk_create(batch.comments)
+
+            # bulk_create n'envoie pas post_save : index, journal et
+            # compteurs ici
+            issue_projects = {
+                issue.pk: issue.project_id for issue in batch.issues
+            }
+            index_issues(batch.issues, created=True)
+            index_comments(batch.comments, issue_projects)
+            changes.record_all(
+                [
+                    ('project', project, 'created', project.pk)
+                    for project in projects
+                ] + [
+                    ('contributor', contributor, 'created',
+                     contributor.project_id)
+                    for contributor in batch.contributors
+                ] + [
+                    ('issue', issue, 'created', issue.project_id)
+                    for issue in batch.issues
+                ] + [
+                    ('comment', comment, 'created',
+                     issue_projects[comment.issue_id])
+                    for comment in batch.comments
+                ]
+            )
+            stats.record_created(batch.issues)
+
+            self.run.line = last_line
+            self.run.projects += len(projects)
+            self.run.issues += len(batch.issues)
+            self.run.comments += len(batch.comments)
+            self.run.save()
+
+        for contributor in batch.contributors:
+            invalidate_cached_membership(
+                contributor.user_id, contributor.project_id
+            )
+        for project_id in {project.pk for project in projects} | set(
+            issue_projects.values()
+        ):
+            response_cache.bump_project_version(project_id)
@@ -0,0 +1,93 @@
+"""
+Import en masse d'un fichier NDJSON de projets, issues et commentaires.
+
+    python manage.py import_ndjson export.ndjson --batch-size 1000
+    # Reprise après une interruption (même fichier)
+    python manage.py import_ndjson export.ndjson --resume 3
+
+Format et règles de validation : voir `tracker/imports.py`.
+"""
+
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.imports import Importer
+from tracker.models import ImportRun
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe un fichier NDJSON de projets, issues et commentaires "
+        "par lots (une transaction par lot, reprise possible)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Fichier NDJSON à importer (- pour l\'entrée standard).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Nombre de lignes validées et écrites par lot.',
+        )
+        parser.add_argument(
+            '--resume',
+            type=int,
+            default=None,
+            help="Identifiant de l'import à reprendre après sa dernière "
+                 "ligne écrite.",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size doit être positif.')
+        path = options['path']
+
+        if options['resume'] is not None:
+            run = ImportRun.objects.filter(pk=options['resume']).first()
+            if run is None:
+                raise CommandError(f"Import #{options['resume']} introuvable.")
+            if run.status == 'finished':
+                raise CommandError(f'Import #{run.pk} déjà terminé.')
+            self.stdout.write(
+                f'Import #{run.pk} : reprise après la ligne {run.line}.'
+            )
+        else:
+            run = ImportRun.objects.create(
+                source='stdin' if path == '-' else os.path.basename(path)
+            )
+            self.stdout.write(
+                f'Import #{run.pk} (--resume {run.pk} pour le reprendre).'
+            )
+
+        importer = Importer(run, batch_size=batch_size, progress=self.progress)
+        if path == '-':
+            importer.import_lines(sys.stdin)
+        else:
+            try:
+                with open(path, encoding='utf-8') as lines:
+                    importer.import_lines(lines)
+            except OSError as exc:
+                raise CommandError(str(exc))
+
+        for rejected in importer.rejected:
+            self.stderr.write(
+                f"Ligne {rejected['line']} : {rejected['errors']}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{run.projects} projets, {run.issues} issues et '
+            f'{run.comments} commentaires importés, '
+            f'{run.errors} lignes écartées.'
+        ))
+
+    def progress(self, run):
+        if self.verbosity >= 2:
+            self.stdout.write(
+                f'Ligne {run.line} : {run.issues} issues importées.'
+            )
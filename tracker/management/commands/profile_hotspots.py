@@ -0,0 +1,93 @@
+"""
+Points chauds par endpoint des profils de `softdesk/profiling.py`.
+
+    python manage.py profile_hotspots [--dir profiles] [--top 15]
+        [--endpoint IssueViewSet.list] [--collapsed merged/]
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from softdesk.profiling import hot_spots, load_profiles
+
+
+class Command(BaseCommand):
+    help = (
+        "Agrège les profils échantillonnés par endpoint et affiche les "
+        "fonctions où le temps est passé."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir',
+            default=str(getattr(settings, 'PROFILER_DIR', 'profiles')),
+            help='Répertoire des profils (PROFILER_DIR par défaut).',
+        )
+        parser.add_argument(
+            '--endpoint',
+            help='Un seul endpoint (par ex. IssueViewSet.list).',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='Fonctions affichées par endpoint.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=getattr(settings, 'PROFILER_INTERVAL', 0.005),
+            help=(
+                "Intervalle d'échantillonnage des fichiers collapsed "
+                "(secondes)."
+            ),
+        )
+        parser.add_argument(
+            '--collapsed',
+            help=(
+                'Écrit les piles agrégées de chaque endpoint dans ce '
+                'répertoire (<endpoint>.collapsed, pour un flamegraph).'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options['dir'])
+        if not directory.is_dir():
+            raise CommandError(f'Répertoire introuvable : {directory}.')
+        if options['top'] <= 0 or options['interval'] <= 0:
+            raise CommandError('--top et --interval doivent être positifs.')
+        endpoints = load_profiles(
+            directory, options['interval'], options['endpoint']
+        )
+        if not endpoints:
+            self.stdout.write(self.style.WARNING('Aucun profil.'))
+            return
+
+        output = options['collapsed']
+        if output:
+            Path(output).mkdir(parents=True, exist_ok=True)
+        # Endpoints où le plus de temps a été échantillonné d'abord
+        for handler, (files, stacks) in sorted(
+            endpoints.items(), key=lambda item: -sum(item[1][1].values())
+        ):
+            total = sum(stacks.values())
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{handler} : {files} profils, '
+                f'{total:.1f} ms échantillonnées'
+            ))
+            self.stdout.write(f"{'propre %':>10} {'inclusif %':>11}  fonction")
+            for frame, own, inclusive in hot_spots(stacks)[:options['top']]:
+                self.stdout.write(
+                    f'{own / total * 100:>10.1f} '
+                    f'{inclusive / total * 100:>11.1f}  {frame}'
+                )
+            if output:
+                samples_ms = options['interval'] * 1000
+                path = Path(output) / f'{handler}.collapsed'
+                path.write_text(''.join(
+                    ';'.join(stack) + f' {max(round(ms / samples_ms), 1)}\n'
+                    for stack, ms in stacks.items()
+                ), encoding='utf-8')
+                self.stdout.write(f'-> {path}')
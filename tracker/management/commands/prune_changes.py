@@ -0,0 +1,44 @@
+"""
+Purge du journal des modifications (`Change`).
+
+    python manage.py prune_changes [--days 30] [--batch-size 10000]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.changes import prune, retention_days
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime par lots les changements plus anciens que la durée de "
+        "conservation (TRACKER_CHANGE_RETENTION_DAYS)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Durée de conservation en jours (0 = ne rien supprimer).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Nombre de changements supprimés par lot (une transaction).',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size doit être positif.')
+        days = options['days']
+        if days is None:
+            days = retention_days()
+        if days < 0:
+            raise CommandError('--days doit être positif ou nul.')
+        deleted = prune(days=days, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'{deleted} changements de plus de {days} jours supprimés.'
+        ))
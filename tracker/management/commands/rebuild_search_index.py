@@ -0,0 +1,33 @@
+"""
+Reconstruction de l'index de recherche plein texte.
+
+    python manage.py rebuild_search_index --batch-size 1000
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruit l'index de recherche des issues et commentaires "
+        "par lots (une transaction par lot)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Nombre de lignes lues et insérées par lot.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size doit être positif.')
+        issues, comments = rebuild_index(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'{issues} issues et {comments} commentaires indexés.'
+        ))
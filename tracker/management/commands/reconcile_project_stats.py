@@ -0,0 +1,55 @@
+"""
+Réconciliation des compteurs d'issues des projets (`ProjectStats`).
+
+    python manage.py reconcile_project_stats --batch-size 100 [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.models import Project
+from tracker.stats import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les compteurs d'issues de chaque projet par lots, "
+        "signale les écarts et les corrige."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Nombre de projets recalculés par lot (une transaction).',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Signale les écarts sans les corriger.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size doit être positif.')
+        fix = not options['dry_run']
+        checked = Project.objects.count()
+        drifted = 0
+        for project_id, drift in reconcile(batch_size=batch_size, fix=fix):
+            drifted += 1
+            details = ', '.join(
+                f'{field}={value or "-"} {stored} -> {actual}'
+                for (field, value), (stored, actual) in sorted(drift.items())
+            )
+            self.stdout.write(f'Projet {project_id} : {details}')
+
+        summary = f'{checked} projets vérifiés, {drifted} en écart'
+        if drifted and fix:
+            summary += ' (corrigés)'
+        elif drifted:
+            summary += ' (non corrigés : --dry-run)'
+        self.stdout.write(
+            self.style.SUCCESS(summary + '.') if not drifted or fix
+            else self.style.WARNING(summary + '.')
+        )
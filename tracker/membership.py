@@ -0,0 +1,220 @@
+"""
+Résolution des appartenances (Contributor) pour l'application tracker.
+
+Un même appel d'API vérifiait plusieurs fois que l'utilisateur est
+contributeur du projet (queryset, permissions, sérialiseur). Le
+`MembershipResolver` charge une seule fois par requête :
+- les projets de l'utilisateur courant et son rôle dans chacun
+- à la demande, les membres d'un projet (validation de l'assigné)
+
+Un cache process optionnel (`TRACKER_MEMBERSHIP_CACHE_TIMEOUT`, en
+secondes, désactivé à 0) évite de recharger ces données d'une requête à
+l'autre. Il est invalidé par les signaux save/delete de `Contributor`
+(voir `tracker/signals.py`).
+
+Les vues asynchrones chargent les rôles avec `await resolver.aload()`
+(ORM et cache asynchrones) ; les accès suivants ne font plus de requête.
+
+Les routes imbriquées lisent le rôle de l'utilisateur dans la requête
+qui charge leur parent (`role_subquery`) et le transmettent au résolveur
+(`remember_role`) : les vérifications suivantes sur ce projet ne
+chargent pas tous les rôles.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Subquery
+
+from .models import Contributor
+
+USER_CACHE_KEY = 'tracker:membership:user:{}'
+PROJECT_CACHE_KEY = 'tracker:membership:project:{}'
+REQUEST_ATTRIBUTE = '_tracker_membership'
+
+
+def normalize_id(value):
+    """Convertit un identifiant (kwarg d'URL, instance, int) en entier."""
+    if value is None:
+        return None
+    value = getattr(value, 'pk', value)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _cache_timeout():
+    return getattr(settings, 'TRACKER_MEMBERSHIP_CACHE_TIMEOUT', 0)
+
+
+def invalidate_cached_membership(user_id, project_id):
+    """Supprime les entrées du cache process pour un utilisateur/projet."""
+    cache.delete_many([
+        USER_CACHE_KEY.format(user_id),
+        PROJECT_CACHE_KEY.format(project_id),
+    ])
+
+
+class MembershipResolver:
+    """
+    Appartenances de l'utilisateur courant, chargées une fois par requête.
+
+    - `roles` : {project_id: rôle} pour l'utilisateur courant
+    - `members(project_id)` : {user_id: rôle} pour un projet donné
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._roles = None
+        self._members = {}
+        # Rôles connus avant le chargement de `roles` (project_id -> rôle)
+        self._known_roles = {}
+
+    @property
+    def user_id(self):
+        if self.user is None or not self.user.is_authenticated:
+            return None
+        return self.user.pk
+
+    @property
+    def roles(self):
+        """Rôles de l'utilisateur courant, indexés par projet."""
+        if self._roles is None:
+            self._roles = self._load_roles()
+        return self._roles
+
+    @property
+    def project_ids(self):
+        """Identifiants des projets dont l'utilisateur est contributeur."""
+        return list(self.roles)
+
+    def role(self, project_id):
+        """Rôle de l'utilisateur dans le projet, ou None."""
+        project_id = normalize_id(project_id)
+        if self._roles is None and project_id in self._known_roles:
+            return self._known_roles[project_id]
+        return self.roles.get(project_id)
+
+    def remember_role(self, project_id, role):
+        """Rôle (ou None) lu par une autre requête, pour ce projet."""
+        project_id = normalize_id(project_id)
+        if project_id is not None:
+            self._known_roles[project_id] = role
+
+    def role_subquery(self, project_ref):
+        """
+        Sous-requête du rôle de l'utilisateur dans le projet `project_ref`
+        (par ex. `OuterRef('project_id')`), NULL s'il n'y contribue pas.
+        """
+        return Subquery(
+            Contributor.objects.filter(
+                project_id=project_ref, user_id=self.user_id
+            ).values('role')[:1]
+        )
+
+    def is_contributor(self, project_id):
+        """L'utilisateur courant est-il contributeur du projet ?"""
+        return self.role(project_id) is not None
+
+    def is_author(self, project_id):
+        """L'utilisateur courant a-t-il le rôle `author` sur le projet ?"""
+        return self.role(project_id) == 'author'
+
+    def members(self, project_id):
+        """Membres d'un projet : {user_id: rôle}."""
+        project_id = normalize_id(project_id)
+        if project_id is None:
+            return {}
+        if project_id not in self._members:
+            self._members[project_id] = self._load_members(project_id)
+        return self._members[project_id]
+
+    def is_member(self, project_id, user):
+        """Un utilisateur donné est-il contributeur du projet ?"""
+        user_id = normalize_id(user)
+        if user_id is not None and user_id == self.user_id:
+            return self.is_contributor(project_id)
+        return user_id in self.members(project_id)
+
+    async def aload(self):
+        """Charge les rôles de l'utilisateur courant (vues asynchrones)."""
+        if self._roles is None:
+            self._roles = await self._aload_roles()
+        return self._roles
+
+    def invalidate(self):
+        """Oublie les données chargées (après ajout/retrait d'un membre)."""
+        self._roles = None
+        self._members = {}
+        self._known_roles = {}
+
+    def _load_roles(self):
+        user_id = self.user_id
+        if user_id is None:
+            return {}
+        key = USER_CACHE_KEY.format(user_id)
+        timeout = _cache_timeout()
+        if timeout:
+            roles = cache.get(key)
+            if roles is not None:
+                return roles
+        roles = dict(
+            Contributor.objects.filter(user_id=user_id).order_by(
+            ).values_list('project_id', 'role')
+        )
+        if timeout:
+            cache.set(key, roles, timeout)
+        return roles
+
+    async def _aload_roles(self):
+        user_id = self.user_id
+        if user_id is None:
+            return {}
+        key = USER_CACHE_KEY.format(user_id)
+        timeout = _cache_timeout()
+        if timeout:
+            roles = await cache.aget(key)
+            if roles is not None:
+                return roles
+        roles = {
+            project_id: role
+            async for project_id, role in Contributor.objects.filter(
+                user_id=user_id
+            ).order_by().values_list('project_id', 'role')
+        }
+        if timeout:
+            await cache.aset(key, roles, timeout)
+        return roles
+
+    def _load_members(self, project_id):
+        key = PROJECT_CACHE_KEY.format(project_id)
+        timeout = _cache_timeout()
+        if timeout:
+            members = cache.get(key)
+            if members is not None:
+                return members
+        members = dict(
+            Contributor.objects.filter(project_id=project_id).order_by(
+            ).values_list('user_id', 'role')
+        )
+        if timeout:
+            cache.set(key, members, timeout)
+        return members
+
+
+def get_membership(request):
+    """
+    Retourne le `MembershipResolver` attaché à la requête (créé au besoin).
+
+    Le résolveur est stocké sur la `HttpRequest` sous-jacente afin d'être
+    partagé entre la vue, les permissions et les sérialiseurs.
+    """
+    if request is None:
+        return MembershipResolver(None)
+    http_request = getattr(request, '_request', request)
+    resolver = getattr(http_request, REQUEST_ATTRIBUTE, None)
+    user = getattr(request, 'user', None)
+    if resolver is None or resolver.user is not user:
+        resolver = MembershipResolver(user)
+        setattr(http_request, REQUEST_ATTRIBUTE, resolver)
+    return resolver
@@ -0,0 +1,147 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Moteur plein texte natif (voir tracker/search.py)
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE tracker_searchentry_fts USING fts5(
+        title, body, project_id,
+        content='tracker_searchentry', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER tracker_searchentry_ai AFTER INSERT ON tracker_searchentry
+    BEGIN
+        INSERT INTO tracker_searchentry_fts(rowid, title, body, project_id)
+        VALUES (new.id, new.title, new.body, new.project_id);
+    END
+    """,
+    """
+    CREATE TRIGGER tracker_searchentry_ad AFTER DELETE ON tracker_searchentry
+    BEGIN
+        INSERT INTO tracker_searchentry_fts(
+            tracker_searchentry_fts, rowid, title, body, project_id
+        )
+        VALUES ('delete', old.id, old.title, old.body, old.project_id);
+    END
+    """,
+    """
+    CREATE TRIGGER tracker_searchentry_au AFTER UPDATE ON tracker_searchentry
+    BEGIN
+        INSERT INTO tracker_searchentry_fts(
+            tracker_searchentry_fts, rowid, title, body, project_id
+        )
+        VALUES ('delete', old.id, old.title, old.body, old.project_id);
+        INSERT INTO tracker_searchentry_fts(rowid, title, body, project_id)
+        VALUES (new.id, new.title, new.body, new.project_id);
+    END
+    """,
+]
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS tracker_searchentry_ai',
+    'DROP TRIGGER IF EXISTS tracker_searchentry_ad',
+    'DROP TRIGGER IF EXISTS tracker_searchentry_au',
+    'DROP TABLE IF EXISTS tracker_searchentry_fts',
+]
+POSTGRESQL_INSTALL = [
+    """
+    CREATE INDEX tracker_searchentry_fts ON tracker_searchentry USING GIN ((
+        setweight(to_tsvector('simple', title), 'A') ||
+        setweight(to_tsvector('simple', body), 'B')
+    ))
+    """,
+]
+POSTGRESQL_UNINSTALL = [
+    'DROP INDEX IF EXISTS tracker_searchentry_fts',
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+install_search_engine = run_vendor_sql({
+    'sqlite': SQLITE_INSTALL,
+    'postgresql': POSTGRESQL_INSTALL,
+})
+uninstall_search_engine = run_vendor_sql({
+    'sqlite': SQLITE_UNINSTALL,
+    'postgresql': POSTGRESQL_UNINSTALL,
+})
+
+
+def index_existing_rows(apps, schema_editor):
+    """Indexe les issues et commentaires existants (triggers FTS déjà posés)."""
+    Issue = apps.get_model('tracker', 'Issue')
+    Comment = apps.get_model('tracker', 'Comment')
+    SearchEntry = apps.get_model('tracker', 'SearchEntry')
+    sources = [
+        (
+            Issue.objects.order_by('pk').values_list(
+                'pk', 'project_id', 'title', 'description'
+            ),
+            lambda pk, project_id, title, description: SearchEntry(
+                kind='issue', project_id=project_id, issue_id=pk,
+                title=title, body=description,
+            ),
+        ),
+        (
+            Comment.objects.order_by('pk').values_list(
+                'pk', 'issue__project_id', 'issue_id', 'description'
+            ),
+            lambda pk, project_id, issue_id, description: SearchEntry(
+                kind='comment', project_id=project_id, issue_id=issue_id,
+                comment_id=pk, body=description,
+            ),
+        ),
+    ]
+    for queryset, build in sources:
+        batch = []
+        for row in queryset.iterator(chunk_size=1000):
+            batch.append(build(*row))
+            if len(batch) >= 1000:
+                SearchEntry.objects.bulk_create(batch)
+                batch = []
+        SearchEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0003_issue_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('issue', 'Issue'), ('comment', 'Comment')], max_length=10)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('comment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tracker.comment')),
+                ('issue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tracker.issue')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tracker.project')),
+            ],
+            options={
+                'verbose_name': 'Search entry',
+                'verbose_name_plural': 'Search entries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('comment__isnull', True)), fields=('issue',), name='searchentry_unique_issue'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchentry',
+            constraint=models.UniqueConstraint(fields=('comment',), name='searchentry_unique_comment'),
+        ),
+        migrations.RunPython(install_search_engine, uninstall_search_engine),
+        migrations.RunPython(index_existing_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def count_existing_issues(apps, schema_editor):
+    """Compteurs des issues existantes (GROUP BY projet et champs)."""
+    Issue = apps.get_model('tracker', 'Issue')
+    ProjectStats = apps.get_model('tracker', 'ProjectStats')
+    counters = {}
+    rows = Issue.objects.order_by().values(
+        'project_id', 'status', 'priority', 'tag', 'assignee_id'
+    ).annotate(count=Count('pk'))
+    for row in rows.iterator():
+        assignee = row['assignee_id']
+        for key in (
+            ('total', ''),
+            ('status', row['status']),
+            ('priority', row['priority']),
+            ('tag', row['tag']),
+            ('assignee', '' if assignee is None else str(assignee)),
+        ):
+            key = (row['project_id'], *key)
+            counters[key] = counters.get(key, 0) + row['count']
+    ProjectStats.objects.bulk_create(
+        [
+            ProjectStats(project_id=project_id, field=field, value=value,
+                         count=count)
+            for (project_id, field, value), count in counters.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_import_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('total', 'Total'), ('status', 'Status'), ('priority', 'Priority'), ('tag', 'Tag'), ('assignee', 'Assignee')], max_length=10)),
+                ('value', models.CharField(blank=True, max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_time', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='tracker.project')),
+            ],
+            options={
+                'verbose_name': 'Project stats',
+                'verbose_name_plural': 'Project stats',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='projectstats',
+            constraint=models.UniqueConstraint(fields=('project', 'field', 'value'), name='projectstats_unique_counter'),
+        ),
+        migrations.RunPython(count_existing_issues, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_project_refs(apps, schema_editor):
+    """Références des imports existants (projets encore présents)."""
+    ImportRun = apps.get_model('tracker', 'ImportRun')
+    ImportRef = apps.get_model('tracker', 'ImportRef')
+    Project = apps.get_model('tracker', 'Project')
+    for run in ImportRun.objects.exclude(project_refs={}).iterator():
+        existing = set(Project.objects.filter(
+            pk__in=run.project_refs.values()
+        ).values_list('pk', flat=True))
+        ImportRef.objects.bulk_create(
+            [
+                ImportRef(run=run, ref=ref, project_id=project_id)
+                for ref, project_id in run.project_refs.items()
+                if project_id in existing
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_project_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRef',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ref', models.CharField(max_length=255)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tracker.project')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='refs', to='tracker.importrun')),
+            ],
+            options={
+                'verbose_name': 'Import ref',
+                'verbose_name_plural': 'Import refs',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='importref',
+            constraint=models.UniqueConstraint(fields=('run', 'ref'), name='importref_unique_ref'),
+        ),
+        migrations.RunPython(copy_project_refs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='importrun',
+            name='project_refs',
+        ),
+    ]
@@ -0,0 +1,256 @@
+"""
+Mixins des ViewSets de l'application tracker.
+
+- ConditionalGetMixin : ETag sur list, ETag / Last-Modified sur retrieve
+- CachedListMixin : cache des réponses de list (voir `response_cache`)
+- NestedParentMixin : parent d'une route imbriquée, chargé une fois
+
+`build_validators`, `set_validators` et `page_not_modified` sont
+partagés avec les vues asynchrones (`tracker/async_views.py`), qui
+produisent les mêmes ETag.
+"""
+
+import hashlib
+
+from django.db.models import OuterRef
+from django.http import Http404
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from . import response_cache
+from .membership import get_membership, normalize_id
+
+
+def build_validators(name, request, values, required=False):
+    """
+    Retourne (etag, last_modified) pour des agrégats déjà calculés.
+
+    `name` : nom du ViewSet (il entre dans l'ETag).
+    (None, None) si `required` et que le queryset était vide.
+    """
+    if required and not any(values.values()):
+        return None, None
+
+    times = [
+        value for key, value in values.items()
+        if key.endswith('_time') and value is not None
+    ]
+    # Last-Modified est à la seconde près (l'ETag reste exact)
+    last_modified = int(max(times).timestamp()) if times else None
+    signature = '|'.join([
+        name,
+        str(request.user.pk),
+        request.get_full_path(),
+        *(f'{key}={values[key]}' for key in sorted(values)),
+    ])
+    etag = 'W/"{}"'.format(
+        hashlib.md5(signature.encode('utf-8')).hexdigest()
+    )
+    return etag, last_modified
+
+
+def page_not_modified(request, response):
+    """
+    ETag d'une page de liste rendue (empreinte MD5 du contenu, comme
+    `ConditionalGetMiddleware`) ; retourne un 304 si If-None-Match
+    correspond, sinon la réponse.
+
+    Limite : le 304 est décidé après la construction de la page. Les
+    requêtes (appartenances, page) et la sérialisation sont payées, seul
+    l'envoi du corps est évité. Des agrégats sur la fenêtre de la page
+    (MAX(updated_time), COUNT) n'auraient pas cette limite, mais ne
+    verraient pas tout ce que la page affiche (nom d'un auteur ou d'un
+    assigné modifié) : ils répondraient 304 à tort.
+
+    `request` : HttpRequest Django.
+    """
+    if response.status_code != 200:
+        return response
+    set_response_etag(response)
+    if 'ETag' not in response:
+        return response
+    return get_conditional_response(
+        request, etag=response['ETag'], response=response
+    )
+
+
+def set_validators(response, etag, last_modified):
+    """Ajoute ETag / Last-Modified à une réponse 200."""
+    if response.status_code == 200:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Requêtes conditionnelles (If-None-Match / If-Modified-Since).
+
+    Liste : l'ETag est l'empreinte de la page rendue
+    (`page_not_modified`, rappel après rendu). Aucune requête de plus,
+    mais un 304 coûte autant qu'un 200 côté serveur : requêtes et
+    sérialisation de la page sont exécutées, seul l'envoi est évité
+    (sauf page servie par le cache des réponses). Pas de Last-Modified :
+    à la seconde près et aveugle aux suppressions, il donnerait des 304
+    à tort.
+
+    Détail : les validateurs sont calculés par une requête d'agrégation
+    (`conditional_aggregates` : MAX(updated_time), COUNT...) limitée à
+    l'objet et à ses enfants, sans sérialiser la réponse. Si rien n'a
+    changé, la vue répond `304 Not Modified` sans exécuter la requête
+    principale. Les agrégats dont le nom se termine par `_time`
+    alimentent Last-Modified.
+
+    Le ViewSet doit fournir `get_base_queryset()` : le queryset filtré
+    selon les droits de l'utilisateur, sans optimisations.
+    """
+    conditional_aggregates = {}
+
+    def get_conditional_aggregates(self):
+        """Agrégats des validateurs (selon l'action si besoin)."""
+        return self.conditional_aggregates
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        response.add_post_render_callback(
+            lambda rendered: page_not_modified(request._request, rendered)
+        )
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        pk = normalize_id(kwargs[lookup_url_kwarg])
+        if pk is None:
+            # Identifiant invalide : 404 de get_object()
+            return super().retrieve(request, *args, **kwargs)
+        queryset = self.get_base_queryset().filter(
+            **{self.lookup_field: pk}
+        )
+        return self.conditional_response(
+            queryset, super().retrieve, request, *args, required=True,
+            **kwargs
+        )
+
+    def get_validators(self, queryset, required=False):
+        """
+        Retourne (etag, last_modified) pour le queryset.
+
+        (None, None) si `required` et que le queryset est vide : la vue
+        répond alors normalement (404).
+        """
+        values = queryset.order_by().aggregate(
+            **self.get_conditional_aggregates()
+        )
+        return build_validators(
+            type(self).__name__, self.request, values, required
+        )
+
+    def conditional_response(self, queryset, handler, request, *args,
+                             required=False, **kwargs):
+        """Répond 304 si les validateurs correspondent, sinon délègue."""
+        etag, last_modified = self.get_validators(queryset, required)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        not_modified = get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+
+class CachedListMixin:
+    """
+    Cache des pages de `list` (données sérialisées, avant rendu).
+
+    Le ViewSet fournit `get_cached_project_ids()` : les projets dont la
+    page dépend, ou None pour ne pas mettre en cache. L'en-tête
+    `X-Cache` (HIT / MISS) indique si la page vient du cache.
+    """
+
+    def get_cached_project_ids(self):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        project_ids = None
+        if response_cache.cache_timeout():
+            project_ids = self.get_cached_project_ids()
+        if project_ids is None:
+            return super().list(request, *args, **kwargs)
+
+        key = response_cache.build_list_key(
+            request, type(self).__name__, project_ids
+        )
+        data = response_cache.get_response(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.set_response(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class NestedParentMixin:
+    """
+    Parent d'une route imbriquée (projet des issues, issue des
+    commentaires), chargé une fois par requête et gardé sur la vue.
+
+    Une seule requête : le parent, ses ancêtres (select_related du
+    queryset) et le rôle de l'utilisateur dans le projet (sous-requête),
+    transmis au `MembershipResolver` de la requête.
+
+    Le ViewSet fournit `get_parent_queryset()` (filtré selon les kwargs
+    de l'URL, vide s'ils sont invalides) et `parent_project_field` :
+    l'identifiant du projet sur le parent.
+    """
+    parent_project_field = 'pk'
+
+    def get_parent_queryset(self):
+        raise NotImplementedError
+
+    def _annotated_parent_queryset(self):
+        return self.get_parent_queryset().annotate(
+            user_role=get_membership(self.request).role_subquery(
+                OuterRef(self.parent_project_field)
+            )
+        ).order_by()
+
+    def _set_parent(self, parent):
+        if parent is not None:
+            get_membership(self.request).remember_role(
+                getattr(parent, self.parent_project_field), parent.user_role
+            )
+        self._parent = parent
+        return parent
+
+    def get_parent(self):
+        """Parent de la route, None s'il n'existe pas."""
+        if not hasattr(self, '_parent'):
+            self._set_parent(self._annotated_parent_queryset().first())
+        return self._parent
+
+    async def aget_parent(self):
+        """`get_parent()` pour les vues asynchrones."""
+        if not hasattr(self, '_parent'):
+            self._set_parent(await self._annotated_parent_queryset().afirst())
+        return self._parent
+
+    def get_parent_or_404(self):
+        parent = self.get_parent()
+        if parent is None:
+            raise Http404
+        return parent
+
+    def has_parent_access(self):
+        """Le parent existe et l'utilisateur contribue à son projet."""
+        parent = self.get_parent()
+        return parent is not None and parent.user_role is not None
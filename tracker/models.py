@@ -6,6 +6,11 @@ Relations :
 - Contributor : Lien M2M entre User et Project (définit l'accès)
 - Issue : Problème/tâche dans un projet (assignable à un contributeur)
 - Comment : Commentaire sur un problème
+- SearchEntry : Index de recherche plein texte (issues et commentaires)
+- Change : Journal des modifications (synchronisation incrémentale)
+- ImportRun : Import NDJSON en masse et son point de reprise
+- ImportRef : Référence d'un projet importé -> projet créé
+- ProjectStats : Compteurs d'issues d'un projet, tenus à jour à l'écriture
 
 Règles de sécurité :
 - Seuls les contributeurs peuvent accéder à un projet
@@ -13,7 +18,7 @@ Règles de sécurité :
 - L'assigné d'un problème doit être contributeur du projet
 """
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 
@@ -51,6 +56,13 @@ class Project(models.Model):
         verbose_name = "Project"
         verbose_name_plural = "Projects"
         ordering = ['-created_time']
+        indexes = [
+            # Liste des projets triée par date de création
+            models.Index(
+                fields=['-created_time', '-id'],
+                name='project_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_type_display()})"
@@ -93,6 +105,18 @@ class Contributor(models.Model):
         verbose_name_plural = "Contributors"
         unique_together = ('user', 'project')
         ordering = ['-created_time']
+        # unique_together indexe déjà (user, project) ; ces index couvrent
+        # aussi le rôle pour résoudre les appartenances sans lire la table
+        indexes = [
+            models.Index(
+                fields=['user', 'project', 'role'],
+                name='contributor_user_role_idx'
+            ),
+            models.Index(
+                fields=['project', 'user', 'role'],
+                name='contributor_project_role_idx'
+            ),
+        ]
 
     def __str__(self):
         return (
@@ -101,6 +125,12 @@ class Contributor(models.Model):
         )
 
 
+# Champs d'une issue comptés par `ProjectStats`
+STATS_FIELDS = ('project_id', 'status', 'priority', 'tag', 'assignee_id')
+# Champs d'une issue indexés par la recherche (`SearchEntry`)
+SEARCH_FIELDS = ('title', 'description')
+
+
 class Issue(models.Model):
     """
     Problème/Tâche dans un projet.
@@ -178,10 +208,65 @@ class Issue(models.Model):
         verbose_name = "Issue"
         verbose_name_plural = "Issues"
         ordering = ['-created_time']
+        indexes = [
+            # Liste des issues d'un projet ; `-id` départage les dates
+            # pour la pagination par curseur
+            models.Index(
+                fields=['project', '-created_time', '-id'],
+                name='issue_project_created_idx'
+            ),
+            # Filtres status / priority / assignee / tag dans un projet
+            models.Index(
+                fields=['project', 'status', '-created_time', '-id'],
+                name='issue_project_status_idx'
+            ),
+            models.Index(
+                fields=['project', 'priority', '-created_time', '-id'],
+                name='issue_project_priority_idx'
+            ),
+            models.Index(
+                fields=['project', 'assignee', '-created_time', '-id'],
+                name='issue_project_assignee_idx'
+            ),
+            models.Index(
+                fields=['project', 'tag', '-created_time', '-id'],
+                name='issue_project_tag_idx'
+            ),
+            # Tri par date de modification (?ordering=updated_time)
+            models.Index(
+                fields=['project', '-updated_time', '-id'],
+                name='issue_project_updated_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} [{self.get_tag_display()}]"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valeurs lues en base : les compteurs du projet en déduisent les
+        # transitions (voir `tracker/stats.py`). Champs différés : relus
+        # à l'enregistrement
+        state = instance.__dict__
+        if all(name in state for name in STATS_FIELDS):
+            instance._loaded_stats = tuple(
+                state[name] for name in STATS_FIELDS
+            )
+        # Texte indexé : réindexé seulement s'il change (`tracker/search.py`)
+        if all(name in state for name in SEARCH_FIELDS):
+            instance._loaded_text = tuple(
+                state[name] for name in SEARCH_FIELDS
+            )
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Compteurs du projet (signal post_save) dans la transaction de
+        # l'écriture
+        using = kwargs.get('using')
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
     def clean(self):
         """
         Validation : l'assigné doit être contributeur du projet.
@@ -226,6 +311,238 @@ class Comment(models.Model):
         verbose_name = "Comment"
         verbose_name_plural = "Comments"
         ordering = ['-created_time']
+        indexes = [
+            # Liste des commentaires d'une issue
+            models.Index(
+                fields=['issue', '-created_time', '-id'],
+                name='comment_issue_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Comment on {self.issue.title} by {self.author.username}"
+
+
+class SearchEntry(models.Model):
+    """
+    Entrée de l'index de recherche : une par issue et par commentaire.
+
+    Maintenue à chaque save (signaux et chemins bulk, voir
+    `tracker/search.py`) ; supprimée en CASCADE avec l'issue ou le
+    commentaire. Le moteur plein texte de la base (FTS5, tsvector)
+    indexe `title` et `body`.
+    """
+    KIND_CHOICES = [
+        ('issue', 'Issue'),
+        ('comment', 'Comment'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    project = models.ForeignKey(
+        'tracker.Project',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    issue = models.ForeignKey(
+        'tracker.Issue',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    comment = models.ForeignKey(
+        'tracker.Comment',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Search entry"
+        verbose_name_plural = "Search entries"
+        constraints = [
+            # Une entrée par issue (comment NULL) et par commentaire
+            models.UniqueConstraint(
+                fields=['issue'],
+                condition=models.Q(comment__isnull=True),
+                name='searchentry_unique_issue'
+            ),
+            models.UniqueConstraint(
+                fields=['comment'],
+                name='searchentry_unique_comment'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.comment_id or self.issue_id}"
+
+
+class Change(models.Model):
+    """
+    Journal des créations / modifications / suppressions.
+
+    Alimenté par les signaux de `Project`, `Issue`, `Comment` et
+    `Contributor` (voir `tracker/changes.py`). L'identifiant, croissant,
+    sert de point de reprise à `/api/v1/sync/`.
+
+    `project_id` et `user_id` ne sont pas des clés étrangères : les
+    entrées (tombstones) survivent à la suppression du projet.
+    """
+    MODEL_CHOICES = [
+        ('project', 'Project'),
+        ('issue', 'Issue'),
+        ('comment', 'Comment'),
+        ('contributor', 'Contributor'),
+    ]
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+    ]
+
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    project_id = models.BigIntegerField()
+    # Utilisateur concerné (contributeurs uniquement)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    created_time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Change"
+        verbose_name_plural = "Changes"
+        indexes = [
+            # Changements des projets de l'utilisateur depuis un point
+            models.Index(
+                fields=['project_id', 'id'],
+                name='change_project_idx'
+            ),
+            # Ajout/retrait de l'utilisateur lui-même
+            models.Index(
+                fields=['user_id', 'id'],
+                name='change_user_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} {self.action}"
+
+
+class ImportRun(models.Model):
+    """
+    Import NDJSON en masse (voir `tracker/imports.py`).
+
+    `line` est la dernière ligne du fichier écrite en base : elle est
+    enregistrée dans la transaction de chaque lot, avec les références
+    des projets créés (`ImportRef`), pour reprendre l'import au lot
+    suivant après une interruption.
+    """
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('finished', 'Finished'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey(
+        'accounts.CustomUser',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    source = models.CharField(max_length=255, blank=True)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='running'
+    )
+    line = models.PositiveIntegerField(default=0)
+    projects = models.PositiveIntegerField(default=0)
+    issues = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Import run"
+        verbose_name_plural = "Import runs"
+        ordering = ['-created_time']
+
+    def __str__(self):
+        return f"Import #{self.pk} ({self.status}, ligne {self.line})"
+
+
+class ImportRef(models.Model):
+    """
+    Référence d'un projet du fichier importé -> projet créé.
+
+    Une ligne par projet : chaque lot n'insère que ses nouvelles
+    références et ne relit que celles qu'il cite.
+    """
+    run = models.ForeignKey(
+        'tracker.ImportRun',
+        on_delete=models.CASCADE,
+        related_name='refs'
+    )
+    ref = models.CharField(max_length=255)
+    project = models.ForeignKey(
+        'tracker.Project',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+
+    class Meta:
+        verbose_name = "Import ref"
+        verbose_name_plural = "Import refs"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['run', 'ref'],
+                name='importref_unique_ref'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.run_id} {self.ref} -> {self.project_id}"
+
+
+class ProjectStats(models.Model):
+    """
+    Compteur dénormalisé : nombre d'issues d'un projet par valeur d'un champ.
+
+    Une ligne par (projet, champ, valeur) : `total` (valeur vide),
+    `status`, `priority`, `tag` et `assignee` (id de l'utilisateur, vide
+    sans assigné). Mis à jour dans la transaction de chaque écriture
+    d'issue (voir `tracker/stats.py`) ; supprimé en CASCADE avec le projet.
+    """
+    FIELD_CHOICES = [
+        ('total', 'Total'),
+        ('status', 'Status'),
+        ('priority', 'Priority'),
+        ('tag', 'Tag'),
+        ('assignee', 'Assignee'),
+    ]
+
+    project = models.ForeignKey(
+        'tracker.Project',
+        on_delete=models.CASCADE,
+        related_name='stats'
+    )
+    field = models.CharField(max_length=10, choices=FIELD_CHOICES)
+    value = models.CharField(max_length=20, blank=True)
+    count = models.IntegerField(default=0)
+    updated_time = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Project stats"
+        verbose_name_plural = "Project stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'field', 'value'],
+                name='projectstats_unique_counter'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} {self.field}={self.value}: {self.count}"
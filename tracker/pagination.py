@@ -1,16 +1,361 @@
 """
 Pagination configuration for tracker app.
+
+- StandardPagination : page-number pagination (10 items per page),
+  switches to keyset mode when the request carries `?cursor=`.
+- KeysetPagination : keyset (cursor) pagination on `(created_time, id)`,
+  matching the models' `-created_time` ordering. No COUNT(*) and no
+  OFFSET unless the client asks for them (`?count=true` / `?page=N`).
+  Views may pick another datetime field or direction, and split the
+  ordering into segments (see `Keyset`).
+
+Both classes also provide `apaginate_queryset()` for the async read views
+(`tracker/async_views.py`): same pages, queries run with the async ORM.
 """
 
-from rest_framework.pagination import PageNumberPagination
+import base64
+from collections import OrderedDict, namedtuple
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+# Keyset ordering used by a view :
+# - field : datetime field, `pk` breaks ties
+# - descending : newest first
+# - segments : list of filter dicts walked in order (e.g. one per
+#   priority), each one read with the same `(field, pk)` keyset so that a
+#   `(..., segment column, field, id)` index serves every query
+Keyset = namedtuple('Keyset', ['field', 'descending', 'segments'])
+Keyset.__new__.__defaults__ = ('created_time', True, None)
+DEFAULT_KEYSET = Keyset()
+
+Cursor = namedtuple('Cursor', ['value', 'pk', 'direction', 'segment'])
+
+
+def encode_cursor(obj, direction='n', field='created_time', segment=None):
+    """
+    Opaque cursor for the position of `obj` in `(field, id)` order.
+
+    `direction` : 'n' for the items after `obj`, 'p' for those before it.
+    `segment` : index of the keyset segment `obj` belongs to, if any.
+    """
+    raw = f'{getattr(obj, field).isoformat()}|{obj.pk}|{direction}'
+    if segment is not None:
+        raw = f'{raw}|{segment}'
+    encoded = base64.urlsafe_b64encode(raw.encode('ascii'))
+    return encoded.decode('ascii').rstrip('=')
 
 
 class StandardPagination(PageNumberPagination):
     """
     Standard pagination with 10 items per page.
+
+    Passing `?cursor=` (even empty) selects keyset pagination instead.
     """
     page_size = 10
     page_size_query_param = 'page_size'
     page_size_query_description = 'Number of results to return per page.'
     max_page_size = 100
     page_query_description = 'A page number within the paginated result set.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` running its queries with the async ORM."""
+        self.keyset = None
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            return await self.keyset.apaginate_queryset(
+                queryset, request, view
+            )
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        # `count` is a cached property : set it from an async COUNT(*)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+        self.page.object_list = [
+            obj async for obj in self.page.object_list
+        ]
+        self.request = request
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination on `(created_time, id)`, newest first.
+
+    - `?cursor=<opaque>` : position returned in `next` / `previous`
+    - `?page_size=N` : page size (max 100)
+    - `?count=true` : also return the total count (one COUNT(*))
+    - `?page=N` : falls back to `StandardPagination` (page numbers)
+
+    A view can return another `Keyset` from `get_keyset()`. With
+    segments, a page costs one query per segment it spans.
+    """
+    page_size = StandardPagination.page_size
+    page_size_query_param = 'page_size'
+    max_page_size = StandardPagination.max_page_size
+    cursor_query_param = 'cursor'
+    cursor_query_description = 'The pagination cursor value.'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor.'
+    page_number_class = StandardPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_page_number(request):
+            return self.page_number.paginate_queryset(
+                queryset, request, view
+            )
+        if self.count_requested(request):
+            self.count = queryset.count()
+
+        rows = []
+        for index, segment_queryset in self.get_segments(
+            queryset, request, view
+        ):
+            limit = self.page_size_value + 1 - len(rows)
+            rows.extend((obj, index) for obj in segment_queryset[:limit])
+            if len(rows) > self.page_size_value:
+                break
+        return self.set_page(rows)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` running its queries with the async ORM."""
+        if self.use_page_number(request):
+            return await self.page_number.apaginate_queryset(
+                queryset, request, view
+            )
+        if self.count_requested(request):
+            self.count = await queryset.acount()
+
+        rows = []
+        for index, segment_queryset in self.get_segments(
+            queryset, request, view
+        ):
+            limit = self.page_size_value + 1 - len(rows)
+            rows.extend([
+                (obj, index) async for obj in segment_queryset[:limit]
+            ])
+            if len(rows) > self.page_size_value:
+                break
+        return self.set_page(rows)
+
+    def use_page_number(self, request):
+        """Reset the state ; True if `?page=N` selects page numbers."""
+        self.request = request
+        self.page_number = None
+        self.count = None
+        params = request.query_params
+        if (
+            self.cursor_query_param not in params
+            and self.page_number_class.page_query_param in params
+        ):
+            self.page_number = self.page_number_class()
+            return True
+        return False
+
+    def count_requested(self, request):
+        value = request.query_params.get(self.count_query_param, '')
+        return value.lower() in TRUE_VALUES
+
+    def get_segments(self, queryset, request, view):
+        """
+        Yield `(index, queryset)` for each segment to read, in order.
+
+        Segments are walked from the cursor's one, backwards for
+        'previous' ; the caller stops once it has a page and one more row.
+        """
+        params = request.query_params
+        self.page_size_value = self.get_page_size(request)
+        self.keyset = self.get_keyset(view)
+        segments = self.keyset.segments or [None]
+        self.position = self.decode_cursor(
+            params.get(self.cursor_query_param)
+        )
+        position = self.position
+        if position is not None and position.segment >= len(segments):
+            raise NotFound(self.invalid_cursor_message)
+        self.reverse = position is not None and position.direction == 'p'
+
+        current = position.segment if position is not None else 0
+        if self.reverse:
+            order = range(current, -1, -1)
+        else:
+            order = range(current, len(segments))
+
+        for index in order:
+            segment_queryset = queryset
+            if segments[index] is not None:
+                segment_queryset = segment_queryset.filter(**segments[index])
+            if index == current and position is not None:
+                segment_queryset = self.filter_after(
+                    segment_queryset, position, self.reverse
+                )
+            yield index, self.order(segment_queryset, self.reverse)
+
+    def set_page(self, rows):
+        """Keep one page of `(obj, segment index)` rows and the links."""
+        has_more = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        if self.reverse:
+            rows.reverse()
+
+        if self.reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        self.segment_indexes = [index for obj, index in rows]
+        self.page = [obj for obj, index in rows]
+        return self.page
+
+    def get_keyset(self, view):
+        get_keyset = getattr(view, 'get_keyset', None)
+        if get_keyset is None:
+            return DEFAULT_KEYSET
+        return get_keyset()
+
+    def filter_after(self, queryset, position, reverse):
+        """Rows strictly after (or before, if reversed) the cursor."""
+        field = self.keyset.field
+        after = self.keyset.descending == reverse
+        lookup = 'gt' if after else 'lt'
+        return queryset.filter(
+            Q(**{f'{field}__{lookup}': position.value})
+            | Q(**{field: position.value, f'pk__{lookup}': position.pk})
+        )
+
+    def order(self, queryset, reverse):
+        prefix = '-' if self.keyset.descending != reverse else ''
+        return queryset.order_by(f'{prefix}{self.keyset.field}', f'{prefix}pk')
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, encoded):
+        """Decode `value|id|direction[|segment]` from the opaque cursor."""
+        if not encoded:
+            return None
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            raw = base64.urlsafe_b64decode(encoded + padding).decode('ascii')
+            parts = raw.split('|')
+            if len(parts) == 3:
+                parts.append('0')
+            value, pk, direction, segment = parts
+            value = parse_datetime(value)
+            pk = int(pk)
+            segment = int(segment)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None or direction not in ('n', 'p') or segment < 0:
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(value, pk, direction, segment)
+
+    def encode_cursor(self, index, direction):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_number_class.page_query_param)
+        segment = None
+        if self.keyset.segments:
+            segment = self.segment_indexes[index]
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            encode_cursor(
+                self.page[index], direction, self.keyset.field, segment
+            )
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(-1, 'n')
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(0, 'p')
+
+    def get_paginated_response(self, data):
+        if self.page_number is not None:
+            return self.page_number.get_paginated_response(data)
+        payload = OrderedDict()
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'example': 123},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {
+                    'type': 'string', 'nullable': True, 'format': 'uri'
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': self.cursor_query_description,
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to true to include the total count.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
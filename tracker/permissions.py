@@ -9,7 +9,26 @@ Règles de sécurité implémentées :
 """
 
 from rest_framework.permissions import BasePermission
-from .models import Contributor
+from .membership import get_membership
+
+
+def get_project_id(obj):
+    """
+    Retourne l'identifiant du projet auquel `obj` appartient.
+
+    obj peut être :
+    - Project : son propre identifiant
+    - Issue / Contributor : obj.project_id
+    - Comment : obj.issue.project_id
+    """
+    if hasattr(obj, 'issue'):
+        # C'est un Comment - accéder au projet via issue
+        return obj.issue.project_id
+    if hasattr(obj, 'project_id'):
+        # C'est une Issue ou un Contributor
+        return obj.project_id
+    # C'est un Project
+    return obj.pk
 
 
 class IsProjectContributor(BasePermission):
@@ -30,21 +49,7 @@ class IsProjectContributor(BasePermission):
         - Issue : récupère le projet via obj.project
         - Comment : récupère le projet via obj.issue.project
         """
-        # Déterminer le projet en fonction du type d'objet
-        if hasattr(obj, 'project') and not hasattr(obj, 'issue'):
-            # C'est un Project ou Issue
-            project = obj.project
-        elif hasattr(obj, 'issue'):
-            # C'est un Comment - accéder au projet via issue
-            project = obj.issue.project
-        else:
-            # C'est un Project
-            project = obj
-
-        return Contributor.objects.filter(
-            user=request.user,
-            project=project
-        ).exists()
+        return get_membership(request).is_contributor(get_project_id(obj))
 
 
 class IsProjectAuthor(BasePermission):
@@ -118,21 +123,9 @@ class IsContributorOrReadOnly(BasePermission):
         """
         if request.method in ['GET', 'HEAD', 'OPTIONS']:
             # Lecture : vérifier si contributeur
-            # Déterminer le projet en fonction du type d'objet
-            if hasattr(obj, 'project'):
-                # C'est un Project ou Issue
-                project = obj.project
-            elif hasattr(obj, 'issue'):
-                # C'est un Comment - accéder au projet via issue
-                project = obj.issue.project
-            else:
-                # C'est un Project
-                project = obj
-
-            return Contributor.objects.filter(
-                user=request.user,
-                project=project
-            ).exists()
+            return get_membership(request).is_contributor(
+                get_project_id(obj)
+            )
 
         # Écriture : doit être l'auteur
         if hasattr(obj, 'author'):
@@ -0,0 +1,164 @@
+"""
+Cache des réponses des listes de projets et d'issues.
+
+Les données sérialisées d'une page sont mises en cache sous une clé
+construite depuis :
+- l'utilisateur, l'hôte et les paramètres de requête (triés)
+- le numéro de version de chaque projet concerné
+
+Chaque save/delete de `Project`, `Contributor`, `Issue` ou `Comment`
+incrémente la version du projet (voir `tracker/signals.py`) : les clés
+changent et une page périmée n'est jamais servie. Les chemins par lot
+(bulk_create / bulk_update) appellent `bump_project_version` eux-mêmes.
+
+Le cache utilisé est l'alias `TRACKER_RESPONSE_CACHE_ALIAS` de `CACHES`.
+`TRACKER_RESPONSE_CACHE_TIMEOUT` (0 par défaut) désactive le cache. Une
+valeur non nulle exige un backend partagé entre les process
+(`SHARED_BACKENDS` : Redis, Memcached, base de données) : la version
+d'un projet n'est incrémentée que dans le cache de l'écriture, un
+LocMemCache laisserait les autres workers servir des pages périmées.
+`check_configuration()` (au démarrage de l'application) refuse les
+autres backends. Les compteurs hits/misses sont stockés dans ce même
+cache.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+KEY_PREFIX = 'tracker:responses:'
+VERSION_KEY = KEY_PREFIX + 'version:project:{}'
+LIST_KEY = KEY_PREFIX + 'list:{}'
+HITS_KEY = KEY_PREFIX + 'hits'
+MISSES_KEY = KEY_PREFIX + 'misses'
+
+# Backends dont le contenu est commun à tous les process
+SHARED_BACKENDS = {
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django.core.cache.backends.db.DatabaseCache',
+    'django_redis.cache.RedisCache',
+}
+
+
+def get_cache():
+    """Backend de cache des réponses."""
+    return caches[getattr(settings, 'TRACKER_RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def cache_timeout():
+    """Durée de vie d'une page en cache (secondes), 0 = désactivé."""
+    return getattr(settings, 'TRACKER_RESPONSE_CACHE_TIMEOUT', 0)
+
+
+def check_configuration():
+    """Lève ImproperlyConfigured si le cache est activé sur un backend
+    propre à chaque process."""
+    if not cache_timeout():
+        return
+    alias = getattr(settings, 'TRACKER_RESPONSE_CACHE_ALIAS', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in SHARED_BACKENDS:
+        raise ImproperlyConfigured(
+            f'TRACKER_RESPONSE_CACHE_TIMEOUT exige un cache partagé entre '
+            f'les process pour l\'alias "{alias}" (backend actuel : '
+            f'{backend}). Utiliser Redis ou Memcached '
+            f'(TRACKER_RESPONSE_CACHE_BACKEND), ou mettre le délai à 0.'
+        )
+
+
+def _initial_version():
+    # Une version perdue (éviction) repart d'une valeur jamais utilisée,
+    # pour ne pas retomber sur d'anciennes pages encore en cache
+    return time.time_ns()
+
+
+def _incr(cache, key, initial=0):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, initial, None)
+        return cache.incr(key)
+
+
+def bump_project_version(project_id):
+    """Invalide les pages en cache qui dépendent du projet."""
+    if project_id is None or not cache_timeout():
+        return
+    _incr(get_cache(), VERSION_KEY.format(project_id), _initial_version())
+
+
+def get_project_versions(project_ids):
+    """Versions courantes des projets : {project_id: version}."""
+    cache = get_cache()
+    keys = {VERSION_KEY.format(pk): pk for pk in project_ids}
+    found = cache.get_many(keys)
+    versions = {keys[key]: value for key, value in found.items()}
+    for key, project_id in keys.items():
+        if key in found:
+            continue
+        value = _initial_version()
+        if not cache.add(key, value, None):
+            value = cache.get(key, value)
+        versions[project_id] = value
+    return versions
+
+
+def build_list_key(request, name, project_ids):
+    """
+    Clé d'une page de liste pour l'utilisateur courant.
+
+    `project_ids` : projets dont la page dépend (leurs versions entrent
+    dans la clé).
+    """
+    versions = get_project_versions(project_ids)
+    params = sorted(
+        (key, sorted(values)) for key, values in request.query_params.lists()
+    )
+    signature = '|'.join([
+        name,
+        str(request.user.pk),
+        request.get_host(),
+        request.path,
+        repr(params),
+        repr(sorted(versions.items())),
+    ])
+    return LIST_KEY.format(hashlib.md5(signature.encode('utf-8')).hexdigest())
+
+
+def get_response(key):
+    """Données en cache pour la clé (None si absente) ; compte hit/miss."""
+    cache = get_cache()
+    data = cache.get(key)
+    _incr(cache, HITS_KEY if data is not None else MISSES_KEY)
+    return data
+
+
+def set_response(key, data):
+    """Met en cache les données d'une page."""
+    get_cache().set(key, data, cache_timeout())
+
+
+def get_stats():
+    """Compteurs hits/misses du cache des réponses."""
+    cache = get_cache()
+    values = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = values.get(HITS_KEY, 0)
+    misses = values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'enabled': bool(cache_timeout()),
+        'backend': '{0.__module__}.{0.__name__}'.format(type(cache)),
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
+
+
+def reset_stats():
+    """Remet les compteurs à zéro."""
+    get_cache().delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,288 @@
+"""
+Recherche plein texte dans les issues et commentaires d'un projet.
+
+L'index est la table `SearchEntry` (une ligne par issue / commentaire) :
+- mise à jour au save d'un `Comment` et au save d'une `Issue` dont le
+  titre ou la description change (`tracker/signals.py`), et par les
+  chemins bulk (`index_issues`, `index_comments`)
+- suppressions par CASCADE avec l'issue ou le commentaire
+- indexation initiale des données existantes : migration `0004_search_index`
+- reconstruction par lots, une transaction par lot :
+  `python manage.py rebuild_search_index`
+
+Moteur selon la base (voir la migration 0004_search_index) :
+- SQLite : table FTS5 à contenu externe, tenue à jour par triggers,
+  classement bm25 (titre pondéré)
+- PostgreSQL : index GIN sur to_tsvector, classement ts_rank_cd
+- autres : repli sur icontains, sans classement
+"""
+
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import SEARCH_FIELDS, Comment, Issue, SearchEntry
+
+FTS_TABLE = 'tracker_searchentry_fts'
+# Poids du titre par rapport au corps dans le classement
+TITLE_WEIGHT = 10.0
+MAX_TERMS = 10
+SNIPPET_WORDS = 16
+
+# Même expression que l'index GIN de la migration (sinon pas d'index)
+PG_VECTOR = (
+    "setweight(to_tsvector('simple', title), 'A') || "
+    "setweight(to_tsvector('simple', body), 'B')"
+)
+
+
+def parse_terms(query):
+    """Mots de la requête (lettres/chiffres), sans syntaxe du moteur."""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def issue_entry(issue):
+    return SearchEntry(
+        kind='issue',
+        project_id=issue.project_id,
+        issue_id=issue.pk,
+        title=issue.title,
+        body=issue.description,
+    )
+
+
+def comment_entry(comment, project_id):
+    return SearchEntry(
+        kind='comment',
+        project_id=project_id,
+        issue_id=comment.issue_id,
+        comment_id=comment.pk,
+        body=comment.description,
+    )
+
+
+def _save_entry(entry, lookup, created):
+    # Une seule requête : INSERT à la création, UPDATE ensuite
+    if not created:
+        updated = SearchEntry.objects.filter(**lookup).update(
+            title=entry.title,
+            body=entry.body,
+        )
+        if updated:
+            return
+    entry.save(force_insert=True)
+
+
+def index_issue(issue, created=False):
+    """Ajoute ou met à jour l'entrée d'une issue."""
+    _save_entry(
+        issue_entry(issue),
+        {'issue_id': issue.pk, 'comment__isnull': True},
+        created,
+    )
+
+
+def issue_text_changed(issue, update_fields=None):
+    """
+    Le titre ou la description de l'issue a-t-il changé depuis sa
+    lecture en base ? True si les valeurs lues sont inconnues.
+    """
+    if update_fields is not None and not set(update_fields) & set(
+        SEARCH_FIELDS
+    ):
+        return False
+    current = tuple(getattr(issue, name) for name in SEARCH_FIELDS)
+    changed = getattr(issue, '_loaded_text', None) != current
+    issue._loaded_text = current
+    return changed
+
+
+def index_comment(comment, project_id, created=False):
+    """Ajoute ou met à jour l'entrée d'un commentaire."""
+    _save_entry(
+        comment_entry(comment, project_id),
+        {'comment_id': comment.pk},
+        created,
+    )
+
+
+def index_issues(issues, created=False):
+    """
+    Indexe un lot d'issues (chemins bulk_create / bulk_update).
+
+    Un INSERT pour un lot créé ; sinon DELETE + INSERT. À appeler dans
+    la transaction de l'écriture du lot.
+    """
+    issues = [issue for issue in issues if issue.pk is not None]
+    if not issues:
+        return
+    if not created:
+        SearchEntry.objects.filter(
+            issue_id__in=[issue.pk for issue in issues],
+            comment__isnull=True,
+        ).delete()
+    SearchEntry.objects.bulk_create([issue_entry(issue) for issue in issues])
+
+
+def index_comments(comments, project_ids):
+    """
+    Indexe un lot de commentaires créés par bulk_create.
+
+    `project_ids` : issue_id -> project_id. À appeler dans la
+    transaction de l'écriture du lot.
+    """
+    SearchEntry.objects.bulk_create([
+        comment_entry(comment, project_ids[comment.issue_id])
+        for comment in comments
+        if comment.pk is not None
+    ])
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Reconstruit tout l'index par lots de `batch_size` lignes.
+
+    Chaque lot est remplacé (DELETE + INSERT de ses entrées) dans sa
+    propre transaction : le verrou d'écriture (SQLite) n'est tenu que le
+    temps d'un lot et la recherche reste disponible pendant la
+    reconstruction. Les entrées des lignes supprimées partent avec elles
+    (CASCADE) : aucune entrée orpheline à effacer.
+
+    Retourne (nombre d'issues, nombre de commentaires) indexés.
+    """
+    sources = [
+        (
+            Issue.objects.only('pk', 'project_id', 'title', 'description'),
+            issue_entry,
+            lambda ids: Q(issue_id__in=ids, comment__isnull=True),
+        ),
+        (
+            Comment.objects.only(
+                'pk', 'issue_id', 'description', 'issue__project_id'
+            ).select_related('issue'),
+            lambda comment: comment_entry(comment, comment.issue.project_id),
+            lambda ids: Q(comment_id__in=ids),
+        ),
+    ]
+    counts = []
+    for queryset, build, entries in sources:
+        count, last = 0, 0
+        while True:
+            # Pagination par clé : pas de curseur ouvert entre les lots
+            rows = list(queryset.filter(pk__gt=last).order_by('pk')[
+                :batch_size
+            ])
+            if not rows:
+                break
+            with transaction.atomic():
+                SearchEntry.objects.filter(
+                    entries([row.pk for row in rows])
+                ).delete()
+                SearchEntry.objects.bulk_create([build(row) for row in rows])
+            count += len(rows)
+            last = rows[-1].pk
+        counts.append(count)
+    get_engine().optimize()
+    return tuple(counts)
+
+
+class FallbackEngine:
+    """Repli sans moteur plein texte : icontains, plus récents d'abord."""
+
+    def search(self, project_id, terms, limit):
+        queryset = SearchEntry.objects.filter(project_id=project_id)
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(body__icontains=term)
+            )
+        return [
+            self.result(entry, None, entry.body[:200])
+            for entry in queryset.order_by('-pk')[:limit]
+        ]
+
+    def optimize(self):
+        pass
+
+    @staticmethod
+    def result(entry, score, snippet):
+        return {
+            'type': entry.kind,
+            'id': entry.comment_id or entry.issue_id,
+            'issue_id': entry.issue_id,
+            'title': entry.title,
+            'snippet': snippet,
+            'score': score,
+        }
+
+    def fetch(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        entries = SearchEntry.objects.in_bulk([row[0] for row in rows])
+        return [
+            self.result(entries[pk], score, snippet)
+            for pk, score, snippet in rows
+            if pk in entries
+        ]
+
+
+class SQLiteEngine(FallbackEngine):
+    """FTS5 : préfixes, classement bm25, projet filtré dans l'index."""
+
+    def search(self, project_id, terms, limit):
+        words = ' AND '.join(f'"{term}"*' for term in terms)
+        match = f'project_id:"{int(project_id)}" AND {{title body}}:({words})'
+        sql = (
+            f'SELECT e.id, -bm25({FTS_TABLE}, %s, 1.0, 0.0) AS score, '
+            f"snippet({FTS_TABLE}, 1, '', '', '…', %s) "
+            f'FROM {FTS_TABLE} '
+            f'JOIN tracker_searchentry e ON e.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND e.project_id = %s '
+            'ORDER BY score DESC LIMIT %s'
+        )
+        return self.fetch(
+            sql,
+            [TITLE_WEIGHT, SNIPPET_WORDS, match, project_id, limit],
+        )
+
+    def optimize(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+            )
+
+
+class PostgreSQLEngine(FallbackEngine):
+    """tsvector / tsquery : préfixes, classement ts_rank_cd."""
+
+    def search(self, project_id, terms, limit):
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        sql = (
+            f'SELECT id, ts_rank_cd({PG_VECTOR}, query) AS score, '
+            "ts_headline('simple', body, query, 'StartSel=\"\",StopSel=\"\","
+            f"MaxWords={SNIPPET_WORDS},MinWords=5') "
+            "FROM tracker_searchentry, to_tsquery('simple', %s) query "
+            f'WHERE project_id = %s AND ({PG_VECTOR}) @@ query '
+            'ORDER BY score DESC LIMIT %s'
+        )
+        return self.fetch(sql, [tsquery, project_id, limit])
+
+
+ENGINES = {
+    'sqlite': SQLiteEngine,
+    'postgresql': PostgreSQLEngine,
+}
+
+
+def get_engine():
+    """Moteur de recherche de la base courante."""
+    return ENGINES.get(connection.vendor, FallbackEngine)()
+
+
+def search_project(project_id, query, limit=20):
+    """Résultats classés (meilleurs d'abord) pour `query` dans le projet."""
+    terms = parse_terms(query)
+    if not terms:
+        return []
+    return get_engine().search(project_id, terms, limit)
@@ -3,8 +3,11 @@ Sérialiseurs pour l'application tracker.
 
 Contient :
 - ProjectListSerializer / ProjectDetailSerializer : Gestion des projets
+- ProjectSyncSerializer : État d'un projet pour la synchronisation
 - ContributorSerializer : Gestion des contributeurs
 - IssueListSerializer / IssueDetailSerializer : Gestion des problèmes (issues)
+- IssueExportSerializer : Issue exportée avec ses commentaires
+- IssueImportSerializer / ImportRunSerializer : Import NDJSON en masse
 - CommentSerializer : Gestion des commentaires
 
 Validations métier importantes :
@@ -13,8 +16,13 @@ Validations métier importantes :
 """
 
 from rest_framework import serializers
+from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
 from django.contrib.auth import get_user_model
-from .models import Project, Contributor, Issue, Comment
+from .models import Project, Contributor, Issue, Comment, ImportRun
+from .membership import get_membership
+from .pagination import KeysetPagination, encode_cursor
+from .stats import read_stats
 
 User = get_user_model()
 
@@ -32,6 +40,7 @@ class ContributorSerializer(serializers.ModelSerializer):
     Sérialiseur pour Contributor.
 
     Validation : Empêche les doublons.
+    L'existence de l'utilisateur est vérifiée par le champ `user_id`.
 
     Un utilisateur ne peut être contributeur qu'une fois.
     """
@@ -47,12 +56,6 @@ class ContributorSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'user_id', 'project', 'role', 'created_time']
         read_only_fields = ['id', 'created_time', 'project']
 
-    def validate_user_id(self, value):
-        """Vérifie que l'utilisateur existe."""
-        if not User.objects.filter(id=value.id).exists():
-            raise serializers.ValidationError("Utilisateur introuvable.")
-        return value
-
     def create(self, validated_data):
         """
         Empêcher les doublons.
@@ -87,14 +90,28 @@ class ProjectListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'author', 'created_time']
 
     def get_contributors_count(self, obj):
-        """Nombre de contributeurs du projet."""
-        return obj.contributors.count()
+        """
+        Nombre de contributeurs du projet.
+
+        Utilise l'annotation `contributors_count` posée par la vue liste
+        (COUNT en base) et ne compte la relation qu'à défaut.
+        """
+        count = getattr(obj, 'contributors_count', None)
+        if count is None:
+            count = obj.contributors.count()
+        return count
 
 
 class ProjectDetailSerializer(serializers.ModelSerializer):
-    """Sérialiseur pour les détails d'un projet (vue complète)."""
+    """
+    Sérialiseur pour les détails d'un projet (vue complète).
+
+    `issue_stats` : nombre d'issues au total, par statut, priorité, tag
+    et assigné (compteurs dénormalisés, voir `tracker/stats.py`).
+    """
     author = UserBasicSerializer(read_only=True)
     contributors = ContributorSerializer(many=True, read_only=True)
+    issue_stats = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
@@ -105,11 +122,33 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
             'type',
             'author',
             'contributors',
+            'issue_stats',
             'created_time',
             'updated_time'
         ]
         read_only_fields = ['id', 'author', 'created_time', 'updated_time']
 
+    def get_issue_stats(self, obj):
+        """Compteurs du projet (préchargés par la vue détail)."""
+        return read_stats(obj.stats.all())
+
+
+class ProjectSyncSerializer(ProjectDetailSerializer):
+    """
+    État d'un projet renvoyé par `/api/v1/sync/`.
+
+    Sans la liste des contributeurs ni les compteurs d'issues : leurs
+    changements sont synchronisés séparément.
+    """
+    contributors = None
+    issue_stats = None
+
+    class Meta(ProjectDetailSerializer.Meta):
+        fields = [
+            field for field in ProjectDetailSerializer.Meta.fields
+            if field not in ('contributors', 'issue_stats')
+        ]
+
 
 class CommentSerializer(serializers.ModelSerializer):
     """Sérialiseur pour le modèle `Comment`."""
@@ -162,8 +201,16 @@ class IssueListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'author', 'created_time']
 
     def get_comments_count(self, obj):
-        """Retourne le nombre de commentaires d'une issue."""
-        return obj.comments.count()
+        """
+        Retourne le nombre de commentaires d'une issue.
+
+        Utilise l'annotation `comments_count` posée par la vue liste
+        (COUNT en base) et ne compte la relation qu'à défaut.
+        """
+        count = getattr(obj, 'comments_count', None)
+        if count is None:
+            count = obj.comments.count()
+        return count
 
 
 class IssueDetailSerializer(serializers.ModelSerializer):
@@ -171,7 +218,17 @@ class IssueDetailSerializer(serializers.ModelSerializer):
     Sérialiseur pour les détails d'une issue (avec commentaires).
 
     Validation critique : L'assigné doit être contributeur du projet.
+
+    Commentaires : si le contexte contient `embed_comments` (détail d'une
+    issue), seuls les `embedded_comments` plus récents sont inclus, avec
+    `comments_next` pointant vers la suite (pagination par curseur).
+    `?expand=comments` en inclut jusqu'à `expanded_comments`.
+    Une vue peut les charger elle-même dans `instance.recent_comments`
+    (`get_comments_limit() + 1` lignes de `recent_comments_queryset()`).
     """
+    embedded_comments = 5
+    expanded_comments = KeysetPagination.max_page_size
+
     author = UserBasicSerializer(read_only=True, allow_null=True)
     assignee_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(),
@@ -179,7 +236,6 @@ class IssueDetailSerializer(serializers.ModelSerializer):
         allow_null=True,
         source='assignee'
     )
-    comments = CommentSerializer(many=True, read_only=True)
 
     class Meta:
         model = Issue
@@ -193,7 +249,6 @@ class IssueDetailSerializer(serializers.ModelSerializer):
             'status',
             'author',
             'assignee_id',
-            'comments',
             'created_time',
             'updated_time'
         ]
@@ -205,6 +260,66 @@ class IssueDetailSerializer(serializers.ModelSerializer):
             'updated_time',
         ]
 
+    def to_representation(self, instance):
+        """Ajoute les derniers commentaires pour le détail d'une issue."""
+        data = super().to_representation(instance)
+        if self.context.get('embed_comments'):
+            comments, next_url = self.get_embedded_comments(instance)
+            data['comments'] = CommentSerializer(
+                comments,
+                many=True,
+                context=self.context
+            ).data
+            data['comments_next'] = next_url
+        return data
+
+    def get_comments_limit(self):
+        """Nombre de commentaires inclus (`?expand=comments`)."""
+        request = self.context.get('request')
+        if request is not None:
+            expand = request.query_params.get('expand', '')
+            if 'comments' in expand.split(','):
+                return self.expanded_comments
+        return self.embedded_comments
+
+    @staticmethod
+    def recent_comments_queryset(instance):
+        return instance.comments.select_related('author').order_by(
+            '-created_time', '-pk'
+        )
+
+    def get_embedded_comments(self, instance):
+        """
+        Retourne (commentaires les plus récents, lien vers la suite).
+
+        Une seule requête : `limit + 1` lignes pour savoir s'il en reste.
+        """
+        request = self.context.get('request')
+        limit = self.get_comments_limit()
+        comments = getattr(instance, 'recent_comments', None)
+        if comments is None:
+            comments = list(
+                self.recent_comments_queryset(instance)[:limit + 1]
+            )
+        if len(comments) <= limit:
+            return comments, None
+
+        comments = comments[:limit]
+        next_url = reverse(
+            'comment-list-create',
+            kwargs={
+                'project_pk': instance.project_id,
+                'issue_pk': instance.pk,
+            },
+            request=request,
+        )
+        next_url = replace_query_param(
+            next_url,
+            KeysetPagination.cursor_query_param,
+            encode_cursor(comments[-1])
+        )
+        return comments, next_url
+
     def validate_assignee_id(self, value):
         """
         Validation critique : L'assigné doit être contributeur du projet.
@@ -227,10 +342,8 @@ class IssueDetailSerializer(serializers.ModelSerializer):
                     "pour valider l'assigné."
                 )
 
-        if not Contributor.objects.filter(
-            user=value,
-            project=project
-        ).exists():
+        membership = get_membership(self.context.get('request'))
+        if not membership.is_member(project, value):
             raise serializers.ValidationError(
                 "L'assigné doit être un contributeur du projet."
             )
@@ -244,3 +357,82 @@ class IssueDetailSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         """Validation des données saisies."""
         return attrs
+
+
+class IssueBulkSerializer(IssueDetailSerializer):
+    """
+    Sérialiseur d'un élément de l'endpoint bulk des issues.
+
+    Les règles sont celles de `IssueDetailSerializer`, mais l'assigné est
+    validé contre l'instantané des membres du projet (une seule requête
+    pour tout le lot) au lieu d'une requête `User` par élément.
+    """
+    assignee_id = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta(IssueDetailSerializer.Meta):
+        pass
+
+    def validate_assignee_id(self, value):
+        """L'assigné doit être contributeur du projet (instantané)."""
+        if value is None:
+            return value
+        project = self.context['project']
+        membership = get_membership(self.context.get('request'))
+        if not membership.is_member(project, value):
+            raise serializers.ValidationError(
+                "L'assigné doit être un contributeur du projet."
+            )
+        return value
+
+
+class IssueExportSerializer(IssueDetailSerializer):
+    """
+    Issue exportée (`tracker/export.py`) avec tous ses commentaires.
+
+    Les commentaires (et leurs auteurs) doivent être préchargés.
+    """
+    comments = CommentSerializer(many=True, read_only=True)
+
+    class Meta(IssueDetailSerializer.Meta):
+        fields = IssueDetailSerializer.Meta.fields + ['comments']
+
+
+class IssueImportSerializer(IssueBulkSerializer):
+    """
+    Issue d'un import NDJSON (`tracker/imports.py`).
+
+    L'assigné est validé contre les membres du projet préchargés par
+    l'import (`members` dans le contexte, mis à jour pour chaque ligne) :
+    aucune requête par issue.
+    """
+
+    class Meta(IssueBulkSerializer.Meta):
+        pass
+
+    def validate_assignee_id(self, value):
+        """L'assigné doit être contributeur du projet (membres préchargés)."""
+        if value is not None and value not in self.context['members']:
+            raise serializers.ValidationError(
+                "L'assigné doit être un contributeur du projet."
+            )
+        return value
+
+
+class ImportRunSerializer(serializers.ModelSerializer):
+    """État d'un import NDJSON (`/api/v1/imports/`)."""
+
+    class Meta:
+        model = ImportRun
+        fields = [
+            'id',
+            'source',
+            'status',
+            'line',
+            'projects',
+            'issues',
+            'comments',
+            'errors',
+            'created_time',
+            'updated_time'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,206 @@
+"""
+Signaux de l'application tracker.
+
+- Invalidation du cache des appartenances à chaque save/delete de
+  `Contributor` (voir `tracker/membership.py`)
+- Incrément de la version du projet à chaque save/delete de `Project`,
+  `Contributor`, `Issue` ou `Comment` (voir `tracker/response_cache.py`)
+- Mise à jour de l'index de recherche à chaque save de `Comment` et au
+  save d'une `Issue` dont le texte change (voir `tracker/search.py`)
+- Journal des modifications à chaque save/delete de `Project`, `Issue`,
+  `Comment` ou `Contributor` (voir `tracker/changes.py`)
+- Compteurs d'issues du projet à chaque save/delete d'`Issue` et à la
+  suppression d'un utilisateur (voir `tracker/stats.py`)
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import changes, stats
+from .membership import invalidate_cached_membership
+from .models import Project, Contributor, Issue, Comment
+from .response_cache import bump_project_version, cache_timeout
+from .search import index_comment, index_issue, issue_text_changed
+
+
+def is_cascade(origin, model):
+    """
+    La suppression vient-elle d'un autre modèle (CASCADE) ?
+
+    Le receiver du modèle à l'origine de la suppression invalide déjà
+    le projet : inutile de le refaire pour chaque objet lié.
+    """
+    if origin is None:
+        return False
+    if isinstance(origin, QuerySet):
+        return not issubclass(origin.model, model)
+    return not isinstance(origin, model)
+
+
+@receiver(post_save, sender=Contributor)
+@receiver(post_delete, sender=Contributor)
+def invalidate_contributor_membership(sender, instance, **kwargs):
+    """Invalide le cache des appartenances de l'utilisateur et du projet."""
+    invalidate_cached_membership(instance.user_id, instance.project_id)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def bump_project(sender, instance, **kwargs):
+    """Invalide les pages en cache du projet."""
+    bump_project_version(instance.pk)
+
+
+@receiver(post_save, sender=Contributor)
+@receiver(post_save, sender=Issue)
+def bump_parent_project(sender, instance, **kwargs):
+    """Invalide les pages en cache du projet du contributeur/de l'issue."""
+    bump_project_version(instance.project_id)
+
+
+@receiver(post_delete, sender=Contributor)
+@receiver(post_delete, sender=Issue)
+def bump_parent_project_on_delete(sender, instance, origin=None, **kwargs):
+    """Idem à la suppression, sauf suppression en cascade du projet."""
+    if not is_cascade(origin, sender):
+        bump_project_version(instance.project_id)
+
+
+@receiver(post_save, sender=Comment)
+def bump_comment_project(sender, instance, **kwargs):
+    """Invalide les pages en cache du projet du commentaire."""
+    if cache_timeout():
+        bump_project_version(get_comment_project_id(instance))
+
+
+@receiver(post_delete, sender=Comment)
+def bump_comment_project_on_delete(sender, instance, origin=None, **kwargs):
+    """Idem à la suppression, sauf suppression en cascade de l'issue."""
+    if cache_timeout() and not is_cascade(origin, sender):
+        bump_project_version(get_comment_project_id(instance))
+
+
+def get_comment_project_id(comment):
+    """
+    Projet du commentaire, sans requête si l'issue est déjà chargée.
+
+    Le résultat est gardé sur l'instance (plusieurs receivers).
+    """
+    if Comment.issue.is_cached(comment):
+        return comment.issue.project_id
+    if not hasattr(comment, '_tracker_project_id'):
+        comment._tracker_project_id = Issue.objects.filter(
+            pk=comment.issue_id
+        ).values_list('project_id', flat=True).first()
+    return comment._tracker_project_id
+
+
+@receiver(post_save, sender=Issue)
+def index_saved_issue(sender, instance, created, update_fields=None,
+                      **kwargs):
+    """
+    Ajoute ou met à jour l'issue dans l'index de recherche, seulement si
+    son titre ou sa description change (comme le chemin bulk).
+    """
+    if issue_text_changed(instance, update_fields):
+        index_issue(instance, created)
+
+
+@receiver(post_save, sender=Comment)
+def index_saved_comment(sender, instance, created, **kwargs):
+    """Ajoute ou met à jour le commentaire dans l'index de recherche."""
+    index_comment(instance, get_comment_project_id(instance), created)
+
+
+def get_project_id(model, instance):
+    if model == 'project':
+        return instance.pk
+    if model == 'comment':
+        return get_comment_project_id(instance)
+    return instance.project_id
+
+
+CHANGE_MODELS = {
+    Project: 'project',
+    Issue: 'issue',
+    Comment: 'comment',
+    Contributor: 'contributor',
+}
+
+
+def record_saved(sender, instance, created, raw=False, **kwargs):
+    """Journalise la création ou la modification."""
+    if raw:
+        return
+    model = CHANGE_MODELS[sender]
+    changes.record(
+        model,
+        instance,
+        'created' if created else 'updated',
+        get_project_id(model, instance),
+    )
+
+
+def record_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Journalise la suppression.
+
+    En cascade, seul le parent est journalisé, sauf les contributeurs
+    (l'utilisateur retiré doit l'apprendre).
+    """
+    model = CHANGE_MODELS[sender]
+    if model != 'contributor' and is_cascade(origin, sender):
+        return
+    changes.record(model, instance, 'deleted', get_project_id(model, instance))
+
+
+for change_model in CHANGE_MODELS:
+    post_save.connect(
+        record_saved,
+        sender=change_model,
+        dispatch_uid=f'tracker_change_saved_{change_model.__name__}',
+    )
+    post_delete.connect(
+        record_deleted,
+        sender=change_model,
+        dispatch_uid=f'tracker_change_deleted_{change_model.__name__}',
+    )
+
+
+@receiver(pre_save, sender=Issue)
+def load_issue_stats(sender, instance, **kwargs):
+    """Valeurs en base avant la modification (transitions des compteurs)."""
+    if not instance._state.adding:
+        instance._previous_stats = stats.loaded_values(instance)
+
+
+@receiver(post_save, sender=Issue)
+def count_saved_issue(sender, instance, created, update_fields=None,
+                      **kwargs):
+    """Met à jour les compteurs du projet (création, transition)."""
+    stats.issue_saved(
+        instance,
+        created,
+        previous=instance.__dict__.pop('_previous_stats', None),
+        update_fields=update_fields,
+    )
+
+
+@receiver(post_delete, sender=Issue)
+def count_deleted_issue(sender, instance, origin=None, **kwargs):
+    """Idem à la suppression, sauf en cascade du projet (compteurs
+    supprimés avec lui)."""
+    if isinstance(origin, QuerySet):
+        origin = origin.model
+    elif origin is not None:
+        origin = type(origin)
+    if origin is None or not issubclass(origin, Project):
+        stats.issue_deleted(instance)
+
+
+@receiver(post_delete, sender=get_user_model())
+def reassign_user_issues(sender, instance, **kwargs):
+    """Issues de l'utilisateur supprimé passées sans assigné (SET_NULL)."""
+    stats.reassign_deleted_user(instance.pk)
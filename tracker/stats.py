@@ -0,0 +1,349 @@
+"""
+Compteurs d'issues des projets, dénormalisés dans `ProjectStats`.
+
+Une ligne par (projet, champ, valeur) : total, statut, priorité, tag et
+assigné. Les compteurs sont mis à jour dans la transaction de l'écriture :
+- save / delete d'une issue : signaux (`tracker/signals.py`) ;
+  `Issue.save` est atomique, le compteur est écrit avec l'issue
+- chemins bulk (bulk_create / bulk_update, import) : `record_created`
+  et `record_changed`
+- suppressions groupées : `batch()` regroupe les deltas en une écriture
+- suppression d'un projet : CASCADE ; d'un utilisateur : ses issues
+  assignées (SET_NULL) passent sans assigné (`reassign_deleted_user`)
+
+Chaque écriture est un UPDATE `count = count + delta` (pas de lecture
+préalable) ; les lignes manquantes sont créées à la volée.
+
+Lecture (`read_stats`) : les lignes du projet, en une requête quelle que
+soit la taille du projet. `python manage.py reconcile_project_stats`
+recalcule tout par lots et signale les écarts.
+"""
+
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.utils import timezone
+
+from .models import STATS_FIELDS, Issue, Project, ProjectStats
+
+STATUSES = [value for value, _ in Issue.STATUS_CHOICES]
+PRIORITIES = [value for value, _ in Issue.PRIORITY_CHOICES]
+TAGS = [value for value, _ in Issue.TAG_CHOICES]
+# Compteurs créés ensemble au premier passage d'un projet : les
+# transitions suivantes ne font qu'un UPDATE
+FIXED_KEYS = [
+    ('total', ''),
+    *[('status', value) for value in STATUSES],
+    *[('priority', value) for value in PRIORITIES],
+    *[('tag', value) for value in TAGS],
+    ('assignee', ''),
+]
+# Compteurs modifiés par UPDATE (taille des expressions CASE)
+UPDATE_CHUNK_SIZE = 100
+
+_buffer = threading.local()
+
+
+def issue_keys(values):
+    """Compteurs (champ, valeur) d'une issue, `values` dans l'ordre de
+    `STATS_FIELDS`."""
+    _, status, priority, tag, assignee_id = values
+    return [
+        ('total', ''),
+        ('status', status),
+        ('priority', priority),
+        ('tag', tag),
+        ('assignee', '' if assignee_id is None else str(assignee_id)),
+    ]
+
+
+def current_values(issue):
+    return tuple(getattr(issue, name) for name in STATS_FIELDS)
+
+
+def loaded_values(issue):
+    """Valeurs en base d'une issue existante (relues si inconnues)."""
+    values = getattr(issue, '_loaded_stats', None)
+    if values is None and issue.pk is not None:
+        values = Issue.objects.filter(pk=issue.pk).values_list(
+            *STATS_FIELDS
+        ).first()
+    return values
+
+
+def add(deltas, values, sign):
+    project_id = values[0]
+    for key in issue_keys(values):
+        deltas[project_id][key] += sign
+
+
+def new_deltas():
+    return defaultdict(Counter)
+
+
+def issue_saved(issue, created, previous=None, update_fields=None):
+    """
+    Compteurs après le save d'une issue.
+
+    `previous` : valeurs en base avant le save (`loaded_values`).
+    """
+    values = current_values(issue)
+    if update_fields is not None and previous is not None:
+        # Seuls les champs enregistrés changent en base
+        fields = {
+            Issue._meta.get_field(name).attname for name in update_fields
+        }
+        values = tuple(
+            value if name in fields else old
+            for name, value, old in zip(STATS_FIELDS, values, previous)
+        )
+    deltas = new_deltas()
+    if not created and previous is not None:
+        add(deltas, previous, -1)
+    add(deltas, values, 1)
+    apply(deltas)
+    issue._loaded_stats = values
+
+
+def issue_deleted(issue):
+    deltas = new_deltas()
+    add(deltas, getattr(issue, '_loaded_stats', None) or current_values(
+        issue
+    ), -1)
+    apply(deltas)
+
+
+def record_created(issues):
+    """Compteurs des issues insérées par bulk_create."""
+    deltas = new_deltas()
+    for issue in issues:
+        values = current_values(issue)
+        add(deltas, values, 1)
+        issue._loaded_stats = values
+    apply(deltas)
+
+
+def record_changed(issues):
+    """Compteurs des issues modifiées par bulk_update (chargées en base)."""
+    deltas = new_deltas()
+    for issue in issues:
+        previous, values = loaded_values(issue), current_values(issue)
+        if previous == values:
+            continue
+        if previous is not None:
+            add(deltas, previous, -1)
+        add(deltas, values, 1)
+        issue._loaded_stats = values
+    apply(deltas)
+
+
+def reassign_deleted_user(user_id):
+    """Issues assignées à un utilisateur supprimé : sans assigné."""
+    deltas = new_deltas()
+    for project_id, count in ProjectStats.objects.filter(
+        field='assignee', value=str(user_id)
+    ).exclude(count=0).values_list('project_id', 'count'):
+        deltas[project_id][('assignee', str(user_id))] -= count
+        deltas[project_id][('assignee', '')] += count
+    apply(deltas)
+
+
+def apply(deltas):
+    """Applique les deltas (ou les garde pour le lot en cours)."""
+    pending = getattr(_buffer, 'deltas', None)
+    if pending is not None:
+        for project_id, counter in deltas.items():
+            pending[project_id].update(counter)
+    else:
+        write(deltas)
+
+
+@contextmanager
+def batch():
+    """Regroupe les deltas enregistrés par signaux (une écriture)."""
+    if getattr(_buffer, 'deltas', None) is not None:
+        yield
+        return
+    _buffer.deltas = new_deltas()
+    try:
+        yield
+        deltas = _buffer.deltas
+    finally:
+        _buffer.deltas = None
+    write(deltas)
+
+
+def write(deltas):
+    """
+    `count = count + delta` sur les compteurs existants (un UPDATE par
+    lot de 100) ; les compteurs manquants sont créés à zéro, avec ceux de
+    `FIXED_KEYS`, puis incrémentés.
+
+    Un delta négatif sans compteur est ignoré : le projet est en cours de
+    suppression (CASCADE) ou déjà en écart, ce que la réconciliation
+    corrige.
+    """
+    rows = [
+        (project_id, field, value, delta)
+        for project_id, counter in deltas.items()
+        for (field, value), delta in counter.items()
+        if delta
+    ]
+    if not rows:
+        return
+    now = timezone.now()
+    updated = sum(
+        update(rows[start:start + UPDATE_CHUNK_SIZE], now)
+        for start in range(0, len(rows), UPDATE_CHUNK_SIZE)
+    )
+    if updated == len(rows):
+        return
+
+    existing = set()
+    for start in range(0, len(rows), UPDATE_CHUNK_SIZE):
+        existing.update(ProjectStats.objects.filter(
+            match(rows[start:start + UPDATE_CHUNK_SIZE])
+        ).values_list('project_id', 'field', 'value'))
+    missing = [row for row in rows if row[:3] not in existing and row[3] > 0]
+    if not missing:
+        return
+    keys = dict.fromkeys(row[:3] for row in missing)
+    for project_id in {row[0] for row in missing}:
+        keys.update(
+            dict.fromkeys((project_id, *key) for key in FIXED_KEYS)
+        )
+    ProjectStats.objects.bulk_create(
+        [
+            ProjectStats(project_id=project_id, field=field, value=value)
+            for project_id, field, value in keys
+            if (project_id, field, value) not in existing
+        ],
+        ignore_conflicts=True,
+    )
+    for start in range(0, len(missing), UPDATE_CHUNK_SIZE):
+        update(missing[start:start + UPDATE_CHUNK_SIZE], now)
+
+
+def match(rows):
+    condition = Q()
+    for project_id, field, value, *_ in rows:
+        condition |= Q(project_id=project_id, field=field, value=value)
+    return condition
+
+
+def update(rows, now):
+    return ProjectStats.objects.filter(match(rows)).update(
+        count=F('count') + Case(
+            *[
+                When(
+                    project_id=project_id,
+                    field=field,
+                    value=value,
+                    then=Value(delta),
+                )
+                for project_id, field, value, delta in rows
+            ],
+            default=Value(0),
+        ),
+        updated_time=now,
+    )
+
+
+def read_stats(rows):
+    """
+    Compteurs d'un projet depuis ses lignes `ProjectStats` :
+    {"total", "status", "priority", "tag", "assignee", "unassigned"}.
+    """
+    stats = {
+        'total': 0,
+        'status': dict.fromkeys(STATUSES, 0),
+        'priority': dict.fromkeys(PRIORITIES, 0),
+        'tag': dict.fromkeys(TAGS, 0),
+        'assignee': {},
+        'unassigned': 0,
+    }
+    for row in rows:
+        if row.field == 'total':
+            stats['total'] = row.count
+        elif row.field == 'assignee':
+            if not row.value:
+                stats['unassigned'] = row.count
+            elif row.count:
+                stats['assignee'][row.value] = row.count
+        elif row.value in stats[row.field]:
+            stats[row.field][row.value] = row.count
+    return stats
+
+
+def project_stats(project_id):
+    """Compteurs d'un projet en une requête."""
+    return read_stats(ProjectStats.objects.filter(project_id=project_id))
+
+
+def count_issues(project_ids):
+    """Compteurs recalculés depuis les issues : projet -> Counter."""
+    counters = {project_id: Counter() for project_id in project_ids}
+    rows = Issue.objects.filter(project_id__in=project_ids).order_by().values(
+        *STATS_FIELDS
+    ).annotate(count=Count('pk')).values_list(*STATS_FIELDS, 'count')
+    for *values, count in rows:
+        for key in issue_keys(values):
+            counters[values[0]][key] += count
+    return counters
+
+
+def reconcile(batch_size=100, fix=True):
+    """
+    Recalcule les compteurs de tous les projets, par lots de projets.
+
+    Génère `(project_id, {(champ, valeur): (stocké, recalculé)})` pour
+    chaque projet en écart ; avec `fix`, ses compteurs sont remplacés.
+    Les compteurs d'un lot sont verrouillés (select_for_update) avant le
+    recalcul : une écriture concurrente attend la fin du lot.
+    """
+    last = 0
+    while True:
+        project_ids = list(
+            Project.objects.filter(pk__gt=last).order_by('pk').values_list(
+                'pk', flat=True
+            )[:batch_size]
+        )
+        if not project_ids:
+            return
+        last = project_ids[-1]
+        with transaction.atomic():
+            stored = {project_id: Counter() for project_id in project_ids}
+            for project_id, field, value, count in (
+                ProjectStats.objects.select_for_update().filter(
+                    project_id__in=project_ids
+                ).values_list('project_id', 'field', 'value', 'count')
+            ):
+                stored[project_id][(field, value)] = count
+            actual = count_issues(project_ids)
+
+            drifted = {}
+            for project_id in project_ids:
+                old, new = stored[project_id], actual[project_id]
+                drift = {
+                    key: (old[key], new[key])
+                    for key in set(old) | set(new)
+                    if old[key] != new[key]
+                }
+                if drift:
+                    drifted[project_id] = drift
+            if fix and drifted:
+                ProjectStats.objects.filter(project_id__in=drifted).delete()
+                ProjectStats.objects.bulk_create([
+                    ProjectStats(
+                        project_id=project_id,
+                        field=field,
+                        value=value,
+                        count=count,
+                    )
+                    for project_id in drifted
+                    for (field, value), count in actual[project_id].items()
+                ])
+        yield from drifted.items()
@@ -0,0 +1,238 @@
+"""
+Flux Server-Sent Events des changements d'issues et de commentaires.
+
+`GET /api/v1/events/` est une vue Django asynchrone : servie par
+`softdesk/asgi.py`, une connexion ouverte n'occupe pas de thread. Sous
+WSGI, Django lirait tout le flux avant d'envoyer la réponse (rien
+n'arriverait au client pendant `TRACKER_EVENTS_MAX_STREAM_SECONDS`) : la
+vue répond 501.
+
+- Authentification : token d'accès JWT (`Authorization: Bearer`) ou
+  ticket (`?ticket=`, `EventSource` ne pouvant pas envoyer d'en-tête).
+  Le ticket, obtenu par `POST /api/v1/events/ticket/`, ne sert qu'à
+  ouvrir des flux (reconnexions comprises) jusqu'à son expiration
+  (`TICKET_LIFETIME`) : le token d'accès n'apparaît jamais dans une URL
+  (journaux, historique, Referer)
+- Projets suivis : ceux dont l'utilisateur est contributeur, ou
+  `?project=<id>` pour un seul d'entre eux (403 sinon)
+- Reprise : `Last-Event-ID` (ou `?since=`) rejoue les changements
+  manqués depuis le journal ; au-delà de `REPLAY_LIMIT`, ou si le point
+  de reprise a été purgé du journal, un événement `resync` invite à
+  passer par `/api/v1/sync/`
+- `overflow` : le client a pris trop de retard, le flux est fermé
+- Le flux est fermé à l'expiration du token ou après
+  `TRACKER_EVENTS_MAX_STREAM_SECONDS` ; le client se reconnecte avec
+  `Last-Event-ID` (Django 4.2 ne signale pas la déconnexion d'un client
+  pendant un flux, cette durée borne les abonnements abandonnés)
+"""
+
+import asyncio
+import json
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from accounts.authentication import (
+    TOKEN_VERSION_CLAIM,
+    StatelessJWTAuthentication,
+)
+
+from .changes import change_event, decode_token, is_expired
+from .events import CLIENT_MODELS, get_broker
+from .membership import MembershipResolver, normalize_id
+from .models import Change
+
+HEARTBEAT_SECONDS = 15
+RETRY_MILLISECONDS = 3000
+REPLAY_LIMIT = 500
+TICKET_LIFETIME = timedelta(seconds=30)
+
+
+def max_stream_seconds():
+    return getattr(settings, 'TRACKER_EVENTS_MAX_STREAM_SECONDS', 300)
+
+
+def format_event(event):
+    """Message SSE : `id` (point de reprise), `event` (type) et `data`."""
+    lines = []
+    if 'id' in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event, separators=(',', ':'))}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def error_response(detail, status):
+    return JsonResponse({'detail': str(detail)}, status=status)
+
+
+class StreamTicket(Token):
+    """
+    Ticket d'ouverture d'un flux, émis pour un token d'accès.
+
+    Type propre (`event_stream`) : refusé comme token d'accès par
+    l'authentification JWT, et le token d'accès l'est comme ticket.
+    Reprend l'identifiant et `token_version` du token d'accès ;
+    `stream_exp` borne le flux à l'expiration de ce dernier.
+    """
+    token_type = 'event_stream'
+    lifetime = TICKET_LIFETIME
+
+    @classmethod
+    def for_access_token(cls, access_token):
+        ticket = cls()
+        for claim in (api_settings.USER_ID_CLAIM, TOKEN_VERSION_CLAIM):
+            if claim in access_token:
+                ticket[claim] = access_token[claim]
+        ticket['stream_exp'] = access_token['exp']
+        return ticket
+
+
+def authenticate(request):
+    """
+    Retourne (utilisateur, expiration du flux en timestamp),
+    AuthenticationFailed sinon.
+    """
+    authentication = StatelessJWTAuthentication()
+    header = authentication.get_header(request)
+    if header is not None:
+        token = authentication.get_validated_token(
+            authentication.get_raw_token(header)
+        )
+        return authentication.get_user(token), token['exp']
+
+    raw_ticket = request.GET.get('ticket')
+    if not raw_ticket:
+        raise AuthenticationFailed(
+            "Informations d'authentification non fournies."
+        )
+    try:
+        ticket = StreamTicket(raw_ticket)
+    except TokenError as exc:
+        raise AuthenticationFailed(str(exc), code='invalid_ticket')
+    return authentication.get_user(ticket), ticket['stream_exp']
+
+
+async def load_replay(project_ids, since):
+    """
+    Changements manqués depuis `since`, ou None s'il y en a trop ou
+    s'ils ont été purgés.
+    """
+    oldest = await Change.objects.order_by('id').values_list(
+        'id', flat=True
+    ).afirst()
+    if is_expired(since, oldest):
+        return None
+    replay = [
+        change async for change in Change.objects.filter(
+            project_id__in=project_ids,
+            model__in=CLIENT_MODELS,
+            id__gt=since,
+        ).order_by('id')[:REPLAY_LIMIT + 1]
+    ]
+    if len(replay) > REPLAY_LIMIT:
+        return None
+    return replay
+
+
+async def stream_events(user_id, project_ids, follow_membership, since,
+                        duration):
+    """
+    Générateur du flux.
+
+    L'abonnement est pris avant de lire le journal : un changement
+    publié pendant le rejeu n'est pas perdu (les doublons sont écartés).
+    """
+    broker = get_broker()
+    subscription = broker.subscribe(user_id, project_ids, follow_membership)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    try:
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+        last_id = since
+        if since is not None:
+            replay = await load_replay(project_ids, since)
+            if replay is None:
+                yield format_event({'type': 'resync'})
+                return
+            for change in replay:
+                last_id = change.pk
+                yield format_event(change_event(change))
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            event = await subscription.get(min(HEARTBEAT_SECONDS, remaining))
+            if subscription.overflowed:
+                yield format_event({'type': 'overflow'})
+                return
+            if event is None:
+                yield ': heartbeat\n\n'
+            elif last_id is None or decode_token(event['id']) > last_id:
+                yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def event_stream(request):
+    """Flux SSE des changements des projets de l'utilisateur."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not isinstance(request, ASGIRequest):
+        return error_response(
+            'Le flux d\'événements requiert un serveur ASGI '
+            '(softdesk.asgi:application).',
+            501
+        )
+    try:
+        user, expires_at = await sync_to_async(authenticate)(request)
+    except AuthenticationFailed as exc:
+        return error_response(exc.detail, 401)
+
+    # Appartenances lues comme pour les vues REST (cache compris)
+    project_ids = await sync_to_async(
+        lambda: MembershipResolver(user).project_ids
+    )()
+    follow_membership = True
+    if 'project' in request.GET:
+        project_id = normalize_id(request.GET['project'])
+        if project_id not in project_ids:
+            return error_response(
+                "Vous n'êtes pas contributeur de ce projet.", 403
+            )
+        project_ids = [project_id]
+        follow_membership = False
+
+    since = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    if since:
+        try:
+            since = decode_token(since)
+        except ValidationError:
+            return error_response('Point de reprise invalide.', 400)
+    else:
+        since = None
+
+    duration = min(max_stream_seconds(), expires_at - time.time())
+    response = StreamingHttpResponse(
+        stream_events(
+            user.pk, project_ids, follow_membership, since, duration
+        ),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Pas de mise en tampon par un proxy nginx
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -2,9 +2,26 @@
 Routage des URLs pour l'application tracker avec routes imbriquées.
 """
 
+from django.conf import settings
 from django.urls import re_path, include
 from rest_framework.routers import SimpleRouter, DefaultRouter
-from .views import ProjectViewSet, IssueViewSet, CommentViewSet
+from .views import (
+    ProjectViewSet,
+    IssueViewSet,
+    CommentViewSet,
+    EventTicketView,
+    ImportView,
+    ResponseCacheStatsView,
+    SyncView,
+)
+from .async_views import (
+    CommentListView,
+    IssueDetailView,
+    IssueListView,
+    ProjectDetailView,
+    ProjectListView,
+)
+from .streams import event_stream
 
 # Routeur principal
 router = DefaultRouter()
@@ -36,8 +53,32 @@ urlpatterns = [
     # Route personnalisée (doit précéder les routes générées par les routeurs)
     re_path(r'^projects/(?P<project_pk>[0-9a-f-]+)/issues/(?P<issue_pk>[0-9a-f-]+)/comments/$',
             comment_viewset, name='comment-list-create'),
+    re_path(r'^cache/stats/$', ResponseCacheStatsView.as_view(),
+            name='response-cache-stats'),
+    re_path(r'^sync/$', SyncView.as_view(), name='sync'),
+    re_path(r'^events/$', event_stream, name='event-stream'),
+    re_path(r'^events/ticket/$', EventTicketView.as_view(),
+            name='event-ticket'),
+    re_path(r'^imports/$', ImportView.as_view(), name='imports'),
 
     re_path('', include(router.urls)),
     re_path(r'^projects/(?P<project_pk>[0-9a-f-]+)/', include(projects_router.urls)),
     re_path(r'^projects/(?P<project_pk>[0-9a-f-]+)/issues/(?P<issue_pk>[0-9a-f-]+)/', include(issues_router.urls)),
 ]
+
+# Sous ASGI (TRACKER_ASYNC_READS) : lectures servies par les vues
+# asynchrones, placées avant les routes des ViewSets auxquels elles
+# délèguent le reste (écritures, erreurs, API navigable)
+async_urlpatterns = [
+    re_path(r'^projects/$', ProjectListView.as_view()),
+    re_path(r'^projects/(?P<pk>[0-9]+)/$', ProjectDetailView.as_view()),
+    re_path(r'^projects/(?P<project_pk>[0-9a-f-]+)/issues/$',
+            IssueListView.as_view()),
+    re_path(r'^projects/(?P<project_pk>[0-9a-f-]+)/issues/(?P<pk>[0-9]+)/$',
+            IssueDetailView.as_view()),
+    re_path(r'^projects/(?P<project_pk>[0-9a-f-]+)/issues/(?P<issue_pk>[0-9a-f-]+)/comments/$',
+            CommentListView.as_view()),
+]
+
+if settings.TRACKER_ASYNC_READS:
+    urlpatterns = async_urlpatterns + urlpatterns
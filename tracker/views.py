@@ -5,6 +5,7 @@ Contient :
 - ProjectViewSet : CRUD sur les projets + gestion des contributeurs
 - IssueViewSet : CRUD sur les problèmes (issues) d'un projet
 - CommentViewSet : CRUD sur les commentaires d'une issue
+- ImportView : Import NDJSON en masse (administrateurs)
 
 Sécurité :
 - Tous les endpoints nécessitent une authentification JWT
@@ -14,26 +15,83 @@ Sécurité :
 
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.views import APIView
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Count,
+    Max,
+    OuterRef,
+    Subquery,
+    prefetch_related_objects,
+)
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
-from .models import Project, Contributor, Issue, Comment
+from .models import (
+    Project,
+    Contributor,
+    Issue,
+    Comment,
+    ImportRun,
+    ProjectStats,
+)
 from .serializers import (
     ProjectListSerializer,
     ProjectDetailSerializer,
     ContributorSerializer,
     IssueListSerializer,
     IssueDetailSerializer,
+    IssueBulkSerializer,
     CommentSerializer,
+    ImportRunSerializer,
 )
 from .permissions import (
     IsProjectContributor,
     IsContributorOrReadOnly,
 )
+from .membership import (
+    get_membership,
+    invalidate_cached_membership,
+    normalize_id,
+)
+from .mixins import CachedListMixin, ConditionalGetMixin, NestedParentMixin
+from .filters import IssueFilterBackend
+from .pagination import DEFAULT_KEYSET, KeysetPagination
+from . import changes, response_cache, stats
+from .search import index_issues, search_project
+from .export import CSVRenderer, NDJSONRenderer, export_response
+from .imports import Importer
+from .streams import TICKET_LIFETIME, StreamTicket
+
+User = get_user_model()
+
 
+def related_count(model, field):
+    """
+    Nombre de lignes de `model` rattachées à l'objet (`field`) :
+    sous-requête corrélée plutôt que jointure + GROUP BY, pour que la page
+    soit lue dans l'index de tri avant le comptage.
+    """
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+                field
+            ).annotate(count=Count('pk')).values('count')
+        ),
+        0
+    )
 
-class ProjectViewSet(viewsets.ModelViewSet):
+
+class ProjectViewSet(
+    ConditionalGetMixin,
+    CachedListMixin,
+    viewsets.ModelViewSet
+):
     """
     ViewSet pour la gestion des projets.
 
@@ -47,14 +105,49 @@ class ProjectViewSet(viewsets.ModelViewSet):
     - POST /api/v1/projects/{id}/contributor/ : Ajouter un contributeur
         - DELETE /api/v1/projects/{id}/contributor/?user_id=X :
             Retirer un contributeur
+    - GET /api/v1/projects/{id}/search/?q=... :
+        Recherche plein texte dans les issues et commentaires
+    - GET /api/v1/projects/{id}/export/?format=ndjson|csv :
+        Export en flux des issues et de leurs commentaires
 
     Sécurité :
     - Authentification JWT requise
     - Seuls les contributeurs voient le projet
     - Seul l'auteur peut modifier/supprimer
+
+    Cache HTTP : ETag (empreinte de la page) sur la liste, ETag /
+    Last-Modified sur le détail, calculés depuis le projet et ses
+    contributeurs.
+    La liste est mise en cache par utilisateur et versions des projets.
     """
     permission_classes = [IsAuthenticated, IsContributorOrReadOnly]
     basename = 'project'
+    # Nombre de résultats de recherche (?limit=)
+    search_limit = 20
+    search_max_limit = 100
+    # Issues lues (et sérialisées) par lot pendant un export
+    export_chunk_size = 500
+    conditional_aggregates = {
+        'last_time': Max('updated_time'),
+        'count': Count('pk', distinct=True),
+        'contributor_count': Count('contributors', distinct=True),
+        'contributor_time': Max('contributors__created_time'),
+    }
+    # Le détail inclut les compteurs d'issues : lus dans `ProjectStats`
+    # (quelques lignes par projet, O(1) en nombre d'issues), dont
+    # `updated_time` change à chaque écriture d'un compteur
+    issue_aggregates = {
+        'issue_count': Max(Subquery(
+            ProjectStats.objects.filter(
+                project=OuterRef('pk'), field='total', value=''
+            ).values('count')[:1]
+        )),
+        'issue_time': Max(Subquery(
+            ProjectStats.objects.filter(project=OuterRef('pk')).order_by(
+                '-updated_time'
+            ).values('updated_time')[:1]
+        )),
+    }
 
     def get_serializer_class(self):
         """Utilise le sérialiseur détail pour create/retrieve, sinon liste."""
@@ -62,23 +155,28 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return ProjectListSerializer
         return ProjectDetailSerializer
 
+    def get_conditional_aggregates(self):
+        if self.action == 'retrieve':
+            return {**self.conditional_aggregates, **self.issue_aggregates}
+        return self.conditional_aggregates
+
     def get_queryset(self):
         """
         Filtrage des projets : l'utilisateur doit être contributeur.
 
         Sécurité : Seuls les projets où l'utilisateur est contributeur
-        sont retournés.
+        sont retournés (appartenances chargées une fois par requête,
+        réutilisées ensuite par les permissions).
         Optimisation : select_related pour l'auteur,
         prefetch_related pour les contributeurs.
         """
-        queryset = Project.objects.filter(
-            contributors__user=self.request.user
-        ).distinct()
+        queryset = self.get_base_queryset()
 
         # Optimisation des requêtes ORM
         if self.action == 'list':
-            queryset = queryset.select_related('author').prefetch_related(
-                'contributors__user'
+            # Comptage en base : aucune ligne Contributor chargée
+            queryset = queryset.select_related('author').annotate(
+                contributors_count=related_count(Contributor, 'project')
             )
         elif self.action in [
             'retrieve',
@@ -89,9 +187,22 @@ class ProjectViewSet(viewsets.ModelViewSet):
             queryset = queryset.select_related('author').prefetch_related(
                 'contributors__user'
             )
+            if self.action != 'destroy':
+                # Compteurs d'issues dénormalisés (une requête)
+                queryset = queryset.prefetch_related('stats')
 
         return queryset
 
+    def get_base_queryset(self):
+        """Projets dont l'utilisateur est contributeur (sans jointures)."""
+        return Project.objects.filter(
+            pk__in=get_membership(self.request).project_ids
+        )
+
+    def get_cached_project_ids(self):
+        """La liste dépend de tous les projets de l'utilisateur."""
+        return get_membership(self.request).project_ids
+
     def perform_create(self, serializer):
         """Créer le projet avec l'utilisateur actuel comme auteur."""
         project = serializer.save(author=self.request.user)
@@ -102,6 +213,26 @@ class ProjectViewSet(viewsets.ModelViewSet):
             user=self.request.user,
             role='author'
         )
+        get_membership(self.request).invalidate()
+
+    def update(self, request, *args, **kwargs):
+        """
+        Modifier le projet.
+
+        Après l'écriture, DRF vide le cache des prefetch de l'instance :
+        contributeurs (avec leurs utilisateurs) et compteurs sont
+        rechargés en deux requêtes, et non une par contributeur.
+        """
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()
+        serializer = self.get_serializer(
+            instance, data=request.data, partial=partial
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        instance._prefetched_objects_cache = {}
+        prefetch_related_objects([instance], 'contributors__user', 'stats')
+        return Response(serializer.data)
 
     @action(
         detail=True,
@@ -125,15 +256,17 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Query params (DELETE) :
         ?user_id=<user_id>
 
+        Par lot : "user_ids" (liste) dans le body (POST/DELETE) ou
+        ?user_ids=1,2,3 (DELETE). La réponse indique les utilisateurs
+        ajoutés/retirés, ignorés (skipped) et introuvables (missing).
+
         Sécurité : Seuls les contributeurs du projet peuvent gérer les membres.
         """
         project = self.get_object()
+        membership = get_membership(request)
 
         # Vérifier si l'utilisateur est contributeur du projet
-        if not Contributor.objects.filter(
-            user=request.user,
-            project=project
-        ).exists():
+        if not membership.is_contributor(project.pk):
             return Response(
                 {
                     'detail': (
@@ -144,6 +277,20 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        user_ids = self._get_user_ids(request)
+        if user_ids is not None:
+            if request.method == 'POST':
+                report = self._add_contributors(project, user_ids)
+                response_status = (
+                    status.HTTP_201_CREATED if report['added']
+                    else status.HTTP_200_OK
+                )
+            else:
+                report = self._remove_contributors(project, user_ids)
+                response_status = status.HTTP_200_OK
+            membership.invalidate()
+            return Response(report, status=response_status)
+
         if request.method == 'POST':
             serializer = ContributorSerializer(
                 data=request.data,
@@ -151,6 +298,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
             )
             if serializer.is_valid():
                 serializer.save(project=project)
+                membership.invalidate()
                 return Response(
                     serializer.data,
                     status=status.HTTP_201_CREATED
@@ -188,6 +336,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_400_BAD_REQUEST
                     )
                 contributor.delete()
+                membership.invalidate()
                 return Response(status=status.HTTP_204_NO_CONTENT)
             except Contributor.DoesNotExist:
                 return Response(
@@ -195,32 +344,227 @@ class ProjectViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
+    @action(detail=True, methods=['get'])
+    def search(self, request, pk=None):
+        """
+        Recherche plein texte dans les issues et commentaires du projet.
+
+        GET /api/v1/projects/{id}/search/?q=<texte>&limit=20
+
+        Résultats classés par pertinence (titre prioritaire) :
+        {"results": [{"type": "issue", "id": 3, "issue_id": 3,
+                      "title": "...", "snippet": "...", "score": 1.2}]}
+        """
+        project = self.get_object()
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'Ce paramètre est obligatoire.'})
+        try:
+            limit = int(request.query_params.get('limit', self.search_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'Un entier est attendu.'})
+        limit = min(max(limit, 1), self.search_max_limit)
+        return Response({
+            'results': search_project(project.pk, query, limit),
+        })
+
+    @action(
+        detail=True,
+        methods=['get'],
+        permission_classes=[IsAuthenticated, IsProjectContributor],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request, pk=None):
+        """
+        Export des issues du projet et de leurs commentaires.
+
+        GET /api/v1/projects/{id}/export/?format=ndjson (défaut) ou csv
+
+        Réponse en flux (`tracker/export.py`), mémoire bornée quelle que
+        soit la taille du projet.
+        """
+        project = self.get_object()
+        return export_response(
+            request,
+            project,
+            request.accepted_renderer.format,
+            self.export_chunk_size,
+        )
+
+    @staticmethod
+    def _get_user_ids(request):
+        """
+        Liste `user_ids` du body ou de la query string (DELETE), ou None.
+
+        Lève une ValidationError (400) si ce n'est pas une liste d'entiers.
+        """
+        user_ids = None
+        if hasattr(request.data, 'getlist') and 'user_ids' in request.data:
+            user_ids = request.data.getlist('user_ids')
+        elif hasattr(request.data, 'get'):
+            user_ids = request.data.get('user_ids')
+        if user_ids is None and 'user_ids' in request.query_params:
+            user_ids = request.query_params['user_ids'].split(',')
+        if user_ids is None:
+            return None
+        try:
+            if not isinstance(user_ids, list):
+                raise TypeError
+            return [int(user_id) for user_id in user_ids]
+        except (TypeError, ValueError):
+            raise ValidationError(
+                {'user_ids': "Une liste d'identifiants est attendue."}
+            )
+
+    def _add_contributors(self, project, user_ids):
+        """Ajoute un lot d'utilisateurs (une requête User, un INSERT)."""
+        existing = get_membership(self.request).members(project.pk)
+        found = set(
+            User.objects.filter(pk__in=user_ids).order_by().values_list(
+                'pk', flat=True
+            )
+        )
+        added, skipped, missing = [], [], []
+        for user_id in dict.fromkeys(user_ids):
+            if user_id not in found:
+                missing.append(user_id)
+            elif user_id in existing:
+                skipped.append(user_id)
+            else:
+                added.append(user_id)
+
+        # bulk_create n'envoie pas post_save : journaliser dans la
+        # transaction de l'insertion, puis invalider les caches
+        with transaction.atomic(savepoint=False):
+            created = []
+            while added:
+                try:
+                    # Sans ignore_conflicts : les lignes créées (clés
+                    # renvoyées) sont exactement celles du lot
+                    with transaction.atomic():
+                        created = Contributor.objects.bulk_create([
+                            Contributor(project=project, user_id=user_id)
+                            for user_id in added
+                        ])
+                    break
+                except IntegrityError:
+                    # Ajout concurrent : membres du lot relus en base
+                    present = set(
+                        Contributor.objects.filter(
+                            project=project,
+                            user_id__in=added
+                        ).values_list('user_id', flat=True)
+                    )
+                    if not present:
+                        raise
+                    skipped += [uid for uid in added if uid in present]
+                    added = [uid for uid in added if uid not in present]
+            if created:
+                changes.record_many(
+                    'contributor', created, 'created', project.pk
+                )
+        for user_id in added:
+            invalidate_cached_membership(user_id, project.pk)
+        if added:
+            response_cache.bump_project_version(project.pk)
+        return {'added': added, 'skipped': skipped, 'missing': missing}
+
+    def _remove_contributors(self, project, user_ids):
+        """
+        Retire un lot de contributeurs.
+
+        Comme pour le retrait unitaire, le projet ne peut pas perdre tous
+        ses contributeurs : si le lot les retirerait tous, les membres de
+        rôle `author` sont conservés (skipped). Sans membre de ce rôle,
+        l'auteur du projet est conservé s'il est membre, sinon le premier
+        membre du lot.
+        """
+        existing = get_membership(self.request).members(project.pk)
+        removed, skipped, missing = [], [], []
+        for user_id in dict.fromkeys(user_ids):
+            if user_id in existing:
+                removed.append(user_id)
+            else:
+                missing.append(user_id)
+
+        if removed and len(removed) >= len(existing):
+            skipped = [
+                user_id for user_id in removed
+                if existing[user_id] == 'author'
+            ]
+            if not skipped:
+                skipped = [
+                    project.author_id if project.author_id in existing
+                    else removed[0]
+                ]
+            removed = [
+                user_id for user_id in removed if user_id not in skipped
+            ]
+
+        if removed:
+            # Retraits et journal validés ensemble
+            with transaction.atomic(savepoint=False), changes.batch():
+                Contributor.objects.filter(
+                    project=project,
+                    user_id__in=removed
+                ).delete()
+        return {'removed': removed, 'skipped': skipped, 'missing': missing}
 
-class IssueViewSet(viewsets.ModelViewSet):
+
+class IssueViewSet(
+    NestedParentMixin,
+    ConditionalGetMixin,
+    CachedListMixin,
+    viewsets.ModelViewSet
+):
     """
     ViewSet pour la gestion des problèmes (issues) dans un projet.
 
     Endpoints :
         - GET /api/v1/projects/{project_id}/issues/ :
-            Liste des issues du projet (paginé)
+            Liste des issues du projet (paginé par curseur)
     - POST /api/v1/projects/{project_id}/issues/ : Créer une issue
     - GET /api/v1/projects/{project_id}/issues/{id}/ : Détails de l'issue
         - PUT /api/v1/projects/{project_id}/issues/{id}/ :
             Modifier l'issue (auteur uniquement)
         - DELETE /api/v1/projects/{project_id}/issues/{id}/ :
             Supprimer l'issue (auteur uniquement)
+        - POST/PATCH/DELETE /api/v1/projects/{project_id}/issues/bulk/ :
+            Créer, modifier ou supprimer un lot d'issues
+
+    Filtres et tri de la liste : voir `IssueFilterBackend`
+    (?status=, ?priority=, ?tag=, ?assignee=, ?created_after=, ...,
+    ?ordering=).
 
     Sécurité :
     - Seuls les contributeurs du projet peuvent voir les issues
     - Seul l'auteur peut modifier/supprimer son issue
     - L'assigné doit être contributeur du projet (validation dans serializer)
+
+    Cache HTTP : ETag (empreinte de la page) sur la liste, ETag /
+    Last-Modified sur le détail, calculés depuis l'issue et ses
+    commentaires.
+    La liste est mise en cache par utilisateur et version du projet.
+
+    Le projet et le rôle de l'utilisateur sont chargés une fois par
+    requête (`NestedParentMixin`).
     """
     permission_classes = [
         IsAuthenticated,
         IsProjectContributor,
         IsContributorOrReadOnly,
     ]
+    pagination_class = KeysetPagination
+    filter_backends = [IssueFilterBackend]
     basename = 'issue'
+    # Taille maximale d'un lot pour l'endpoint bulk
+    bulk_max_items = 1000
+    conditional_aggregates = {
+        'last_time': Max('updated_time'),
+        'count': Count('pk', distinct=True),
+        'comment_count': Count('comments', distinct=True),
+        'comment_time': Max('comments__updated_time'),
+    }
 
     def get_serializer_class(self):
         """Utilise le sérialiseur détail pour create/retrieve, sinon liste."""
@@ -237,50 +581,270 @@ class IssueViewSet(viewsets.ModelViewSet):
         Si non-contributeur, retourne un queryset vide.
 
         Optimisation : select_related pour auteur/assigné,
-        prefetch_related pour commentaires.
+        comptage des commentaires en base pour la liste.
+        Les commentaires du détail sont chargés (bornés) par le
+        sérialiseur ; les mises à jour ne les chargent pas.
         """
-        project_id = self.kwargs.get('project_pk')
-        queryset = Issue.objects.filter(project_id=project_id)
-
-        # Vérifier que l'utilisateur est contributeur du projet
-        if not Contributor.objects.filter(
-            user=self.request.user,
-            project_id=project_id
-        ).exists():
-            return queryset.none()
+        queryset = self.get_base_queryset()
 
         # Optimisation des requêtes ORM
         if self.action == 'list':
             queryset = queryset.select_related(
                 'author', 'assignee'
-            ).prefetch_related('comments')
+            ).annotate(
+                comments_count=related_count(Comment, 'issue')
+            )
         elif self.action in ['retrieve', 'update', 'partial_update']:
-            queryset = queryset.select_related(
-                'author', 'assignee'
-            ).prefetch_related('comments__author')
+            queryset = queryset.select_related('author')
 
         return queryset
 
+    def get_parent_queryset(self):
+        """Projet de la route."""
+        return Project.objects.filter(
+            pk=normalize_id(self.kwargs.get('project_pk'))
+        )
+
+    def get_base_queryset(self):
+        """Issues du projet, vide si l'utilisateur n'y contribue pas."""
+        # Vérifier que l'utilisateur est contributeur du projet
+        # (projet introuvable ou identifiant invalide : aucun accès)
+        if not self.has_parent_access():
+            return Issue.objects.none()
+        return Issue.objects.filter(project_id=self.get_parent().pk)
+
+    def get_keyset(self):
+        """Keyset de la pagination par curseur selon `?ordering=`."""
+        if self.action != 'list':
+            return DEFAULT_KEYSET
+        return IssueFilterBackend().get_keyset(self.request)
+
+    def get_cached_project_ids(self):
+        """La liste dépend du projet (pas de cache si non-contributeur)."""
+        if not self.has_parent_access():
+            return None
+        return [self.get_parent().pk]
+
     def perform_create(self, serializer):
         """Créer l'issue avec l'utilisateur actuel comme auteur."""
-        project_id = self.kwargs.get('project_pk')
-        project = get_object_or_404(Project, id=project_id)
         serializer.save(
             author=self.request.user,
-            project=project
+            project=self.get_parent_or_404()
         )
 
     def get_serializer_context(self):
-        """Passe le projet au sérialiseur pour valider l'assigné."""
+        """
+        Passe le projet au sérialiseur pour valider l'assigné.
+
+        Le détail (retrieve) inclut les derniers commentaires.
+        """
         context = super().get_serializer_context()
-        project_id = self.kwargs.get('project_pk')
-        if project_id:
-            context['project'] = get_object_or_404(Project, id=project_id)
+        if self.kwargs.get('project_pk'):
+            context['project'] = self.get_parent_or_404()
+        context['embed_comments'] = self.action == 'retrieve'
         return context
 
+    @action(detail=False, methods=['post', 'patch', 'delete'])
+    def bulk(self, request, project_pk=None):
+        """
+        Opérations par lot sur les issues du projet.
+
+        POST : liste d'issues à créer
+        PATCH : liste de modifications partielles, chacune avec son "id"
+        DELETE : {"ids": [<issue_id>, ...]}
+
+        Le lot est validé contre un seul instantané des membres du projet
+        puis écrit en une transaction (bulk_create / bulk_update).
+        La réponse donne un résultat par élément :
+        {"results": [{"index": 0, "status": 201, "id": 12}, ...]}
+        Un identifiant qui n'est pas un entier positif donne un 400 pour
+        son élément.
+        """
+        if not self.has_parent_access():
+            return Response(
+                {'detail': IsProjectContributor.message},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        items = request.data
+        if request.method == 'DELETE':
+            items = request.data.get('ids') if hasattr(
+                request.data, 'get'
+            ) else None
+        if not isinstance(items, list):
+            return Response(
+                {'detail': 'Une liste est attendue.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {
+                    'detail': (
+                        f'{self.bulk_max_items} éléments maximum par lot.'
+                    )
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        context = self.get_serializer_context()
+        if request.method == 'POST':
+            results, success = self._bulk_create(items, context)
+        elif request.method == 'PATCH':
+            results, success = self._bulk_update(items, context)
+        else:
+            results, success = self._bulk_delete(items)
+
+        if success == len(items):
+            response_status = {
+                'POST': status.HTTP_201_CREATED,
+                'PATCH': status.HTTP_200_OK,
+                'DELETE': status.HTTP_200_OK,
+            }[request.method]
+        elif success:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({'results': results}, status=response_status)
+
+    def _bulk_create(self, items, context):
+        """Valide chaque élément puis insère les issues valides."""
+        project = context['project']
+        results, issues = [], []
+        for index, item in enumerate(items):
+            serializer = IssueBulkSerializer(data=item, context=context)
+            if serializer.is_valid():
+                issues.append(Issue(
+                    project=project,
+                    author=self.request.user,
+                    **serializer.validated_data
+                ))
+                results.append({'index': index, 'status': 201})
+            else:
+                results.append({
+                    'index': index,
+                    'status': 400,
+                    'errors': serializer.errors,
+                })
+
+        # bulk_create n'envoie pas post_save : index, journal, compteurs
+        # et cache mis à jour ici
+        with transaction.atomic():
+            Issue.objects.bulk_create(issues)
+            index_issues(issues, created=True)
+            changes.record_many('issue', issues, 'created', project.pk)
+            stats.record_created(issues)
+        if issues:
+            response_cache.bump_project_version(project.pk)
+        created = iter(issues)
+        for result in results:
+            if result['status'] == 201:
+                result['id'] = next(created).pk
+        return results, len(issues)
+
+    @staticmethod
+    def _bulk_id(value):
+        """Identifiant d'un élément de lot (entier positif), ou None."""
+        if isinstance(value, bool) or not isinstance(value, int):
+            return None
+        return value if value > 0 else None
+
+    @staticmethod
+    def _invalid_id(index):
+        """Résultat d'un élément dont l'identifiant est invalide."""
+        return {
+            'index': index,
+            'status': 400,
+            'errors': {'id': ['Un identifiant entier positif est attendu.']},
+        }
+
+    def _bulk_update(self, items, context):
+        """Applique les modifications des issues dont l'utilisateur est
+        l'auteur, en une seule requête de lecture et un bulk_update."""
+        ids = [
+            self._bulk_id(item.get('id')) if isinstance(item, dict) else None
+            for item in items
+        ]
+        existing = Issue.objects.filter(
+            project_id=context['project'].pk,
+            pk__in=[pk for pk in ids if pk is not None]
+        ).in_bulk()
+
+        results, issues, fields = [], [], {'updated_time'}
+        now = timezone.now()
+        for index, (item, pk) in enumerate(zip(items, ids)):
+            if pk is None:
+                results.append(self._invalid_id(index))
+                continue
+            issue = existing.get(pk)
+            if issue is None:
+                results.append({'index': index, 'status': 404})
+                continue
+            if issue.author_id != self.request.user.pk:
+                results.append({'index': index, 'status': 403})
+                continue
+            serializer = IssueBulkSerializer(
+                issue,
+                data=item,
+                partial=True,
+                context=context
+            )
+            if not serializer.is_valid():
+                results.append({
+                    'index': index,
+                    'status': 400,
+                    'errors': serializer.errors,
+                })
+                continue
+            for attr, value in serializer.validated_data.items():
+                setattr(issue, attr, value)
+                fields.add(attr)
+            issue.updated_time = now
+            issues.append(issue)
+            results.append({'index': index, 'status': 200, 'id': issue.pk})
+
+        if issues:
+            # bulk_update n'envoie pas post_save : index, journal,
+            # compteurs et cache mis à jour ici
+            with transaction.atomic():
+                Issue.objects.bulk_update(issues, sorted(fields))
+                if fields & {'title', 'description'}:
+                    index_issues(issues)
+                changes.record_many(
+                    'issue', issues, 'updated', context['project'].pk
+                )
+                stats.record_changed(issues)
+            response_cache.bump_project_version(context['project'].pk)
+        return results, len(issues)
+
+    def _bulk_delete(self, ids):
+        """Supprime les issues dont l'utilisateur est l'auteur."""
+        ids = [self._bulk_id(pk) for pk in ids]
+        existing = dict(
+            Issue.objects.filter(
+                project_id=self.get_parent().pk,
+                pk__in=[pk for pk in ids if pk is not None]
+            ).values_list('pk', 'author_id')
+        )
+        results, deletable = [], []
+        for index, pk in enumerate(ids):
+            if pk is None:
+                results.append(self._invalid_id(index))
+            elif pk not in existing:
+                results.append({'index': index, 'status': 404})
+            elif existing[pk] != self.request.user.pk:
+                results.append({'index': index, 'status': 403})
+            else:
+                deletable.append(pk)
+                results.append({'index': index, 'status': 204, 'id': pk})
+
+        if deletable:
+            with transaction.atomic(), changes.batch(), stats.batch():
+                Issue.objects.filter(pk__in=deletable).delete()
+        return results, len(deletable)
+
     @action(detail=True, methods=['get'])
     def comments(self, request, project_pk=None, pk=None):
-        """Retourne tous les commentaires d'une issue (paginé)."""
+        """Retourne tous les commentaires d'une issue (paginé par curseur)."""
         issue = self.get_object()
         queryset = issue.comments.select_related('author').order_by(
             '-created_time'
@@ -293,13 +857,17 @@ class IssueViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    NestedParentMixin,
+    ConditionalGetMixin,
+    viewsets.ModelViewSet
+):
     """
     ViewSet pour la gestion des commentaires sur une issue.
 
     Endpoints :
         - GET /api/v1/projects/{project_id}/issues/{issue_id}/comments/ :
-            Liste des commentaires (paginé)
+            Liste des commentaires (paginé par curseur)
         - POST /api/v1/projects/{project_id}/issues/{issue_id}/comments/ :
             Créer un commentaire
         - GET /api/v1/projects/{project_id}/issues/{issue_id}/comments/{id}/ :
@@ -312,10 +880,23 @@ class CommentViewSet(viewsets.ModelViewSet):
     Sécurité :
     - Seuls les contributeurs du projet peuvent voir les commentaires
     - Seul l'auteur peut modifier/supprimer son commentaire
+
+    Cache HTTP : ETag (empreinte de la page) sur la liste, ETag /
+    Last-Modified sur le détail.
+
+    L'issue, son projet et le rôle de l'utilisateur sont chargés en une
+    requête, une fois par requête HTTP (`NestedParentMixin`) ; une issue
+    d'un autre projet que celui de l'URL donne une 404.
     """
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated, IsContributorOrReadOnly]
+    pagination_class = KeysetPagination
     basename = 'comment'
+    parent_project_field = 'project_id'
+    conditional_aggregates = {
+        'last_time': Max('updated_time'),
+        'count': Count('pk'),
+    }
 
     def get_queryset(self):
         """
@@ -328,36 +909,174 @@ class CommentViewSet(viewsets.ModelViewSet):
 
         Optimisation : select_related pour l'auteur.
         """
-        issue_id = self.kwargs.get('issue_pk')
-        queryset = Comment.objects.filter(issue_id=issue_id)
-
-        # Récupérer l'issue et vérifier que l'utilisateur
-        # est contributeur du projet
-        issue = get_object_or_404(Issue, id=issue_id)
-        if not Contributor.objects.filter(
-            user=self.request.user,
-            project=issue.project
-        ).exists():
-            return queryset.none()
-
+        queryset = self.get_base_queryset()
         if self.action == 'list':
             queryset = queryset.select_related('author')
 
         return queryset
 
+    def get_parent_queryset(self):
+        """Issue de la route, dans le projet de la route."""
+        return Issue.objects.select_related('project').filter(
+            pk=normalize_id(self.kwargs.get('issue_pk')),
+            project_id=normalize_id(self.kwargs.get('project_pk')),
+        )
+
+    def get_base_queryset(self):
+        """Commentaires de l'issue, vide si l'utilisateur n'y a pas accès."""
+        issue = self.get_parent_or_404()
+        queryset = Comment.objects.filter(issue_id=issue.pk)
+
+        # Vérifier que l'utilisateur est contributeur du projet
+        if not self.has_parent_access():
+            return queryset.none()
+        return queryset
+
+    def check_object_permissions(self, request, obj):
+        """Permissions sur le commentaire, avec l'issue déjà chargée."""
+        obj.issue = self.get_parent_or_404()
+        super().check_object_permissions(request, obj)
+
     def perform_create(self, serializer):
         """Créer le commentaire avec l'utilisateur actuel comme auteur."""
-        issue_id = self.kwargs.get('issue_pk')
-        issue = get_object_or_404(Issue, id=issue_id)
         serializer.save(
             author=self.request.user,
-            issue=issue
+            issue=self.get_parent_or_404()
         )
 
     def get_serializer_context(self):
         """Passe l'issue au sérialiseur pour la validation."""
         context = super().get_serializer_context()
-        issue_id = self.kwargs.get('issue_pk')
-        if issue_id:
-            context['issue'] = get_object_or_404(Issue, id=issue_id)
+        if self.kwargs.get('issue_pk'):
+            context['issue'] = self.get_parent_or_404()
         return context
+
+
+class SyncView(APIView):
+    """
+    Synchronisation incrémentale des projets de l'utilisateur.
+
+    GET /api/v1/sync/ : point de reprise courant ("next"), à utiliser
+        après un chargement complet
+    GET /api/v1/sync/?since=<token>&limit=500 : changements depuis le
+        point de reprise, par lots (rappeler avec "next" tant que
+        "has_more" est vrai)
+
+    Chaque changement : {"type", "id", "project_id", "action", "data"}
+    ("data" est l'état courant, null pour une suppression).
+    "removed_projects" : projets dont l'utilisateur a été retiré (ou
+    supprimés) ; "resync_projects" : projets rejoints, à recharger.
+    410 (`resync_required`) si le point de reprise a été purgé du
+    journal (`TRACKER_CHANGE_RETENTION_DAYS`).
+    """
+    permission_classes = [IsAuthenticated]
+    default_limit = 500
+    max_limit = 1000
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if not since:
+            return Response({
+                'changes': [],
+                'removed_projects': [],
+                'resync_projects': [],
+                'next': changes.current_token(),
+                'has_more': False,
+            })
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'Un entier est attendu.'})
+        limit = min(max(limit, 1), self.max_limit)
+        return Response(changes.get_changes(
+            request.user,
+            get_membership(request).project_ids,
+            changes.decode_token(since),
+            limit,
+            context={'request': request},
+        ))
+
+
+class EventTicketView(APIView):
+    """
+    Ticket d'ouverture du flux d'événements.
+
+    POST /api/v1/events/ticket/ : {"ticket", "expires_in"} ; le ticket
+    se passe en `?ticket=` à `GET /api/v1/events/` (`EventSource` ne
+    peut pas envoyer d'en-tête) et expire après quelques secondes.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ticket = StreamTicket.for_access_token(request.auth)
+        return Response({
+            'ticket': str(ticket),
+            'expires_in': int(TICKET_LIFETIME.total_seconds()),
+        })
+
+
+class ResponseCacheStatsView(APIView):
+    """
+    Compteurs du cache des réponses (administrateurs uniquement).
+
+    GET /api/v1/cache/stats/ : {"hits", "misses", "hit_ratio", ...}
+    DELETE /api/v1/cache/stats/ : remet les compteurs à zéro
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache.get_stats())
+
+    def delete(self, request):
+        response_cache.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ImportView(APIView):
+    """
+    Import NDJSON en masse (administrateurs uniquement).
+
+    GET /api/v1/imports/ : derniers imports et leur point de reprise
+    POST /api/v1/imports/ : corps NDJSON, lu en flux (format : voir
+        `tracker/imports.py`), ?batch_size=1000
+    POST /api/v1/imports/?resume=<id> : reprend l'import après sa
+        dernière ligne écrite (renvoyer le même fichier)
+
+    Réponse : état de l'import et lignes écartées
+    ("rejected" : [{"line", "errors"}, ...]).
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    default_batch_size = 1000
+    max_batch_size = 5000
+    list_limit = 20
+
+    def get(self, request):
+        runs = ImportRun.objects.all()[:self.list_limit]
+        return Response(ImportRunSerializer(runs, many=True).data)
+
+    def post(self, request):
+        try:
+            batch_size = int(request.query_params.get(
+                'batch_size', self.default_batch_size
+            ))
+        except ValueError:
+            raise ValidationError({'batch_size': 'Un entier est attendu.'})
+        batch_size = min(max(batch_size, 1), self.max_batch_size)
+
+        resume = request.query_params.get('resume')
+        if resume is not None:
+            run = get_object_or_404(ImportRun, pk=normalize_id(resume))
+            if run.status == 'finished':
+                raise ValidationError({'resume': 'Import déjà terminé.'})
+        else:
+            run = ImportRun.objects.create(user=request.user, source='api')
+
+        # Corps lu ligne par ligne (request.data le chargerait en entier)
+        importer = Importer(run, batch_size=batch_size)
+        importer.import_lines(request._request)
+        data = ImportRunSerializer(run).data
+        data['rejected'] = importer.rejected
+        return Response(
+            data,
+            status=status.HTTP_200_OK if resume else status.HTTP_201_CREATED
+        )